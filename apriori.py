@@ -3,6 +3,7 @@ from mlxtend.frequent_patterns import apriori
 from mlxtend.frequent_patterns import association_rules
 import matplotlib.pyplot as plt
 import numpy as np
+from schema_inference import read_csv_typed
 
 
 # --------------------------------------------------------------------------------
@@ -42,7 +43,8 @@ MIN_CONFIDENCE = 0.25    # Minimum confidence (e.g., 25%) for a rule to be consi
 # Load the dataset
 print(f"Loading {DATASET_FILE}...")
 try:
-    df = pd.read_csv(DATASET_FILE)
+    # Date columns are parsed with the format inferred once and cached per file (schema_inference.py)
+    df = read_csv_typed(DATASET_FILE)
 except FileNotFoundError:
     print(f"Error: {DATASET_FILE} not found. Make sure the file is in the same directory.")
     exit()
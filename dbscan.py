@@ -7,6 +7,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.impute import SimpleImputer
+from outliers import outlier_mask
 
 
 # --------------------------------------------------------------------------------
@@ -34,6 +35,10 @@ VISUALIZATION_FEATURE_2 = 'PetalWidthCm'
 # VISUALIZATION_FEATURE_2 = 'Spending Score (1-100)'
 
 
+# Outlier removal before fitting (outliers.py): 'zscore', 'mad', 'iqr', 'isolation_forest', 'knn' or None
+OUTLIER_METHOD = None
+
+
 
 
 # --------------------------------------------------------------------------------
@@ -76,6 +81,15 @@ else:
 
 
 
+# Remove outliers before fitting (the same rows are dropped from df for plotting)
+if OUTLIER_METHOD:
+    is_outlier = outlier_mask(X, OUTLIER_METHOD).to_numpy()
+    print(f"\nRemoving {is_outlier.sum()} outlier row(s) flagged by '{OUTLIER_METHOD}'...")
+    X, df = X[~is_outlier], df[~is_outlier]
+
+
+
+
 # Feature Scaling (mandatory for distance-based algorithms like DBSCAN)
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
@@ -8,6 +8,7 @@ from sklearn.metrics import accuracy_score, classification_report, confusion_mat
 import numpy as np
 from sklearn.tree import plot_tree
 import matplotlib.pyplot as plt
+from model_artifacts import save_model_artifact
 
 
 # --- CONFIGURATION: Change these for a new dataset ---
@@ -21,6 +22,14 @@ TARGET_COLUMN = 'Species' # Change this to your new target column name (e.g., 'T
 
 # ⚠️ 3. Change the name of the unique ID column to drop (or set to None if no ID column exists)
 ID_COLUMN_TO_DROP = 'Id' # Change this to the ID column (or set to None)
+
+
+# ⚠️ 4. Set to True to prune uninformative/redundant features before training (see feature_screening.py)
+SCREEN_FEATURES = False
+
+
+# ⚠️ 5. Fitted model + preprocessing state are saved here for batch scoring (model_artifacts.py score ...)
+MODEL_ARTIFACT_FILE = 'decision_tree_model.bundle'
 # --- END CONFIGURATION ---
 
 
@@ -67,6 +76,13 @@ print("Splitting data into 80% training and 20% testing...")
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 
+# (Optional) Feature screening on the training split only, so test rows never influence the selection
+if SCREEN_FEATURES:
+    from feature_screening import screen_features
+    selected_features = screen_features(X_train, y_train, dataset_file=DATASET_FILE)
+    X, X_train, X_test = X[selected_features], X_train[selected_features], X_test[selected_features]
+
+
 # Display shapes of the split data
 print(f"X_train shape: {X_train.shape}")
 print(f"X_test shape: {X_test.shape}")
@@ -84,6 +100,8 @@ dt_model = DecisionTreeClassifier(random_state=42)
 print("Training Decision Tree Classifier...")
 dt_model.fit(X_train, y_train)
 print("Training complete.")
+save_model_artifact(MODEL_ARTIFACT_FILE, dt_model, X, X, target=TARGET_COLUMN,
+                    columns_to_drop=[ID_COLUMN_TO_DROP] if ID_COLUMN_TO_DROP else [])
 print("-" * 50)
 
 
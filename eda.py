@@ -2,6 +2,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import matplotlib.cbook as cbook
+import os
+import time
+import hashlib
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from eda_sketches import CHUNK_SIZE, MAX_PLOT_CATEGORIES, sketch_csv, sketch_frame
+from eda_cache import EDACache, cached_sketch_csv
+from correlation_engine import MAX_PLOT_COLUMNS, clustered_view
 
 
 # Set a professional plotting style
@@ -9,176 +18,448 @@ plt.style.use('seaborn-v0_8-whitegrid')
 # Use the 'viridis' palette by default for color consistency
 sns.set_palette('viridis')
 
+# Processes used to render the plot jobs (1 = render serially in this process)
+N_PLOT_WORKERS = os.cpu_count() or 1
+# Values shown for columns with more than MAX_PLOT_CATEGORIES categories
+TOP_K_HIGH_CARDINALITY = 20
+# Directory for per-column sketches and rendered plots of streamed files (None disables caching)
+EDA_CACHE_DIR = 'eda_cache'
 
 
 
-def run_generalized_eda_pipeline(df):
+
+def run_generalized_eda_pipeline(df, n_workers=N_PLOT_WORKERS):
     """
     Performs a comprehensive Exploratory Data Analysis (EDA) on any DataFrame
     by automatically detecting column types and generating relevant visualizations.
-   
+
+    The DataFrame is summarized into the same streaming sketches used by
+    run_streaming_eda_pipeline, and every plot is rendered from them.
     The function saves all plots as PNG files in the current directory.
 
 
     Args:
         df (pd.DataFrame): The input DataFrame to analyze.
+        n_workers (int): Processes used to render the plots.
     """
     if df.empty:
         print("Error: The DataFrame is empty. Cannot run EDA.")
         return
 
 
-    print("\n" + "="*50)
-    print("--- Starting Generalized Exploratory Data Analysis (EDA) ---")
-    print("="*50)
-   
-    # 1. DATA TYPE SEGREGATION
-   
-    # Identify numeric and object (string/categorical) columns
-    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
-    object_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-   
-    print(f"Total Columns: {len(df.columns)}")
-    print(f"Numeric Columns Found: {len(numeric_cols)}")
-    print(f"Categorical/Object Columns Found: {len(object_cols)}")
-    print("-" * 50)
+    render_eda_report(sketch_frame(df), n_workers)
 
 
 
 
-    # 2. NUMERIC VISUALIZATIONS (Histograms, Boxplots, Correlation)
-    if numeric_cols:
-        print("Generating Numeric Visualizations...")
-       
-        # --- A. Histograms (Distribution) ---
-        df[numeric_cols].hist(bins=20, figsize=(15, 10), edgecolor='black')
-        plt.suptitle('Distribution of Numeric Columns (Histograms)', y=1.02, fontsize=16)
-        plt.tight_layout(rect=[0, 0.03, 1, 0.98])
-        plt.savefig("eda_numeric_histograms.png")
-        plt.close()
-        print(" - Saved eda_numeric_histograms.png")
-
-
-        # --- B. Boxplots (Outliers and Quartiles) ---
-        num_plots = len(numeric_cols)
-        fig, axes = plt.subplots(ncols=num_plots, figsize=(4 * num_plots, 6))
-       
-        # Handle case where there is only one numeric column
-        if num_plots == 1:
-            axes = [axes]
-
-
-        for i, col in enumerate(numeric_cols):
-            sns.boxplot(y=df[col], ax=axes[i], color=sns.color_palette()[i % 6])
-            axes[i].set_title(col, fontsize=12)
-            axes[i].set_ylabel(None)
-       
-        plt.suptitle('Outlier Detection (Boxplots)', y=1.02, fontsize=16)
-        plt.tight_layout()
-        plt.savefig("eda_numeric_boxplots.png")
-        plt.close()
-        print(" - Saved eda_numeric_boxplots.png")
-
-
-        # --- C. Correlation Heatmap (If more than one numeric feature exists) ---
-        if len(numeric_cols) > 1:
-            print(" - Generating Correlation Heatmap...")
-            plt.figure(figsize=(10, 8))
-            corr = df[numeric_cols].corr()
-            sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5, linecolor='black')
-            plt.title('Correlation Heatmap of Numeric Features', fontsize=16)
-            plt.tight_layout()
-            plt.savefig("eda_correlation_heatmap.png")
-            plt.close()
-            print(" - Saved eda_correlation_heatmap.png")
-       
-        # --- D. Pairplot (Scatter matrix for quick bivariate look) ---
-        if len(numeric_cols) < 6 and len(numeric_cols) > 1: # Limit for performance/readability
-            print(" - Generating Pairplot...")
-            sns.pairplot(df[numeric_cols])
-            plt.suptitle('Pairplot of Numeric Columns', y=1.02, fontsize=16)
-            plt.tight_layout()
-            plt.savefig("eda_numeric_pairplot.png")
-            plt.close()
-            print(" - Saved eda_numeric_pairplot.png")
+def run_streaming_eda_pipeline(path, chunksize=CHUNK_SIZE, rename=None, n_workers=N_PLOT_WORKERS,
+                               cache_dir=EDA_CACHE_DIR):
+    """
+    Runs the same EDA as run_generalized_eda_pipeline directly on a CSV file,
+    reading it once in chunks. Memory is bounded by the chunk size and the
+    fixed-size sketches, so files larger than RAM can be profiled.
 
+    With a cache directory, sketches are cached per column fingerprint and
+    plots per input: a rerun recomputes only the changed columns (and the
+    correlation entries they touch) and re-renders only the plots whose
+    input changed. Use `python eda_cache.py diff` to compare versions.
 
 
+    Args:
+        path (str): CSV file to analyze.
+        chunksize (int): Rows read per chunk.
+        rename (dict): Optional column renames applied while reading.
+        n_workers (int): Processes used to render the plots.
+        cache_dir (str): Cache directory (None rebuilds everything).
 
-    # 3. CATEGORICAL VISUALIZATIONS (Count Plots)
-    if object_cols:
-        print("\nGenerating Categorical Visualizations...")
-       
-        # Plot only columns with a reasonable number of unique values (e.g., max 50 categories)
-        plottable_object_cols = [col for col in object_cols if df[col].nunique() <= 50]
-        non_plottable_count = len(object_cols) - len(plottable_object_cols)
-       
-        if non_plottable_count > 0:
-            print(f" - Skipped {non_plottable_count} columns with > 50 unique categories (too dense for bar plots).")
+
+    Returns:
+        EDASketch: The sketches the report was rendered from.
+    """
+    cache = None
+    if cache_dir:
+        print(f"Building EDA sketches from '{path}' using the cache in '{cache_dir}'...")
+        cache = EDACache(cache_dir)
+        sketch, _ = cached_sketch_csv(path, chunksize=chunksize, rename=rename, cache_dir=cache_dir)
+    else:
+        print(f"Building EDA sketches from '{path}' in a single pass (chunks of {chunksize} rows)...")
+        sketch = sketch_csv(path, chunksize=chunksize, rename=rename)
+    if sketch is None or sketch.n_rows == 0:
+        print("Error: The file contains no rows. Cannot run EDA.")
+        return None
+
+
+    render_eda_report(sketch, n_workers, cache)
+    return sketch
+
+
+
+
+def _safe_name(col):
+    return col.replace('/', '_').replace(' ', '_')
+
+
+
+
+def _box_stats(sketch, j):
+    """
+    Box-plot statistics for numeric column j: box, whiskers and fliers from its
+    reservoir sample, with the exact min/max added as fliers when they lie
+    beyond the whiskers (the sample may have missed them).
+    """
+    sample = sketch.samples[j].values
+    if len(sample) == 0:
+        return {'med': np.nan, 'q1': np.nan, 'q3': np.nan, 'whislo': np.nan, 'whishi': np.nan, 'fliers': []}
+    stats = cbook.boxplot_stats(sample, whis=1.5)[0]
+    lo, hi = sketch.moments.min[j], sketch.moments.max[j]
+    extremes = [v for v in (lo, hi) if (v < stats['whislo'] or v > stats['whishi']) and v not in stats['fliers']]
+    stats['fliers'] = np.concatenate([stats['fliers'], extremes])
+    return stats
+
+
+
+
+# --- Plot jobs ---
+# Each job draws one PNG from a small payload of pre-aggregated arrays and bounded
+# samples (never the full data), so jobs are independent and can run in separate processes.
+
+
+def _init_plot_worker():
+    """Process-pool initializer: non-interactive backend plus the shared style."""
+    plt.switch_backend('Agg')
+    plt.style.use('seaborn-v0_8-whitegrid')
+    sns.set_palette('viridis')
+
+
+def _plot_histograms(payload):
+    columns = payload['columns']
+    ncols = int(np.ceil(np.sqrt(len(columns))))
+    nrows = int(np.ceil(len(columns) / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(15, 10), squeeze=False)
+    for ax, (col, counts, edges) in zip(axes.flat, columns):
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
+        ax.set_title(col)
+    for ax in axes.flat[len(columns):]:
+        ax.set_visible(False)
+    plt.suptitle('Distribution of Numeric Columns (Histograms)', y=1.02, fontsize=16)
+    plt.tight_layout(rect=[0, 0.03, 1, 0.98])
+    plt.savefig("eda_numeric_histograms.png")
+    plt.close()
+    return "eda_numeric_histograms.png"
+
+
+def _plot_boxplots(payload):
+    columns = payload['columns']
+    num_plots = len(columns)
+    fig, axes = plt.subplots(ncols=num_plots, figsize=(4 * num_plots, 6))
+
+    # Handle case where there is only one numeric column
+    if num_plots == 1:
+        axes = [axes]
+
+    for i, (col, stats) in enumerate(columns):
+        axes[i].bxp([stats], patch_artist=True,
+                    boxprops={'facecolor': sns.color_palette()[i % 6]}, medianprops={'color': 'black'})
+        axes[i].set_title(col, fontsize=12)
+        axes[i].set_xticks([])
+
+    plt.suptitle('Outlier Detection (Boxplots)', y=1.02, fontsize=16)
+    plt.tight_layout()
+    plt.savefig("eda_numeric_boxplots.png")
+    plt.close()
+    return "eda_numeric_boxplots.png"
+
+
+def _plot_heatmap(payload):
+    plt.figure(figsize=(10, 8))
+    if payload['truncated']:
+        # Wide table: clustered view of the columns in the strongest pairs, too dense to annotate
+        sns.heatmap(payload['corr'], cmap='coolwarm', vmin=-1, vmax=1, xticklabels=True, yticklabels=True)
+        plt.title(f"Correlation Heatmap (clustered, {len(payload['corr'])} of {payload['num_columns']} "
+                  f"columns in the strongest pairs)", fontsize=14)
+    else:
+        sns.heatmap(payload['corr'], annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5, linecolor='black')
+        plt.title('Correlation Heatmap of Numeric Features', fontsize=16)
+    plt.tight_layout()
+    plt.savefig("eda_correlation_heatmap.png")
+    plt.close()
+    return "eda_correlation_heatmap.png"
+
+
+def _plot_pairplot(payload):
+    columns, limits = payload['columns'], payload['limits']
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    for r in range(k):
+        for c in range(k):
+            ax = axes[r, c]
+            if r == c:
+                counts, edges = payload['diagonal'][r]
+                ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='white')
+            else:
+                # 2-D histogram with rows = bins of column c (x), columns = bins of column r (y)
+                counts, x_edges, y_edges = payload['pairs'][(min(r, c), max(r, c))]
+                if c > r:
+                    counts, x_edges, y_edges = counts.T, y_edges, x_edges
+                ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap='viridis', shading='flat')
+                ax.set_xlim(*limits[c])
+                ax.set_ylim(*limits[r])
+            if r == k - 1:
+                ax.set_xlabel(columns[c])
+            if c == 0:
+                ax.set_ylabel(columns[r])
+    plt.suptitle('Pairplot of Numeric Columns', y=1.02, fontsize=16)
+    plt.tight_layout()
+    plt.savefig("eda_numeric_pairplot.png")
+    plt.close()
+    return "eda_numeric_pairplot.png"
+
+
+def _plot_category_counts(payload):
+    col, labels, counts = payload['column'], payload['labels'], payload['counts']
+
+    # Calculate dynamic figure height based on category count
+    fig_height = min(12, max(6, len(labels) * 0.4 + 1))
+    plt.figure(figsize=(10, fig_height))
+
+    # Use countplot for general categorical data
+    sns.barplot(y=labels, x=counts, palette='Pastel1', orient='h')
+    if payload.get('lower') is None:
+        shown = f"Top {len(labels)}" if len(labels) == payload['num_categories'] \
+            else f"Top {len(labels)} of {payload['num_categories']:,}"
+        plt.title(f'Frequency of {col} ({shown})', fontsize=14)
+    else:
+        # Approximate counts: whiskers span the guaranteed [lower, upper] count bounds
+        plt.errorbar(counts, range(len(labels)), xerr=[counts - payload['lower'], np.zeros(len(counts))],
+                     fmt='none', ecolor='black', capsize=3)
+        plt.title(f"Frequency of {col} (Top {len(labels)} of ~{payload['num_categories']:,} distinct, approximate)",
+                  fontsize=14)
+    plt.xlabel('Count')
+    plt.ylabel(col)
+    plt.tight_layout()
+    filename = f"eda_categorical_counts_{_safe_name(col)}.png"
+    plt.savefig(filename)
+    plt.close()
+    return filename
+
+
+def _plot_violin(payload):
+    num_col, cat_col, labels = payload['num_col'], payload['cat_col'], payload['labels']
+    plt.figure(figsize=(12, 6))
+    ax = plt.gca()
+    # Long-form data from the per-category stratified samples
+    x = np.repeat(labels, [len(sample) for sample in payload['samples']])
+    y = np.concatenate(payload['samples'])
+    sns.violinplot(x=x, y=y, hue=x, order=labels, palette='viridis', inner='quartile', legend=False, ax=ax)
+    plt.title(f'{num_col} Distribution by Top 10 {cat_col}', fontsize=16)
+    plt.xlabel(cat_col)
+    plt.ylabel(num_col)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig("eda_mixed_violinplot.png")
+    plt.close()
+    return "eda_mixed_violinplot.png"
+
+
+def _code_fingerprint(code):
+    """Bytecode, names and constants of a function's code (nested code objects included)."""
+    consts = tuple(_code_fingerprint(c) if hasattr(c, 'co_code') else c for c in code.co_consts)
+    return code.co_code, code.co_names, consts
+
+
+def _job_key(job):
+    """Cache key of a plot job: a hash of its name, plot function (and its code) and payload."""
+    name, plot_function, payload = job
+    code = _code_fingerprint(plot_function.__code__)   # A changed plot function redraws its cached plots
+    return hashlib.sha1(pickle.dumps((name, plot_function.__name__, code, payload))).hexdigest()[:20]
+
+
+def _render_job(job):
+    name, plot_function, payload = job
+    start = time.perf_counter()
+    filename = plot_function(payload)
+    return name, filename, time.perf_counter() - start
+
+
+
+
+def build_plot_jobs(sketch):
+    """
+    Turns an EDASketch into a list of independent plot jobs.
+
+
+    Args:
+        sketch (EDASketch): Sketches built by sketch_frame or sketch_csv.
 
 
-        for i, col in enumerate(plottable_object_cols):
-            # Calculate dynamic figure height based on category count
-            num_categories = df[col].nunique()
-            fig_height = min(12, max(6, num_categories * 0.4 + 1))
+    Returns:
+        list: (name, plot_function, payload) tuples. Payloads hold only
+              small aggregated arrays (bin counts, top-k counts) and bounded samples.
+    """
+    jobs = []
+    numeric_cols = sketch.numeric_cols
+    object_cols = sketch.categorical_cols
+    # Plot ranges from the exact min/max (all-missing columns get an empty unit range)
+    limits = [(sketch.moments.min[j], sketch.moments.max[j]) if sketch.moments.n[j] else (0.0, 1.0)
+              for j in range(len(numeric_cols))]
+
 
+    # 2. NUMERIC VISUALIZATIONS (Histograms, Boxplots, Correlation, Pairplot)
+    if numeric_cols:
+        histograms = [sketch.histograms[j].rebin(20, *limits[j]) for j in range(len(numeric_cols))]
+        jobs.append(('histograms', _plot_histograms,
+                     {'columns': [(col, *histograms[j]) for j, col in enumerate(numeric_cols)]}))
+        jobs.append(('boxplots', _plot_boxplots,
+                     {'columns': [(col, _box_stats(sketch, j)) for j, col in enumerate(numeric_cols)]}))
 
-            plt.figure(figsize=(10, fig_height))
-           
-            # Use value_counts to get the top 50, then plot
-            top_categories = df[col].value_counts().head(50)
-           
-            # Use countplot for general categorical data
-            sns.barplot(y=top_categories.index, x=top_categories.values, palette='Pastel1', orient='h')
-            plt.title(f'Frequency of {col} (Top {len(top_categories)})', fontsize=14)
-            plt.xlabel('Count')
-            plt.ylabel(col)
-            plt.tight_layout()
-            plt.savefig(f"eda_categorical_counts_{col.replace('/', '_').replace(' ', '_')}.png")
-            plt.close()
-            print(f" - Saved eda_categorical_counts_{col}.png")
+        # Correlation Heatmap (If more than one numeric feature exists)
+        if len(numeric_cols) > 1:
+            truncated = len(numeric_cols) > MAX_PLOT_COLUMNS
+            if truncated:
+                # Strongest pairs reduced tile by tile from the sketch's sums; only the plotted block is built
+                corr = clustered_view(sketch.correlation, MAX_PLOT_COLUMNS, columns=numeric_cols)
+                print(f" - Correlation heatmap limited to the {len(corr)} columns in the strongest pairs (clustered).")
+            else:
+                corr = sketch.correlation_matrix()
+            jobs.append(('correlation heatmap', _plot_heatmap,
+                         {'corr': corr, 'truncated': truncated, 'num_columns': len(numeric_cols)}))
+
+        # Pairplot (Only built for 2-5 numeric columns, for performance/readability)
+        if sketch.pair_histograms:
+            pairs = {key: (hist.counts, hist.edges(0), hist.edges(1)) for key, hist in sketch.pair_histograms.items()}
+            jobs.append(('pairplot', _plot_pairplot,
+                         {'columns': numeric_cols, 'limits': limits, 'diagonal': histograms, 'pairs': pairs}))
 
 
+    # 3. CATEGORICAL VISUALIZATIONS (Count Plots)
+    # Columns with a reasonable number of unique values (e.g., max 50 categories) are plotted in full;
+    # high-cardinality columns get their top values from the heavy-hitter and Count-Min sketches
+    plottable_object_cols = [col for col in object_cols
+                             if sketch.heavy_hitters[col].exact
+                             and sketch.heavy_hitters[col].distinct <= MAX_PLOT_CATEGORIES]
+
+    for col in object_cols:
+        exact = col in plottable_object_cols
+        top_categories = sketch.top_values(col, MAX_PLOT_CATEGORIES if exact else TOP_K_HIGH_CARDINALITY)
+        jobs.append((f'counts: {col}', _plot_category_counts, {
+            'column': col,
+            'labels': top_categories.index.astype(str).tolist(),
+            'counts': top_categories['count'].to_numpy(),
+            'lower': None if sketch.heavy_hitters[col].exact else top_categories['lower'].to_numpy(),
+            'num_categories': int(round(sketch.distinct_count(col)[0])),
+        }))
 
 
     # 4. MIXED VISUALIZATIONS (Numeric vs Categorical)
     if numeric_cols and plottable_object_cols:
-        print("\nGenerating Mixed (Numeric vs. Category) Visualizations...")
-       
         # Violin Plot: Distribution of a numeric column grouped by a categorical column
         # Takes the first column from each list for a sample plot
         num_col = numeric_cols[0]
         cat_col = plottable_object_cols[0]
-       
-        print(f" - Generating Violin Plot for {num_col} vs {cat_col}...")
-
 
-        plt.figure(figsize=(12, 6))
         # Use only top 10 categories for clarity in the violin plot
-        top_cats = df[cat_col].value_counts().nlargest(10).index
-        df_top = df[df[cat_col].isin(top_cats)]
-       
+        category_samples = sketch.category_samples.get(cat_col, {})
+        top_cats = [cat for cat in sketch.heavy_hitters[cat_col].top(10).index
+                    if cat in category_samples and len(category_samples[cat].values)]
+
         # Ensure the column used is not an ID-like column (e.g., Member_number)
-        if df_top[num_col].nunique() > 10:
-            sns.violinplot(x=cat_col, y=num_col, data=df_top, order=top_cats, inner='quartile')
-            plt.title(f'{num_col} Distribution by Top 10 {cat_col}', fontsize=16)
-            plt.xlabel(cat_col)
-            plt.ylabel(num_col)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.savefig("eda_mixed_violinplot.png")
-            plt.close()
-            print(" - Saved eda_mixed_violinplot.png")
+        if top_cats and sketch.distinct_count(num_col)[0] > 10:
+            jobs.append(('violin plot', _plot_violin, {
+                'num_col': num_col,
+                'cat_col': cat_col,
+                'labels': [str(cat) for cat in top_cats],
+                'samples': [category_samples[cat].values for cat in top_cats],
+            }))
+            sizes = [len(category_samples[cat].values) for cat in top_cats]
+            worst = max(category_samples[cat].cdf_error() for cat in top_cats)
+            print(f" - Violin Plot drawn from a stratified sample of {sum(sizes)} rows "
+                  f"({min(sizes)}-{max(sizes)} per category; CDF error <= {worst:.3f} at 95%).")
         else:
-             print(" - Skipping Violin Plot: The numeric column is likely an ID or has too few unique values.")
+             print(f" - Skipping Violin Plot for {num_col} vs {cat_col}: The numeric column is likely an ID or has too few unique values.")
+
+    return jobs
+
+
+
+
+def render_eda_report(sketch, n_workers=N_PLOT_WORKERS, cache=None):
+    """
+    Renders all EDA plots (histograms, boxplots, correlation heatmap,
+    pairplot, count plots and violin plot) from an EDASketch. Each figure is
+    an independent job; with n_workers > 1 the jobs run in a process pool
+    on the Agg backend. Per-plot timings are printed at the end.
+
+
+    Args:
+        sketch (EDASketch): Sketches built by sketch_frame or sketch_csv.
+        n_workers (int): Rendering processes (1 renders in this process).
+        cache (EDACache): Optional plot cache; plots whose payload is unchanged
+                          are copied from it instead of being re-rendered.
+    """
+    print("\n" + "="*50)
+    print("--- Starting Generalized Exploratory Data Analysis (EDA) ---")
+    print("="*50)
+
+    # 1. DATA TYPE SEGREGATION
 
+    # Numeric and object (string/categorical) columns were identified when the sketches were built
+    print(f"Total Rows: {sketch.n_rows}")
+    print(f"Total Columns: {sketch.n_total_cols}")
+    print(f"Numeric Columns Found: {len(sketch.numeric_cols)}")
+    print(f"Categorical/Object Columns Found: {len(sketch.categorical_cols)}")
+    print("-" * 50)
 
+    if sketch.numeric_cols:
+        print("Numeric Summary (streaming moments and t-digest quartiles):")
+        print(sketch.summary().to_string(float_format=lambda v: f"{v:.4g}"))
+        print("-" * 50)
+        print("Distribution Plot Samples (boxplots and violin plot; the summary above uses all rows):")
+        print(sketch.sample_report().to_string(float_format=lambda v: f"{v:.4g}"))
+        print("-" * 50)
+
+    if sketch.categorical_cols:
+        print("Categorical Summary (distinct counts: exact or HyperLogLog; top values: Space-Saving/Count-Min):")
+        print(sketch.categorical_profile().to_string(float_format=lambda v: f"{v:.4g}"))
+        print("-" * 50)
+
+
+    print("Preparing plot jobs...")
+    jobs = build_plot_jobs(sketch)
+    if cache is not None:
+        keys = {job[0]: _job_key(job) for job in jobs}
+        reused = {job[0] for job in jobs if cache.restore_plot(keys[job[0]])}
+        for name in reused:
+            print(f" - Reused cached plot for {name} (input unchanged)")
+        jobs = [job for job in jobs if job[0] not in reused]
+    n_workers = max(1, min(n_workers or 1, len(jobs)))
+    print(f"Rendering {len(jobs)} plots with {n_workers} worker process(es)...")
+
+    start = time.perf_counter()
+    timings = []
+    if n_workers == 1:
+        for job in jobs:
+            timings.append(_render_job(job))
+            print(f" - Saved {timings[-1][1]}")
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_plot_worker) as pool:
+            for future in as_completed([pool.submit(_render_job, job) for job in jobs]):
+                timings.append(future.result())
+                print(f" - Saved {timings[-1][1]}")
+    wall_time = time.perf_counter() - start
+    if cache is not None:
+        for name, filename, _ in timings:
+            cache.store_plot(keys[name], filename)
 
 
     # 5. DATA CLEANUP AND INTERPRETATION
+    print("\nPlot timings:")
+    for name, filename, seconds in sorted(timings, key=lambda t: -t[2]):
+        print(f" - {name:<30} {seconds * 1000:>9.1f} ms")
+    print(f"Total render time: {sum(t[2] for t in timings):.2f}s of work in {wall_time:.2f}s wall-clock.")
     print("\nAll standard EDA plots have been generated and saved as PNG files.")
     print("Check your directory for the generated images.")
     print("="*50)
+    return timings
 
 
 
@@ -188,27 +469,24 @@ def run_generalized_eda_pipeline(df):
 
 def main():
     """
-    Main execution function that loads the data and calls the EDA pipeline.
-   
+    Main execution function that streams the data file through the EDA pipeline.
+
     NOTE: You must adjust the 'DATASET_FILE' name below to match your file.
     """
     # Define your file name here
     DATASET_FILE = 'Groceries_dataset.csv'
-   
-    print(f"Loading data from '{DATASET_FILE}' for EDA...")
+
+    # --- Groceries Dataset specific fixes for column headers (to make it runnable) ---
+    rename = None
+    if DATASET_FILE == 'Groceries_dataset.csv':
+        rename = {'itemDescription': 'ItemDescription'}
+
+    # --- Run the generalized EDA in one chunked pass over the file ---
     try:
-        df = pd.read_csv(DATASET_FILE)
+        run_streaming_eda_pipeline(DATASET_FILE, rename=rename)
     except FileNotFoundError:
         print(f"Error: '{DATASET_FILE}' not found. Please ensure the file exists.")
         return
-       
-    # --- Groceries Dataset specific fixes for column headers (to make it runnable) ---
-    if DATASET_FILE == 'Groceries_dataset.csv':
-        if 'itemDescription' in df.columns:
-            df = df.rename(columns={'itemDescription': 'ItemDescription'})
-           
-    # --- Run the generalized EDA ---
-    run_generalized_eda_pipeline(df)
 
 
 
@@ -0,0 +1,429 @@
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import eda_sketches
+from eda_sketches import CHUNK_SIZE, MAX_PAIRPLOT_COLUMNS, EDASketch
+
+
+# --------------------------------------------------------------------------------
+# Cached, incremental EDA sketches.
+#
+# Every column of a CSV is fingerprinted (content hash + dtype + sketch
+# parameters). Sketch parts are stored content-addressed under the cache
+# directory:
+#   columns/<fp>.pkl             per-column sketches (moments, t-digest, samples, heavy hitters, ...)
+#   pairs/<fp_a>_<fp_b>.pkl      correlation statistics and pairplot histogram of a numeric pair
+#   categories/<fp_c>_<fp_n>.pkl stratified samples of numeric column n per category of column c
+#   manifests/<version>.json     one dataset version: columns, roles and fingerprints
+#   index.json                   file path -> its versions, oldest first
+#   plots/<key>.png              rendered plots, keyed by a hash of the plot's input payload
+# A rerun only re-reads the columns whose fingerprint changed (plus the numeric
+# columns needed for their correlation entries), and any two cached versions
+# can be compared without touching the data.
+# --------------------------------------------------------------------------------
+
+CACHE_DIR = 'eda_cache'
+
+# Parameters that change what a sketch part contains; part of every fingerprint
+SKETCH_PARAMETERS = {name: getattr(eda_sketches, name) for name in (
+    'HIST_BINS', 'PAIR_HIST_BINS', 'TDIGEST_COMPRESSION', 'HEAVY_HITTER_CAPACITY', 'COUNT_MIN_WIDTH',
+    'COUNT_MIN_DEPTH', 'HLL_PRECISION', 'SAMPLE_SIZE', 'STRATUM_SAMPLE_SIZE', 'SAMPLE_SEED', 'MAX_PLOT_CATEGORIES')}
+
+DIFF_CORRELATION_THRESHOLD = 0.1  # |Δr| reported by the diff report
+
+
+def _column_roles(chunk):
+    """Same column roles as EDASketch.for_frame."""
+    numeric_cols = chunk.select_dtypes(include=np.number).columns.tolist()
+    categorical_cols = chunk.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+    return numeric_cols, categorical_cols
+
+
+def fingerprint_csv(path, chunksize=CHUNK_SIZE, rename=None):
+    """
+    Hashes every column of a CSV in one chunked read. Numeric columns are
+    hashed as float64 values and other columns as objects, so the result
+    does not depend on the chunk size.
+
+    Returns:
+        dict: columns, numeric, categorical, dtypes, fingerprints
+              (column -> hex digest) and n_rows.
+    """
+    hashes, info, n_rows = {}, None, 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if rename:
+            chunk = chunk.rename(columns=rename)
+        if info is None:
+            numeric_cols, categorical_cols = _column_roles(chunk)
+            info = {
+                'columns': chunk.columns.tolist(),
+                'numeric': numeric_cols,
+                'categorical': categorical_cols,
+                'dtypes': {col: str(dtype) for col, dtype in chunk.dtypes.items()},
+            }
+            params = json.dumps(SKETCH_PARAMETERS, sort_keys=True)
+            hashes = {col: hashlib.sha1(f"{params}|{info['dtypes'][col]}".encode()) for col in info['columns']}
+        n_rows += len(chunk)
+        for col in info['columns']:
+            if col in info['numeric']:
+                values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                values = chunk[col].to_numpy(dtype=object)
+            hashes[col].update(pd.util.hash_array(values).tobytes())
+    if info is None:
+        return None
+    info['fingerprints'] = {col: h.hexdigest()[:20] for col, h in hashes.items()}
+    info['n_rows'] = n_rows
+    return info
+
+
+class EDACache:
+    """Content-addressed store of sketch parts and dataset manifests (see module comment)."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        for sub in ('columns', 'pairs', 'categories', 'manifests', 'plots'):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+
+    def _path(self, kind, key, ext='.pkl'):
+        return os.path.join(self.cache_dir, kind, key + ext)
+
+    def has(self, kind, key):
+        return os.path.exists(self._path(kind, key))
+
+    def load(self, kind, key):
+        with open(self._path(kind, key), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, kind, key, obj):
+        tmp = self._path(kind, key, '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(kind, key))
+
+    # --- Manifests ---
+
+    def _read_index(self):
+        index_file = os.path.join(self.cache_dir, 'index.json')
+        if not os.path.exists(index_file):
+            return {}
+        with open(index_file) as f:
+            return json.load(f)
+
+    def versions(self, path):
+        """Version ids of a file, oldest first."""
+        return self._read_index().get(os.path.abspath(path), [])
+
+    def load_manifest(self, version):
+        with open(self._path('manifests', version, '.json')) as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        with open(self._path('manifests', manifest['version'], '.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        index = self._read_index()
+        history = index.setdefault(os.path.abspath(manifest['path']), [])
+        if not history or history[-1] != manifest['version']:
+            history.append(manifest['version'])
+        with open(os.path.join(self.cache_dir, 'index.json'), 'w') as f:
+            json.dump(index, f, indent=2)
+
+    def resolve(self, ref):
+        """A version id (or unique prefix), or a file path meaning its latest cached version."""
+        if os.path.exists(ref):
+            history = self.versions(ref)
+            if not history:
+                raise ValueError(f"'{ref}' has no cached EDA version yet; run the EDA on it first.")
+            return history[-1]
+        matches = [name[:-5] for name in os.listdir(os.path.join(self.cache_dir, 'manifests'))
+                   if name.startswith(ref) and name.endswith('.json')]
+        if len(matches) != 1:
+            raise ValueError(f"'{ref}' matches {len(matches)} cached versions.")
+        return matches[0]
+
+    # --- Rendered plots ---
+
+    def _plot_index(self):
+        index_file = os.path.join(self.cache_dir, 'plots', 'index.json')
+        if not os.path.exists(index_file):
+            return {}
+        with open(index_file) as f:
+            return json.load(f)
+
+    def restore_plot(self, key):
+        """Copies a cached PNG back to its output file; returns the file name, or None if not cached."""
+        filename = self._plot_index().get(key)
+        if filename is None or not os.path.exists(self._path('plots', key, '.png')):
+            return None
+        shutil.copyfile(self._path('plots', key, '.png'), filename)
+        return filename
+
+    def store_plot(self, key, filename):
+        shutil.copyfile(filename, self._path('plots', key, '.png'))
+        index = self._plot_index()
+        index[key] = filename
+        with open(os.path.join(self.cache_dir, 'plots', 'index.json'), 'w') as f:
+            json.dump(index, f, indent=2)
+
+    # --- Sketch parts ---
+
+    @staticmethod
+    def _pair_key(manifest, a, b):
+        fp = manifest['fingerprints']
+        return f"{fp[a]}_{fp[b]}"
+
+    @staticmethod
+    def _category_key(manifest, col):
+        fp = manifest['fingerprints']
+        return f"{fp[col]}_{fp[manifest['numeric'][0]]}"
+
+    def missing_parts(self, manifest):
+        """
+        What must be recomputed so that every part of `manifest` is cached.
+
+        Returns:
+            tuple: (columns whose sketches must be recomputed, categorical
+                    columns whose stratified samples of numeric[0] must be)
+        """
+        numeric, fresh, resample = manifest['numeric'], set(), set()
+        for col in numeric + manifest['categorical']:
+            if not self.has('columns', manifest['fingerprints'][col]):
+                fresh.add(col)
+        for col in numeric:   # Parts cached before numeric columns had a distinct counter
+            if col not in fresh and 'distinct_counter' not in self.load('columns', manifest['fingerprints'][col]):
+                fresh.add(col)
+        needs_histograms = 1 < len(numeric) <= MAX_PAIRPLOT_COLUMNS
+        for i, a in enumerate(numeric):
+            for b in numeric[i + 1:]:
+                if a in fresh or b in fresh:
+                    continue
+                key = self._pair_key(manifest, a, b)
+                if not self.has('pairs', key) or (needs_histograms and self.load('pairs', key)['histogram'] is None):
+                    fresh.update((a, b))
+        if numeric:
+            # Keyed on both fingerprints: a new numeric[0] redoes every sample, but not the columns' own sketches
+            for col in manifest['categorical']:
+                if not self.has('categories', self._category_key(manifest, col)):
+                    resample.add(col)
+        return fresh, resample
+
+    def store_parts(self, manifest, sketch, fresh, resample):
+        """Saves the parts a partial sketch over the `fresh` columns and `resample` samples produced."""
+        for col in fresh:
+            self.save('columns', manifest['fingerprints'][col], sketch.column_part(col))
+        numeric = sketch.numeric_cols
+        for i, a in enumerate(numeric):
+            for b in numeric[i + 1:]:
+                if a in fresh or b in fresh:
+                    self.save('pairs', self._pair_key(manifest, a, b), sketch.pair_part(a, b))
+        # None marks a column whose samples were dropped for having too many categories
+        for col in resample:
+            self.save('categories', self._category_key(manifest, col), sketch.category_samples_part(col))
+
+    def assemble(self, manifest):
+        """Builds the full EDASketch of a cached dataset version from its parts alone."""
+        numeric, categorical = manifest['numeric'], manifest['categorical']
+        fp = manifest['fingerprints']
+        columns = {col: self.load('columns', fp[col]) for col in numeric + categorical}
+        pairs = {(a, b): self.load('pairs', self._pair_key(manifest, a, b))
+                 for i, a in enumerate(numeric) for b in numeric[i + 1:]}
+        category_samples = {col: self.load('categories', self._category_key(manifest, col))
+                            for col in categorical} if numeric else {}
+        return EDASketch.from_parts(numeric, categorical, len(manifest['columns']), manifest['n_rows'],
+                                    columns, pairs, category_samples)
+
+
+def cached_sketch_csv(path, chunksize=CHUNK_SIZE, rename=None, cache_dir=CACHE_DIR, verbose=True):
+    """
+    Drop-in replacement for eda_sketches.sketch_csv that reuses cached sketch
+    parts. If the file's size and modification time match its latest cached
+    version, nothing is read; otherwise the columns are fingerprinted and
+    only the columns with new fingerprints are re-sketched (reading just
+    those columns plus the numeric columns their correlation entries need).
+
+    Returns:
+        tuple: (EDASketch, manifest dict), or (None, None) for an empty file.
+    """
+    cache = EDACache(cache_dir)
+    stat = os.stat(path)
+    file_state = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'rename': rename or {}}
+    start = time.perf_counter()
+
+    history = cache.versions(path)
+    manifest = cache.load_manifest(history[-1]) if history else None
+    if manifest is None or manifest['file_state'] != file_state:
+        info = fingerprint_csv(path, chunksize, rename)
+        if info is None:
+            return None, None
+        version = hashlib.sha1(json.dumps([info['columns'], info['fingerprints']]).encode()).hexdigest()[:12]
+        manifest = dict(info, version=version, path=path, file_state=file_state, created=time.strftime('%Y-%m-%d %H:%M:%S'))
+        if verbose:
+            print(f"Fingerprinted {len(info['columns'])} columns of '{path}' in {time.perf_counter() - start:.2f}s "
+                  f"(version {version}).")
+
+    fresh, resample = cache.missing_parts(manifest)
+    sketched = manifest['numeric'] + manifest['categorical']
+    if verbose:
+        reused = [col for col in sketched if col not in fresh]
+        print(f"EDA cache: {len(reused)} column(s) unchanged, {len(fresh)} to recompute"
+              + (f": {sorted(fresh)}" if fresh else ".")
+              + (f" Stratified samples to recompute: {len(resample)}." if resample - fresh else ""))
+
+    if fresh or resample:
+        numeric = manifest['numeric']
+        needed = fresh | resample
+        if fresh & set(numeric):
+            needed.update(numeric)                       # correlation entries of the changed columns
+        if resample:
+            needed.add(numeric[0])                       # stratified samples for the violin plot
+        usecols = [col for col in manifest['columns'] if col in needed]
+        partial = EDASketch([c for c in numeric if c in needed], [c for c in manifest['categorical'] if c in needed],
+                            columns=fresh, sampled=resample)
+        inverse = {new: old for old, new in (rename or {}).items()}
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=[inverse.get(c, c) for c in usecols]):
+            if rename:
+                chunk = chunk.rename(columns=rename)
+            partial.update(chunk)
+        cache.store_parts(manifest, partial, fresh, resample)
+
+    cache.save_manifest(manifest)
+    sketch = cache.assemble(manifest)
+    if verbose:
+        print(f"EDA sketches ready in {time.perf_counter() - start:.2f}s.")
+    return sketch, manifest
+
+
+# --- Diff report ---
+
+
+def _ks_distance(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic between two samples."""
+    if len(a) == 0 or len(b) == 0:
+        return np.nan
+    a, b = np.sort(a), np.sort(b)
+    grid = np.concatenate([a, b])
+    return float(np.abs(np.searchsorted(a, grid, side='right') / len(a)
+                        - np.searchsorted(b, grid, side='right') / len(b)).max())
+
+
+def diff_report(old_ref, new_ref, cache_dir=CACHE_DIR, top_k=5):
+    """
+    Compares two cached dataset versions using only their cached sketches.
+
+    Args:
+        old_ref, new_ref (str): Version ids (or prefixes), or file paths
+                                meaning their latest cached version.
+
+    Returns:
+        str: Text report of added/removed/changed columns, shifts in the
+             numeric summaries and distributions (KS distance between the
+             reservoir samples), changes in categorical cardinality and top
+             values, and correlation changes above DIFF_CORRELATION_THRESHOLD.
+    """
+    cache = EDACache(cache_dir)
+    old = cache.load_manifest(cache.resolve(old_ref))
+    new = cache.load_manifest(cache.resolve(new_ref))
+    old_sketch, new_sketch = cache.assemble(old), cache.assemble(new)
+
+    lines = [f"EDA diff: {old['path']} @ {old['version']} ({old['created']}) -> "
+             f"{new['path']} @ {new['version']} ({new['created']})",
+             f"Rows: {old['n_rows']} -> {new['n_rows']} ({new['n_rows'] - old['n_rows']:+d})"]
+    added = [col for col in new['columns'] if col not in old['columns']]
+    removed = [col for col in old['columns'] if col not in new['columns']]
+    common = [col for col in new['columns'] if col in old['columns']]
+    changed = [col for col in common if old['fingerprints'][col] != new['fingerprints'][col]]
+    lines.append(f"Columns: {len(common) - len(changed)} unchanged, {len(changed)} changed, "
+                 f"{len(added)} added, {len(removed)} removed")
+    for label, cols in (('Added', added), ('Removed', removed)):
+        if cols:
+            lines.append(f" - {label}: {cols}")
+    retyped = [f"{col} ({old['dtypes'][col]} -> {new['dtypes'][col]})" for col in changed
+               if old['dtypes'][col] != new['dtypes'][col]]
+    if retyped:
+        lines.append(f" - Type changes: {retyped}")
+
+    numeric = [col for col in changed if col in old['numeric'] and col in new['numeric']]
+    if numeric:
+        old_summary, new_summary = old_sketch.summary(), new_sketch.summary()
+        rows = {}
+        for col in numeric:
+            ks = _ks_distance(old_sketch.samples[old['numeric'].index(col)].values,
+                              new_sketch.samples[new['numeric'].index(col)].values)
+            rows[col] = {
+                'count': f"{old_summary.at[col, 'count']} -> {new_summary.at[col, 'count']}",
+                'missing': f"{old_summary.at[col, 'missing']} -> {new_summary.at[col, 'missing']}",
+                'mean': f"{old_summary.at[col, 'mean']:.4g} -> {new_summary.at[col, 'mean']:.4g}",
+                'std': f"{old_summary.at[col, 'std']:.4g} -> {new_summary.at[col, 'std']:.4g}",
+                'median': f"{old_summary.at[col, '50%']:.4g} -> {new_summary.at[col, '50%']:.4g}",
+                'KS distance': f"{ks:.3f}",
+            }
+        lines += ['', 'Changed numeric columns:', pd.DataFrame(rows).T.to_string()]
+
+    categorical = [col for col in changed if col in old['categorical'] and col in new['categorical']]
+    if categorical:
+        rows = {}
+        for col in categorical:
+            old_distinct, _ = old_sketch.distinct_count(col)
+            new_distinct, _ = new_sketch.distinct_count(col)
+            old_top = old_sketch.top_values(col, top_k).index
+            new_top = new_sketch.top_values(col, top_k).index
+            rows[col] = {
+                'non-null': f"{old_sketch.heavy_hitters[col].total} -> {new_sketch.heavy_hitters[col].total}",
+                'distinct': f"{old_distinct:,.0f} -> {new_distinct:,.0f}",
+                f'new in top {top_k}': [str(v) for v in new_top if v not in old_top],
+                f'left top {top_k}': [str(v) for v in old_top if v not in new_top],
+            }
+        lines += ['', 'Changed categorical columns:', pd.DataFrame(rows).T.to_string()]
+
+    both = [col for col in new['numeric'] if col in old['numeric']]
+    if len(both) > 1:
+        delta = (new_sketch.correlation_matrix().loc[both, both] - old_sketch.correlation_matrix().loc[both, both])
+        moved = [(a, b, delta.at[a, b]) for i, a in enumerate(both) for b in both[i + 1:]
+                 if abs(delta.at[a, b]) >= DIFF_CORRELATION_THRESHOLD]
+        lines += ['', f"Correlation changes (|Δr| >= {DIFF_CORRELATION_THRESHOLD}): {len(moved)}"]
+        lines += [f" - {a} / {b}: {d:+.3f}" for a, b, d in sorted(moved, key=lambda t: -abs(t[2]))]
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Command line access to the cache:
+        python eda_cache.py history Groceries_dataset.csv
+        python eda_cache.py diff <old version or file> <new version or file>
+    With a single file, `diff` compares its last two cached versions.
+    """
+    parser = argparse.ArgumentParser(description="Cached EDA sketches: version history and diff reports.")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    history = commands.add_parser('history', help="List the cached versions of a file.")
+    history.add_argument('path')
+    diff = commands.add_parser('diff', help="Compare two cached dataset versions.")
+    diff.add_argument('old')
+    diff.add_argument('new', nargs='?')
+    args = parser.parse_args()
+
+    cache = EDACache(args.cache_dir)
+    if args.command == 'history':
+        for version in cache.versions(args.path):
+            manifest = cache.load_manifest(version)
+            print(f"{version}  {manifest['created']}  {manifest['n_rows']} rows, {len(manifest['columns'])} columns")
+        return
+
+    old, new = args.old, args.new
+    if new is None:
+        history = cache.versions(old)
+        if len(history) < 2:
+            print(f"Error: '{old}' has fewer than two cached versions.")
+            return
+        old, new = history[-2], history[-1]
+    print(diff_report(old, new, args.cache_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,937 @@
+import pandas as pd
+import numpy as np
+
+
+# --------------------------------------------------------------------------------
+# Streaming sketches behind eda.py.
+#
+# One chunked pass over a CSV collects everything the EDA plots need:
+#   - Welford/Pébay moments, min/max and missing counts per numeric column
+#   - adaptive fixed-bin histograms (1-D per column, 2-D per pair for the pairplot)
+#   - t-digest quantiles for the box plots
+#   - pairwise-complete sums for the correlation matrix (same semantics as df.corr())
+#   - Space-Saving heavy hitters and a Count-Min sketch per categorical column
+#   - a HyperLogLog distinct counter per column (numeric ones gate the violin plot)
+#   - a uniform reservoir sample per numeric column and a stratified sample of
+#     the first numeric column per category, drawn by the box and violin plots
+# Every sketch has bounded size and supports merge(), so partial sketches built
+# from different chunks or processes combine into one.
+# --------------------------------------------------------------------------------
+
+CHUNK_SIZE = 100_000
+HIST_BINS = 256            # Internal resolution of the 1-D histograms (re-binned when plotting)
+PAIR_HIST_BINS = 64        # Resolution of the 2-D histograms used by the pairplot
+TDIGEST_COMPRESSION = 200  # Higher = more centroids = more accurate quantiles
+HEAVY_HITTER_CAPACITY = 1000
+COUNT_MIN_WIDTH = 2048     # Count-Min overestimates a count by at most e/width * N (per row, w.h.p.)
+COUNT_MIN_DEPTH = 5        # ... with failure probability e^-depth
+HLL_PRECISION = 14         # 2^14 registers: ~0.8% standard error, 16 KB per column
+SAMPLE_SIZE = 10_000       # Reservoir size per numeric column
+STRATUM_SAMPLE_SIZE = 2_000  # Reservoir size per category for the stratified samples
+SAMPLE_SEED = 42
+MAX_PLOT_CATEGORIES = 50   # Same limit eda.py uses for count plots
+MAX_PAIRPLOT_COLUMNS = 5   # Same limit eda.py uses for the pairplot
+
+
+class MomentSketch:
+    """
+    Count, mean, central moments M2..M4, min, max and missing count for a set
+    of columns, updated with the chunk-wise Welford/Pébay combination formulas.
+    All statistics are arrays with one entry per column.
+    """
+
+    def __init__(self, n_cols):
+        self.n = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.m3 = np.zeros(n_cols)
+        self.m4 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+        self.missing = np.zeros(n_cols, dtype=np.int64)
+
+    def update(self, X):
+        """Adds a chunk given as a float array (rows, columns) with NaN for missing values."""
+        present = ~np.isnan(X)
+        nb = present.sum(axis=0).astype(np.float64)
+        self.missing += len(X) - nb.astype(np.int64)
+        if not nb.any():
+            return self
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mb = np.where(nb > 0, np.nansum(X, axis=0) / nb, 0.0)
+            d = np.where(present, X - mb, 0.0)
+            d2 = d * d
+            self._combine(nb, mb, d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0))
+        has = nb > 0
+        self.min[has] = np.minimum(self.min[has], np.nanmin(X[:, has], axis=0))
+        self.max[has] = np.maximum(self.max[has], np.nanmax(X[:, has], axis=0))
+        return self
+
+    def _combine(self, nb, mb, m2b, m3b, m4b):
+        na = self.n
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mb - self.mean
+            r = np.where(n > 0, nb / n, 0.0)
+            nab = np.where(n > 0, na * nb / n, 0.0)
+            m2a, m3a = self.m2, self.m3
+            self.m4 = (self.m4 + m4b + delta ** 4 * nab * np.where(n > 0, (na * na - na * nb + nb * nb) / (n * n), 0.0)
+                       + 6 * delta ** 2 * np.where(n > 0, (na * na * m2b + nb * nb * m2a) / (n * n), 0.0)
+                       + 4 * delta * np.where(n > 0, (na * m3b - nb * m3a) / n, 0.0))
+            self.m3 = (m3a + m3b + delta ** 3 * nab * np.where(n > 0, (na - nb) / n, 0.0)
+                       + 3 * delta * np.where(n > 0, (na * m2b - nb * m2a) / n, 0.0))
+            self.m2 = m2a + m2b + delta ** 2 * nab
+            self.mean = self.mean + delta * r
+        self.n = n
+
+    def merge(self, other):
+        self._combine(other.n, other.mean, other.m2, other.m3, other.m4)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.missing += other.missing
+        return self
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(np.where(self.n > 1, self.m2 / (self.n - 1), np.nan))
+
+    def skew(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.m2 > 0, np.sqrt(self.n) * self.m3 / self.m2 ** 1.5, np.nan)
+
+    def kurtosis(self):
+        """Excess kurtosis (0 for a normal distribution)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.m2 > 0, self.n * self.m4 / self.m2 ** 2 - 3.0, np.nan)
+
+
+class AdaptiveHistogram:
+    """
+    Fixed number of equal-width bins per axis whose range grows as data
+    arrives: when a value falls outside, the bin width doubles (adjacent
+    bins are merged pairwise) until the range covers it. Works for 1-D
+    (per column) and 2-D (per column pair) data.
+    """
+
+    def __init__(self, ndim=1, bins=HIST_BINS):
+        if bins % 2:
+            raise ValueError("bins must be even.")
+        self.ndim = ndim
+        self.bins = bins
+        self.counts = np.zeros((bins,) * ndim, dtype=np.int64)
+        self.lo = None
+        self.width = None
+
+    def _grow(self, axis, left):
+        shape = list(self.counts.shape)
+        shape[axis:axis + 1] = [self.bins // 2, 2]
+        merged = self.counts.reshape(shape).sum(axis=axis + 1)
+        counts = np.zeros_like(self.counts)
+        half = [slice(None)] * self.ndim
+        half[axis] = slice(self.bins // 2, None) if left else slice(0, self.bins // 2)
+        counts[tuple(half)] = merged
+        if left:
+            self.lo[axis] -= self.bins * self.width[axis]
+        self.width[axis] *= 2
+        self.counts = counts
+
+    def _cover(self, vmin, vmax):
+        if self.lo is None:
+            span = vmax - vmin
+            self.width = np.where(span > 0, span * (1 + 1e-9) / self.bins, np.maximum(np.abs(vmin), 1.0) / self.bins)
+            self.lo = np.where(span > 0, vmin, vmin - self.width * self.bins / 2)
+            return
+        for axis in range(self.ndim):
+            while vmin[axis] < self.lo[axis]:
+                self._grow(axis, left=True)
+            while vmax[axis] >= self.lo[axis] + self.bins * self.width[axis]:
+                self._grow(axis, left=False)
+
+    def update(self, values, weights=None):
+        """Adds values shaped (n,) for 1-D or (n, ndim); rows with NaN are ignored."""
+        v = np.asarray(values, dtype=np.float64).reshape(len(values), self.ndim)
+        keep = ~np.isnan(v).any(axis=1)
+        v = v[keep]
+        if len(v) == 0:
+            return self
+        self._cover(v.min(axis=0), v.max(axis=0))
+        idx = np.clip(((v - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        flat = np.ravel_multi_index(idx.T, self.counts.shape)
+        w = None if weights is None else np.asarray(weights)[keep]
+        self.counts += np.bincount(flat, weights=w, minlength=self.counts.size).reshape(self.counts.shape).astype(np.int64)
+        return self
+
+    def merge(self, other):
+        """Adds another histogram's counts, re-binned by bin centre."""
+        if other.lo is None:
+            return self
+        grids = np.meshgrid(*[other.centers(a) for a in range(other.ndim)], indexing='ij')
+        centers = np.stack([g.ravel() for g in grids], axis=1)
+        weights = other.counts.ravel()
+        used = weights > 0
+        return self.update(centers[used], weights=weights[used])
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def edges(self, axis=0):
+        return self.lo[axis] + self.width[axis] * np.arange(self.bins + 1)
+
+    def centers(self, axis=0):
+        e = self.edges(axis)
+        return (e[:-1] + e[1:]) / 2
+
+    def rebin(self, n_bins, lo, hi):
+        """1-D counts on n_bins equal bins over [lo, hi] (assigned by fine-bin centre)."""
+        if self.lo is None:
+            return np.zeros(n_bins), np.linspace(lo, hi, n_bins + 1)
+        if hi <= lo:
+            hi = lo + 1.0
+        counts, edges = np.histogram(np.clip(self.centers(), lo, hi), bins=n_bins, range=(lo, hi),
+                                     weights=self.counts)
+        return counts, edges
+
+    def quantile(self, q):
+        """Approximate quantile by linear interpolation inside the fine bins (1-D)."""
+        cdf = np.concatenate([[0], np.cumsum(self.counts)])
+        if cdf[-1] == 0:
+            return np.nan
+        return float(np.interp(q * cdf[-1], cdf, self.edges()))
+
+
+class TDigest:
+    """
+    Merging t-digest for streaming quantiles. Values are buffered and
+    periodically merged into weighted centroids whose size follows the
+    k1 = δ/2π·asin(2q-1) scale function, so the tails (where box-plot
+    whiskers live) keep small, accurate centroids.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=np.float64)
+        keep = ~np.isnan(values)
+        values = values[keep]
+        if len(values) == 0:
+            return self
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)[keep]
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered > 20 * self.compression:
+            self._compress()
+        return self
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [v for v, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        w = np.bincount(groups, weights=weights)
+        m = np.bincount(groups, weights=weights * means)
+        used = w > 0
+        self.weights = w[used]
+        self.means = m[used] / self.weights
+
+    def merge(self, other):
+        other._compress()
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._buffer.append((other.means, other.weights))
+            self._buffered += len(other.means)
+            self._compress()
+        return self
+
+    @property
+    def count(self):
+        self._compress()
+        return float(self.weights.sum())
+
+    def quantile(self, q):
+        """Approximate q-quantile(s) (0 <= q <= 1); exact at 0 and 1."""
+        self._compress()
+        if len(self.means) == 0:
+            return np.nan if np.ndim(q) == 0 else np.full(np.shape(q), np.nan)
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate([[0.0], centers, [total]])
+        y = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(np.asarray(q, dtype=np.float64) * total, x, y)
+        return float(result) if np.ndim(result) == 0 else result
+
+
+class ReservoirSample:
+    """
+    Uniform sample without replacement of at most `size` values from a
+    stream, in the bottom-k form of reservoir sampling: every value gets a
+    uniform random priority and the `size` smallest priorities are kept.
+    This is vectorized per chunk, and two samples of disjoint rows merge
+    into a uniform sample of all rows by keeping the smallest priorities of
+    the union (give partial sketches different seeds so their priorities
+    are independent).
+    """
+
+    def __init__(self, size=SAMPLE_SIZE, rng=None):
+        self.size = size
+        self.rng = rng if rng is not None else np.random.default_rng(SAMPLE_SEED)
+        self.values = np.empty(0)
+        self.priorities = np.empty(0)
+        self.seen = 0
+
+    def _keep(self, values, priorities):
+        if len(values) > self.size:
+            keep = np.argpartition(priorities, self.size)[:self.size]
+            values, priorities = values[keep], priorities[keep]
+        self.values, self.priorities = values, priorities
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.seen += len(values)
+        if len(values):
+            self._keep(np.concatenate([self.values, values]),
+                       np.concatenate([self.priorities, self.rng.random(len(values))]))
+        return self
+
+    def merge(self, other):
+        self.seen += other.seen
+        self._keep(np.concatenate([self.values, other.values]), np.concatenate([self.priorities, other.priorities]))
+        return self
+
+    @property
+    def fraction(self):
+        return len(self.values) / self.seen if self.seen else np.nan
+
+    def cdf_error(self, confidence=0.95):
+        """
+        Dvoretzky-Kiefer-Wolfowitz bound: with the given confidence, the
+        sample CDF is within this distance of the CDF of all values seen
+        (0 when the sample holds every value).
+        """
+        n = len(self.values)
+        if n == 0:
+            return np.nan
+        if n == self.seen:
+            return 0.0
+        return float(np.sqrt(np.log(2 / (1 - confidence)) / (2 * n)))
+
+
+class CorrelationSketch:
+    """
+    Pairwise-complete sums (count, Σx, Σy, Σx², Σy², Σxy per column pair)
+    from which the Pearson matrix is computed exactly like df.corr():
+    each pair only uses rows where both values are present. Values are
+    shifted by a per-column constant taken from the first chunk to avoid
+    catastrophic cancellation in the sums.
+    """
+
+    def __init__(self, n_cols, rows=None):
+        self.shift = None
+        self.n = np.zeros((n_cols, n_cols))
+        self.sx = np.zeros((n_cols, n_cols))    # Σ x_i over rows where j is also present
+        self.sxx = np.zeros((n_cols, n_cols))   # Σ x_i² over rows where j is also present
+        self.sxy = np.zeros((n_cols, n_cols))
+        # Optional column indices: only the pairs touching these columns are accumulated
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+
+    def update(self, X):
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        present = (~np.isnan(X)).astype(np.float64)
+        Z = np.nan_to_num(X - self.shift)
+        if self.rows is None:
+            self.n += present.T @ present
+            self.sx += Z.T @ present
+            self.sxx += (Z * Z).T @ present
+            self.sxy += Z.T @ Z
+            return self
+
+        r = self.rows
+        others = np.ones(X.shape[1], dtype=bool)
+        others[r] = False
+        Pr, Zr = present[:, r], Z[:, r]
+        for sums, A, B in ((self.n, Pr, present), (self.sxy, Zr, Z)):
+            sums[r, :] += A.T @ B
+            sums[:, r] = sums[r, :].T
+        for sums, Q in ((self.sx, Z), (self.sxx, Z * Z)):
+            sums[r, :] += Q[:, r].T @ present
+            sums[np.ix_(others, r)] += Q[:, others].T @ Pr
+        return self
+
+    def merge(self, other):
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+        # Re-express the other sketch's sums with our shift: x' = x + (s_other - s_self)
+        d = other.shift - self.shift
+        sx = other.sx + d[:, None] * other.n
+        self.sxx += other.sxx + 2 * d[:, None] * other.sx + (d ** 2)[:, None] * other.n
+        self.sxy += other.sxy + d[:, None] * other.sx.T + d[None, :] * other.sx + np.outer(d, d) * other.n
+        self.sx += sx
+        self.n += other.n
+        return self
+
+    def pair(self, i, j):
+        """
+        Shift-free statistics of the pair (i, j) over their pairwise-complete
+        rows: count, the two means, the two sums of squared deviations and
+        the co-moment.
+        """
+        n = self.n[i, j]
+        if n == 0:
+            return {'n': 0.0, 'mean': (0.0, 0.0), 'm2': (0.0, 0.0), 'c': 0.0}
+        sx_i, sx_j = self.sx[i, j], self.sx[j, i]
+        return {
+            'n': n,
+            'mean': (self.shift[i] + sx_i / n, self.shift[j] + sx_j / n),
+            'm2': (self.sxx[i, j] - sx_i ** 2 / n, self.sxx[j, i] - sx_j ** 2 / n),
+            'c': self.sxy[i, j] - sx_i * sx_j / n,
+        }
+
+    def set_pair(self, i, j, part):
+        """Stores statistics from pair() as sums relative to this sketch's shift."""
+        n = part['n']
+        d_i = n * (part['mean'][0] - self.shift[i])
+        d_j = n * (part['mean'][1] - self.shift[j])
+        self.n[i, j] = self.n[j, i] = n
+        self.sx[i, j], self.sx[j, i] = d_i, d_j
+        if n:
+            self.sxx[i, j], self.sxx[j, i] = part['m2'][0] + d_i ** 2 / n, part['m2'][1] + d_j ** 2 / n
+            self.sxy[i, j] = self.sxy[j, i] = part['c'] + d_i * d_j / n
+
+    @property
+    def n_cols(self):
+        return len(self.n)
+
+    def _block(self, a, b):
+        """Correlations of the columns at positions a with those at positions b (the diagonal is not set)."""
+        ab, ba = np.ix_(a, b), np.ix_(b, a)
+        n, sx_ab, sx_ba = self.n[ab], self.sx[ab], self.sx[ba].T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * self.sxy[ab] - sx_ab * sx_ba
+            var_a = n * self.sxx[ab] - sx_ab ** 2
+            var_b = n * self.sxx[ba].T - sx_ba ** 2
+            r = cov / np.sqrt(var_a * var_b)
+        return np.clip(r, -1.0, 1.0)
+
+    def tile(self, a0, a1, b0, b1):
+        """Correlations of columns a0:a1 with columns b0:b1, so correlation_engine can reduce them block by block."""
+        return self._block(np.arange(a0, a1), np.arange(b0, b1))
+
+    def select(self, positions):
+        """Correlation matrix of the columns at `positions`."""
+        positions = np.asarray(positions, dtype=np.int64)
+        r = self._block(positions, positions)
+        np.fill_diagonal(r, np.where(np.diag(self.n)[positions] > 1, 1.0, np.nan))
+        return r
+
+    def corr(self):
+        return self.select(np.arange(self.n_cols))
+
+
+class HeavyHitters:
+    """
+    Space-Saving summary of the most frequent values of a column.
+
+    Keeps at most `capacity` (value, count, error) entries. Counts are
+    overestimates by at most `error`; while the column has never had more
+    than `capacity` distinct values, `exact` stays True and the counts (and
+    the distinct count) are exact. Chunks are folded in with the
+    mergeable-summary rule, which is vectorized per chunk.
+    """
+
+    def __init__(self, capacity=HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.exact = True
+
+    def _floor(self):
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def _merge_counts(self, counts, errors, floor):
+        own_floor = self._floor()
+        index = self.counts.index.union(counts.index)
+        merged = (self.counts.reindex(index).fillna(own_floor) + counts.reindex(index).fillna(floor)).astype(np.int64)
+        merged_errors = (self.errors.reindex(index).fillna(own_floor) + errors.reindex(index).fillna(floor)).astype(np.int64)
+        if len(index) > self.capacity:
+            self.exact = False
+            merged = merged.nlargest(self.capacity, keep='first')
+        self.counts = merged.sort_values(ascending=False, kind='stable')
+        self.errors = merged_errors.reindex(self.counts.index)
+
+    def update(self, values):
+        return self.update_counts(pd.Series(values).value_counts())
+
+    def update_counts(self, chunk_counts):
+        """Adds a chunk given as exact per-value counts (a value_counts() Series)."""
+        self.total += int(chunk_counts.sum())
+        self._merge_counts(chunk_counts, pd.Series(0, index=chunk_counts.index, dtype=np.int64), 0)
+        return self
+
+    def merge(self, other):
+        self.total += other.total
+        self.exact = self.exact and other.exact
+        self._merge_counts(other.counts, other.errors, other._floor())
+        return self
+
+    def top(self, k):
+        """The k most frequent values with their (estimated) counts."""
+        return self.counts.head(k)
+
+    def top_bounds(self, k):
+        """
+        The k most frequent values with guaranteed count bounds: every true
+        count lies in [lower, upper]. Any value occurring more than
+        total / capacity times is guaranteed to be in the summary.
+        """
+        top = self.counts.head(k)
+        return pd.DataFrame({'upper': top, 'lower': top - self.errors.reindex(top.index)})
+
+    @property
+    def distinct(self):
+        """Exact distinct count while `exact`; otherwise a lower bound."""
+        return len(self.counts)
+
+
+def _hash_values(values):
+    """Deterministic 64-bit hashes of arbitrary values (same value -> same hash in every chunk/process)."""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch: `depth` rows of `width` counters. Each value increments
+    one counter per row and its count is estimated by the smallest of them,
+    which never underestimates and, with probability 1 - e^-depth, exceeds
+    the true count by at most e / width * total. Row hashes are derived from
+    one 64-bit hash (h1 + i·h2), and sketches merge by adding counters.
+    """
+
+    def __init__(self, width=COUNT_MIN_WIDTH, depth=COUNT_MIN_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, values):
+        h = _hash_values(values)
+        h1, h2 = h & 0xFFFFFFFF, (h >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def update_counts(self, chunk_counts):
+        """Adds a chunk given as exact per-value counts (a value_counts() Series)."""
+        if len(chunk_counts) == 0:
+            return self
+        columns = self._columns(chunk_counts.index)
+        weights = chunk_counts.to_numpy(dtype=np.float64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=weights, minlength=self.width).astype(np.int64)
+        self.total += int(chunk_counts.sum())
+        return self
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def estimate(self, values):
+        """Estimated counts (upper bounds) of the given values."""
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(values)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    @property
+    def error_bound(self):
+        """Additive error bound e / width * total, holding with probability 1 - e^-depth."""
+        return np.e / self.width * self.total
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count estimator with 2^precision one-byte registers.
+    The first `precision` bits of a value's 64-bit hash pick a register, which
+    keeps the largest position of the first 1-bit seen in the remaining bits.
+    Standard error is 1.04 / sqrt(2^precision); small cardinalities use the
+    linear-counting correction. Sketches merge by taking register maxima.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Adds values (duplicates and NaN are harmless; pass unique values to save hashing)."""
+        values = pd.Series(values).dropna()
+        if len(values) == 0:
+            return self
+        h = _hash_values(values)
+        p = self.precision
+        index = (h >> np.uint64(64 - p)).astype(np.int64)
+        rest = (h & np.uint64((1 << (64 - p)) - 1)).astype(np.float64)  # < 2^53, so exact
+        # Rank = leading zeros in the (64 - p)-bit remainder + 1; frexp gives floor(log2(rest)) + 1
+        rank = np.where(rest > 0, (64 - p) - np.frexp(rest)[1] + 1, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self):
+        """Standard error of the estimate, relative to the true count."""
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class EDASketch:
+    """
+    All sketches for one dataset. Column roles are fixed from the first
+    chunk: numeric columns get moments, histograms, t-digests, a HyperLogLog
+    counter and the correlation sums; object/category columns get heavy
+    hitters, a Count-Min sketch, a HyperLogLog counter and, while they have at most
+    MAX_PLOT_CATEGORIES values, a stratified sample of the first numeric
+    column per category (for the violin plot). Memory per column is fixed,
+    however many distinct values it has.
+
+    Passing `columns` builds a partial sketch (used by eda_cache.py to
+    recompute only changed columns): only those columns get their own
+    sketches, the correlation sums and pair histograms are accumulated only
+    for pairs touching them, and the stratified samples only for categorical
+    columns in `sampled` (by default those in `columns`, or all of them if
+    numeric_cols[0] is). A partial sketch supports update() and the *_part()
+    accessors, not the reports.
+    """
+
+    def __init__(self, numeric_cols, categorical_cols, n_total_cols=None, seed=SAMPLE_SEED, columns=None,
+                 sampled=None):
+        self.numeric_cols = list(numeric_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.n_total_cols = n_total_cols or (len(self.numeric_cols) + len(self.categorical_cols))
+        self.n_rows = 0
+        fresh = set(self.numeric_cols + self.categorical_cols) if columns is None else set(columns)
+        fresh_numeric = [j for j, col in enumerate(self.numeric_cols) if col in fresh]
+        k = len(self.numeric_cols)
+        self.moments = MomentSketch(k)
+        self.histograms = [AdaptiveHistogram() if j in fresh_numeric else None for j in range(k)]
+        self.digests = [TDigest() if j in fresh_numeric else None for j in range(k)]
+        self.correlation = CorrelationSketch(k, rows=None if columns is None else fresh_numeric)
+        self.rng = np.random.default_rng(seed)
+        self.samples = [ReservoirSample(SAMPLE_SIZE, self.rng) if j in fresh_numeric else None for j in range(k)]
+        self.pair_histograms = {}
+        if 1 < k <= MAX_PAIRPLOT_COLUMNS:
+            self.pair_histograms = {(i, j): AdaptiveHistogram(ndim=2, bins=PAIR_HIST_BINS)
+                                    for i in range(k) for j in range(i + 1, k)
+                                    if i in fresh_numeric or j in fresh_numeric}
+        # Stratified samples need the column's heavy hitters (for the category limit) even when
+        # only numeric_cols[0] changed
+        sampled = [col for col in self.categorical_cols if self.numeric_cols and (
+            col in sampled if sampled is not None else col in fresh or self.numeric_cols[0] in fresh)]
+        self.heavy_hitters = {col: HeavyHitters() for col in self.categorical_cols if col in fresh or col in sampled}
+        self.count_min = {col: CountMinSketch() for col in self.categorical_cols if col in fresh}
+        self.distinct_counters = {col: HyperLogLog() for col in self.numeric_cols + self.categorical_cols
+                                  if col in fresh}
+        # col -> {category -> sample of numeric_cols[0]}, dropped once col gets too many categories
+        self.category_samples = {col: {} for col in sampled}
+
+    @classmethod
+    def for_frame(cls, df):
+        numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+        return cls(numeric_cols, categorical_cols, len(df.columns))
+
+    def update(self, chunk):
+        """Folds one DataFrame chunk into every sketch."""
+        self.n_rows += len(chunk)
+        if self.numeric_cols:
+            X = chunk[self.numeric_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            self.moments.update(X)
+            self.correlation.update(X)
+            for j in range(X.shape[1]):
+                if self.histograms[j] is None:
+                    continue
+                self.histograms[j].update(X[:, j])
+                self.digests[j].update(X[:, j])
+                self.samples[j].update(X[:, j])
+                self.distinct_counters[self.numeric_cols[j]].update(pd.unique(X[:, j]))
+            for (i, j), hist in self.pair_histograms.items():
+                hist.update(X[:, [i, j]])
+
+        for col in self.heavy_hitters:
+            # One value_counts per chunk feeds all three categorical sketches
+            counts = chunk[col].value_counts()
+            hh = self.heavy_hitters[col].update_counts(counts)
+            if col in self.count_min:
+                self.count_min[col].update_counts(counts)
+                self.distinct_counters[col].update(counts.index)
+            per_category = self.category_samples.get(col)
+            if per_category is None:
+                continue
+            if hh.distinct > MAX_PLOT_CATEGORIES:
+                del self.category_samples[col]
+                continue
+            values = pd.to_numeric(chunk[self.numeric_cols[0]], errors='coerce')
+            for category, group in values.groupby(chunk[col], sort=False):
+                per_category.setdefault(category, ReservoirSample(STRATUM_SAMPLE_SIZE, self.rng)).update(group.to_numpy())
+        return self
+
+    def merge(self, other):
+        """Combines a sketch built over other rows of the same dataset."""
+        self.n_rows += other.n_rows
+        self.moments.merge(other.moments)
+        self.correlation.merge(other.correlation)
+        for mine, theirs in zip(self.histograms, other.histograms):
+            mine.merge(theirs)
+        for mine, theirs in zip(self.digests, other.digests):
+            mine.merge(theirs)
+        for mine, theirs in zip(self.samples, other.samples):
+            mine.merge(theirs)
+        for col in self.numeric_cols:
+            self.distinct_counters[col].merge(other.distinct_counters[col])
+        for key, hist in self.pair_histograms.items():
+            hist.merge(other.pair_histograms[key])
+        for col in self.categorical_cols:
+            self.heavy_hitters[col].merge(other.heavy_hitters[col])
+            self.count_min[col].merge(other.count_min[col])
+            self.distinct_counters[col].merge(other.distinct_counters[col])
+            mine = self.category_samples.get(col)
+            theirs = other.category_samples.get(col)
+            if mine is None or theirs is None or self.heavy_hitters[col].distinct > MAX_PLOT_CATEGORIES:
+                self.category_samples.pop(col, None)
+                continue
+            for category, sample in theirs.items():
+                mine.setdefault(category, ReservoirSample(STRATUM_SAMPLE_SIZE, self.rng)).merge(sample)
+        return self
+
+    def summary(self):
+        """describe()-style table of the numeric columns, from the moments and digests."""
+        m = self.moments
+        return pd.DataFrame({
+            'count': m.n.astype(np.int64),
+            'missing': m.missing,
+            'mean': m.mean,
+            'std': m.std(),
+            'min': m.min,
+            '25%': [d.quantile(0.25) for d in self.digests],
+            '50%': [d.quantile(0.5) for d in self.digests],
+            '75%': [d.quantile(0.75) for d in self.digests],
+            'max': m.max,
+            'skew': m.skew(),
+            'kurtosis': m.kurtosis(),
+        }, index=self.numeric_cols)
+
+    # --- Per-column parts (persisted by eda_cache.py) ---
+
+    _MOMENT_FIELDS = ('n', 'mean', 'm2', 'm3', 'm4', 'min', 'max', 'missing')
+
+    def column_part(self, col):
+        """The sketches that depend on column `col` alone."""
+        if col in self.numeric_cols:
+            j = self.numeric_cols.index(col)
+            return {
+                'moments': {name: getattr(self.moments, name)[j] for name in self._MOMENT_FIELDS},
+                'histogram': self.histograms[j],
+                'digest': self.digests[j],
+                'sample': self.samples[j],
+                'distinct_counter': self.distinct_counters[col],
+            }
+        return {
+            'heavy_hitters': self.heavy_hitters[col],
+            'count_min': self.count_min[col],
+            'distinct_counter': self.distinct_counters[col],
+        }
+
+    def pair_part(self, a, b):
+        """Correlation statistics (and pairplot histogram, if any) of numeric columns a and b, with a before b."""
+        i, j = self.numeric_cols.index(a), self.numeric_cols.index(b)
+        return {'correlation': self.correlation.pair(i, j), 'histogram': self.pair_histograms.get((i, j))}
+
+    def category_samples_part(self, col):
+        """Per-category samples of numeric_cols[0] for categorical `col` (None if it has too many categories)."""
+        return self.category_samples.get(col)
+
+    @classmethod
+    def from_parts(cls, numeric_cols, categorical_cols, n_total_cols, n_rows, columns, pairs, category_samples):
+        """
+        Reassembles a complete sketch from parts.
+
+        Args:
+            columns (dict): column -> column_part().
+            pairs (dict): (a, b) -> pair_part() for every pair of numeric columns, a before b.
+            category_samples (dict): categorical column -> category_samples_part().
+        """
+        sketch = cls(numeric_cols, categorical_cols, n_total_cols, columns=[])
+        sketch.n_rows = n_rows
+        for j, col in enumerate(sketch.numeric_cols):
+            part = columns[col]
+            for name, value in part['moments'].items():
+                getattr(sketch.moments, name)[j] = value
+            sketch.histograms[j] = part['histogram']
+            sketch.digests[j] = part['digest']
+            sketch.samples[j] = part['sample']
+            sketch.samples[j].rng = sketch.rng
+            sketch.distinct_counters[col] = part['distinct_counter']
+
+        m = sketch.moments
+        sketch.correlation.rows = None
+        sketch.correlation.shift = np.nan_to_num(m.mean.copy())
+        for j in range(len(sketch.numeric_cols)):
+            sketch.correlation.set_pair(j, j, {'n': m.n[j], 'mean': (m.mean[j],) * 2, 'm2': (m.m2[j],) * 2, 'c': m.m2[j]})
+        k = len(sketch.numeric_cols)
+        for i in range(k):
+            for j in range(i + 1, k):
+                part = pairs[(sketch.numeric_cols[i], sketch.numeric_cols[j])]
+                sketch.correlation.set_pair(i, j, part['correlation'])
+                if 1 < k <= MAX_PAIRPLOT_COLUMNS:
+                    sketch.pair_histograms[(i, j)] = part['histogram']
+
+        for col in sketch.categorical_cols:
+            part = columns[col]
+            sketch.heavy_hitters[col] = part['heavy_hitters']
+            sketch.count_min[col] = part['count_min']
+            sketch.distinct_counters[col] = part['distinct_counter']
+            if sketch.numeric_cols and category_samples.get(col) is not None:
+                sketch.category_samples[col] = category_samples[col]
+                for sample in category_samples[col].values():
+                    sample.rng = sketch.rng
+        return sketch
+
+    def sample_report(self):
+        """
+        Size and error of the per-column samples behind the distribution
+        plots: values seen, values sampled, the 95% DKW bound on the sample
+        CDF, and the largest gap between the sample quartiles and the
+        t-digest quartiles of all rows, as a fraction of the IQR.
+        """
+        rows = []
+        for j, sample in enumerate(self.samples):
+            q = [0.25, 0.5, 0.75]
+            full = self.digests[j].quantile(q)
+            gap = np.nan
+            if len(sample.values):
+                iqr = full[2] - full[0]
+                gap = np.abs(np.quantile(sample.values, q) - full).max() / iqr if iqr > 0 else 0.0
+            rows.append({'seen': sample.seen, 'sampled': len(sample.values), 'fraction': sample.fraction,
+                         'cdf error (95%)': sample.cdf_error(), 'quartile gap / IQR': gap})
+        return pd.DataFrame(rows, index=self.numeric_cols)
+
+    def distinct_count(self, col):
+        """
+        Distinct values of a column and the standard error of that number.
+        For a categorical column it is exact (error 0) while the heavy-hitter
+        summary has seen every value; otherwise, and for numeric columns, it
+        is the HyperLogLog estimate.
+        """
+        hll = self.distinct_counters[col]
+        if col in self.numeric_cols:
+            estimate = hll.estimate()
+            return estimate, estimate * hll.relative_error
+        hh = self.heavy_hitters[col]
+        if hh.exact:
+            return hh.distinct, 0.0
+        estimate = max(hll.estimate(), hh.distinct)
+        return estimate, estimate * hll.relative_error
+
+    def top_values(self, col, k):
+        """
+        The k most frequent values of a categorical column with count bounds.
+        The upper bound is the tighter of the Space-Saving and Count-Min
+        overestimates; the lower bound is guaranteed by Space-Saving.
+
+        Returns:
+            pd.DataFrame: 'count' (estimate), 'lower' and 'upper' per value.
+        """
+        top = self.heavy_hitters[col].top_bounds(k)
+        if not self.heavy_hitters[col].exact:
+            top['upper'] = np.minimum(top['upper'], self.count_min[col].estimate(top.index))
+        top['lower'] = np.minimum(top['lower'], top['upper'])
+        top.insert(0, 'count', top['upper'])
+        return top
+
+    def categorical_profile(self, k=5):
+        """
+        One row per categorical column: distinct count (± standard error),
+        whether the counts are exact, the most frequent value and the share of
+        rows covered by the k most frequent values.
+        """
+        rows = []
+        for col in self.categorical_cols:
+            distinct, error = self.distinct_count(col)
+            top = self.top_values(col, k)
+            total = self.heavy_hitters[col].total
+            rows.append({
+                'non-null': total,
+                'missing': self.n_rows - total,
+                'distinct': int(round(distinct)),
+                '± (1 s.e.)': int(round(error)),
+                'exact': self.heavy_hitters[col].exact,
+                'top value': top.index[0] if len(top) else None,
+                'top count': int(top['count'].iloc[0]) if len(top) else 0,
+                f'top-{k} share': top['count'].sum() / total if total else np.nan,
+            })
+        return pd.DataFrame(rows, index=self.categorical_cols)
+
+    def correlation_matrix(self):
+        return pd.DataFrame(self.correlation.corr(), index=self.numeric_cols, columns=self.numeric_cols)
+
+
+def sketch_frame(df):
+    """Builds the sketches of an in-memory DataFrame (a single chunk)."""
+    return EDASketch.for_frame(df).update(df)
+
+
+def sketch_csv(path, chunksize=CHUNK_SIZE, rename=None, **read_csv_kwargs):
+    """
+    Builds the sketches of a CSV in one chunked read; memory is bounded by
+    the chunk size plus the (fixed-size) sketches.
+
+    Args:
+        path (str): CSV file.
+        chunksize (int): Rows per chunk.
+        rename (dict): Optional column renames applied to every chunk.
+        **read_csv_kwargs: Passed through to pd.read_csv.
+
+    Returns:
+        EDASketch: The populated sketches (None if the file has no rows).
+    """
+    sketch = None
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        if rename:
+            chunk = chunk.rename(columns=rename)
+        if sketch is None:
+            sketch = EDASketch.for_frame(chunk)
+        sketch.update(chunk)
+    return sketch
@@ -0,0 +1,336 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import etl
+
+
+# --------------------------------------------------------------------------------
+# Pipelined ETL: extract -> transform -> load with bounded queues.
+#
+#   extractor thread    reads the sales CSV in chunks, keeps rows above the watermark
+#        | extract queue (bounded)
+#   transform stage     etl.transform_sales() on a process pool, results kept in chunk order
+#        | load queue (bounded)
+#   writer thread       opens the only SQLite connection of the load: date keys
+#                       (etl.KeyMap), facts, dim_date, quarantined sales and the
+#                       watermark are committed together per chunk
+#
+# A full queue blocks the stage feeding it, so memory is capped at roughly
+# (queue sizes + workers) chunks no matter how large the source is. A failing
+# stage sets a shared stop event: the other stages stop waiting on the queues
+# and the transforms still pending are cancelled. Chunks are committed in file
+# order, so after a failure the next run resumes from the last committed
+# watermark. Each stage runs concurrently, so the total time tends to the
+# slowest stage instead of the sum of all three.
+# --------------------------------------------------------------------------------
+
+CHUNK_SIZE = 100_000
+QUEUE_SIZE = 4                    # Chunks waiting between two stages
+N_WORKERS = os.cpu_count() or 1
+MONITOR_INTERVAL = 0.01           # Seconds between queue-depth samples
+POLL_INTERVAL = 0.1               # Seconds a blocked queue operation waits before checking the stop event
+
+_DONE = object()                  # End-of-stream marker passed down the queues
+
+
+class StageStats:
+    """Rows handled and busy time (excluding waits on the queues) of one stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.busy = 0.0
+
+    def add(self, rows, seconds):
+        self.rows += rows
+        self.busy += seconds
+
+    @property
+    def throughput(self):
+        return self.rows / self.busy if self.busy else float('nan')
+
+
+class QueueMonitor(threading.Thread):
+    """Samples the depth of the pipeline queues until stopped."""
+
+    def __init__(self, queues, interval=MONITOR_INTERVAL):
+        super().__init__(daemon=True)
+        self.queues = queues
+        self.interval = interval
+        self.samples = {name: [] for name in queues}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            for name, q in self.queues.items():
+                self.samples[name].append(q.qsize())
+
+    def summary(self):
+        return {name: (float(np.mean(depths)) if depths else 0.0, max(depths, default=0))
+                for name, depths in self.samples.items()}
+
+
+_worker_products = None
+
+
+def _init_worker(products):
+    global _worker_products
+    _worker_products = products
+
+
+def _extent(chunk):
+    """(last sale_id, last date) of an extracted chunk: the watermark once it is committed."""
+    return int(chunk['sale_id'].max()), chunk['date'].max().strftime('%Y-%m-%d')
+
+
+def _transform_chunk(args):
+    """Worker: the stateless transform of one chunk, with its rejected sales, extent and compute time."""
+    seq, chunk = args
+    start = time.perf_counter()
+    sales, rejected = etl.split_unknown_products(chunk, _worker_products)
+    facts = etl.transform_sales(sales, _worker_products)
+    return seq, facts, rejected, _extent(chunk), len(chunk), time.perf_counter() - start
+
+
+def _read_chunks(path, watermark, chunksize, stats):
+    """Source chunks above the watermark, timing the reads."""
+    reader = pd.read_csv(path, chunksize=chunksize, parse_dates=['date'])
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        new = etl.extract_new_sales(chunk, watermark)
+        stats.add(len(chunk), time.perf_counter() - start)
+        if len(new):
+            yield new
+
+
+class _Writer:
+    """Owns the connection: assigns date keys and commits one chunk per transaction."""
+
+    def __init__(self, conn, stats):
+        self.conn = conn
+        self.stats = stats
+        self.dates = etl.KeyMap.load(conn, 'dim_date', 'date', 'date_id', convert=etl._day_numbers)
+        self.watermark = etl.read_watermark(conn)
+        self.rows = 0
+
+    def write(self, facts, rejected, extent=None):
+        """
+        Commits the facts and rejected sales of one chunk and advances the
+        watermark to the chunk's extent, even when none of its sales loaded.
+        With extent=None the rows are a retry of the quarantined sales, which
+        replace the quarantine and leave the watermark where it is.
+        """
+        start = time.perf_counter()
+        with self.conn:
+            if len(facts):
+                fact_sales, dim_date = etl.assign_date_keys(facts, self.dates)
+                etl.bulk_insert(self.conn, 'dim_date', dim_date)
+                etl.insert_facts(self.conn, fact_sales)
+                self.rows += len(fact_sales)
+            if extent is None:
+                self.conn.execute(f"DELETE FROM {etl.REJECTS_TABLE}")
+            etl.quarantine_sales(self.conn, rejected)
+            if extent is not None:
+                last_sale_id, last_date = extent
+                self.watermark = etl.write_watermark(self.conn, last_sale_id,
+                                                     max(last_date, self.watermark[1] or ''), self.rows)
+        self.stats.add(len(facts), time.perf_counter() - start)
+
+    def retry_rejected(self, products):
+        """Loads the quarantined sales whose product is now in `products`."""
+        sales, rejected = etl.split_unknown_products(etl.read_rejected_sales(self.conn), products)
+        if len(sales):
+            self.write(etl.transform_sales(sales, products), rejected)
+
+
+def _prepare(db_path, products):
+    """Creates the schema and upserts the products; returns the stored watermark."""
+    conn = sqlite3.connect(db_path)
+    try:
+        if etl.is_legacy_layout(conn):
+            raise ValueError(f"'{db_path}' has the legacy warehouse layout; run 'python etl.py --full' once first.")
+        conn.executescript(etl.SCHEMA)
+        with conn:
+            etl.upsert_dimension(conn, 'dim_product', products, 'product_id')
+        return etl.read_watermark(conn)
+    finally:
+        conn.close()
+
+
+def run_pipeline(db_path, sales_path, products, chunksize=CHUNK_SIZE, n_workers=N_WORKERS, queue_size=QUEUE_SIZE):
+    """
+    Loads the sales CSV above the stored watermark through the pipeline.
+
+    Args:
+        db_path (str): Warehouse database; the writer thread opens its own connection to it.
+        sales_path (str): Source sales CSV (sale_id, date, product_id, branch_id, customer_id, quantity).
+        products (pd.DataFrame): Product dimension; upserted first and sent once to each worker.
+
+    Returns:
+        dict: Per-stage StageStats, queue depth summary, total seconds and the final watermark.
+    """
+    watermark = _prepare(db_path, products)
+    stats = {name: StageStats(name) for name in ('extract', 'transform', 'load')}
+    extract_q, load_q = queue.Queue(queue_size), queue.Queue(queue_size)
+    errors = []
+    stop = threading.Event()   # Set by the first failing stage
+
+    def fail(e):
+        errors.append(e)
+        stop.set()
+
+    def put(q, item):
+        """q.put() that gives up once the pipeline stops; True if the item was queued."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q):
+        """q.get() that returns _DONE once the pipeline stops."""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def extractor():
+        try:
+            for seq, chunk in enumerate(_read_chunks(sales_path, watermark, chunksize, stats['extract'])):
+                if not put(extract_q, (seq, chunk)):
+                    break
+        except Exception as e:
+            fail(e)
+        finally:
+            put(extract_q, _DONE)
+
+    def transformer(pool):
+        # Up to n_workers chunks in flight; results leave in submission (= file) order
+        in_flight = deque()
+        try:
+            while not stop.is_set():
+                item = get(extract_q)
+                if item is not _DONE:
+                    in_flight.append(pool.submit(_transform_chunk, item))
+                while in_flight and (item is _DONE or len(in_flight) >= n_workers):
+                    _, facts, rejected, extent, rows, seconds = in_flight.popleft().result()
+                    stats['transform'].add(rows, seconds)
+                    put(load_q, (facts, rejected, extent))
+                if item is _DONE:
+                    break
+        except Exception as e:
+            fail(e)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            put(load_q, _DONE)
+
+    result = {'watermark': watermark}
+
+    def loader():
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                with etl.loading_mode(conn):
+                    writer = _Writer(conn, stats['load'])
+                    writer.retry_rejected(products)
+                    while (item := get(load_q)) is not _DONE:
+                        writer.write(*item)
+                        result['watermark'] = writer.watermark
+            finally:
+                conn.close()
+        except Exception as e:
+            fail(e)
+
+    monitor = QueueMonitor({'extract -> transform': extract_q, 'transform -> load': load_q})
+    start = time.perf_counter()
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(products,)) as pool:
+        monitor.start()
+        threads = [threading.Thread(target=extractor), threading.Thread(target=transformer, args=(pool,)),
+                   threading.Thread(target=loader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        monitor.stopped.set()
+    if errors:
+        raise errors[0]
+    return {'stages': stats, 'queues': monitor.summary(), 'total': time.perf_counter() - start,
+            'watermark': result['watermark']}
+
+
+def run_sequential(db_path, sales_path, products, chunksize=CHUNK_SIZE):
+    """The same stages one after another in a single thread, for comparison."""
+    watermark = _prepare(db_path, products)
+    stats = {name: StageStats(name) for name in ('extract', 'transform', 'load')}
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    try:
+        with etl.loading_mode(conn):
+            writer = _Writer(conn, stats['load'])
+            writer.retry_rejected(products)
+            for chunk in _read_chunks(sales_path, watermark, chunksize, stats['extract']):
+                t = time.perf_counter()
+                sales, rejected = etl.split_unknown_products(chunk, products)
+                facts = etl.transform_sales(sales, products)
+                stats['transform'].add(len(chunk), time.perf_counter() - t)
+                writer.write(facts, rejected, _extent(chunk))
+    finally:
+        conn.close()
+    return {'stages': stats, 'queues': {}, 'total': time.perf_counter() - start, 'watermark': writer.watermark}
+
+
+def print_report(title, result):
+    print(f"\n=== {title}: {result['total']:.2f} s, watermark {result['watermark']} ===")
+    print(f"{'Stage':<12}{'Rows':>12}{'Busy (s)':>10}{'Rows/s':>14}")
+    for stage in result['stages'].values():
+        print(f"{stage.name:<12}{stage.rows:>12,}{stage.busy:>10.2f}{stage.throughput:>14,.0f}")
+    busy = [stage.busy for stage in result['stages'].values()]
+    print(f"Sum of stage times {sum(busy):.2f} s, slowest stage {max(busy):.2f} s")
+    for name, (mean, peak) in result['queues'].items():
+        print(f"Queue {name}: mean depth {mean:.1f}, max {peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined ETL of a sales CSV into the SQLite warehouse.")
+    parser.add_argument('--sales', help="Sales CSV; by default a synthetic one is generated.")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="Rows of the synthetic sales CSV.")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=N_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sales_path = args.sales
+        if sales_path is None:
+            sales, products = etl._synthetic_sales(args.rows)
+            sales_path = os.path.join(tmp, 'sales.csv')
+            sales.to_csv(sales_path, index=False)
+            print(f"Wrote {len(sales):,} synthetic sales to {sales_path}")
+            del sales
+        else:
+            products = etl.extract_sources()['products']
+
+        for title, run in (('Sequential', lambda path: run_sequential(path, sales_path, products, args.chunksize)),
+                           (f'Pipelined, {args.workers} transform worker(s)',
+                            lambda path: run_pipeline(path, sales_path, products, args.chunksize, args.workers))):
+            print_report(title, run(os.path.join(tmp, f"{title.split(',')[0]}.db")))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,469 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import etl
+
+
+# --------------------------------------------------------------------------------
+# Time-partitioned fact storage for the star schemas of olap_operations.py
+# and etl.py.
+#
+# Facts live in one table per quarter (or month), e.g. Sales_Fact_2025Q4,
+# created from an empty template table that keeps the original DDL and
+# indexes. A UNION ALL view under the original fact table name keeps every
+# existing query working. Partitions are tables of the warehouse file rather
+# than attached databases because SQLite attaches at most 10 files by
+# default; each table is its own B-tree, so appending to the current period
+# only writes that partition's pages (and those of its own indexes).
+#
+# The query layer prunes: the time predicates of a request are evaluated on
+# the time dimension to find the periods that can match, only those
+# partitions are aggregated, and the partial sums are added up.
+#
+# Old partitions are sealed: rewritten into freshly allocated pages
+# (compaction), analyzed, and protected by triggers that abort any INSERT,
+# UPDATE or DELETE. append() rejects facts for a sealed period up front.
+#
+# etl.py's loaders write through etl.insert_facts(), which routes the rows of
+# a converted fact_sales to its partitions inside the load's transaction.
+# --------------------------------------------------------------------------------
+
+LAYOUTS = {
+    'olap': {
+        'fact': 'Sales_Fact', 'time_dim': 'Time_Dim', 'time_key': 'Time_ID', 'measure': 'Revenue',
+        'dimensions': {'Product_Dim': 'Product_ID', 'Branch_Dim': 'Branch_ID', 'Time_Dim': 'Time_ID'},
+        'period': {'quarter': "Year || Quarter",
+                   'month': "Year || 'M' || printf('%02d', instr('JanFebMarAprMayJunJulAugSepOctNovDec', Month) / 3 + 1)"},
+    },
+    'etl': {
+        'fact': 'fact_sales', 'time_dim': 'dim_date', 'time_key': 'date_id', 'measure': 'total_amount',
+        'dimensions': {'dim_product': 'product_id', 'dim_branch': 'branch_id', 'dim_customer': 'customer_id',
+                       'dim_date': 'date_id'},
+        'period': {'quarter': "year || 'Q' || ((month + 2) / 3)",
+                   'month': "year || 'M' || printf('%02d', month)"},
+    },
+}
+CATALOG_TABLE = 'fact_partitions'
+OPEN_PARTITIONS = 1          # Most recent partitions left writable by seal_older()
+CONVERT_CHUNK_ROWS = 500_000
+REPEATS = 3
+
+BENCHMARK_REQUESTS = {   # name -> (group by, where) on the olap layout
+    'roll-up (no time filter)': (['Region'], {}),
+    'slice Q4': (['Product_Name'], {'Quarter': 'Q4'}),
+    'dice Electronics Q1/Q2': (['Region', 'Product_Name'], {'Category': 'Electronics', 'Quarter': ['Q1', 'Q2']}),
+    'one quarter (2025 Q4)': (['Region', 'City'], {'Year': 2025, 'Quarter': 'Q4'}),
+}
+
+
+def _condition(where, columns):
+    """SQL condition and parameters for the {column: value or values} entries whose column is in `columns`."""
+    terms, params = [], []
+    for column, value in where.items():
+        if column not in columns:
+            continue
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        terms.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return ' AND '.join(terms), params
+
+
+def _partial(conn, layout, table, owners, group_by, where, measure):
+    """SUM(measure) grouped by dimension columns over one fact table."""
+    needed = list(dict.fromkeys(owners[col] for col in list(group_by) + list(where)))
+    joins = ''.join(f" JOIN {dim} USING ({layout['dimensions'][dim]})" for dim in needed)
+    condition, params = _condition(where, owners)
+    group = ', '.join(group_by)
+    sql = (f"SELECT {group + ', ' if group else ''}SUM({measure}) AS {measure} FROM {table}{joins}"
+           f"{' WHERE ' + condition if condition else ''}{' GROUP BY ' + group if group else ''}")
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def _column_owners(conn, layout):
+    owners = {}
+    for dim in layout['dimensions']:
+        for row in conn.execute(f"PRAGMA table_info({dim})"):
+            owners.setdefault(row[1], dim)
+    return owners
+
+
+def _combine(parts, group_by, measure):
+    """Adds up per-table partial sums (the sums are additive)."""
+    df = pd.concat(parts, ignore_index=True).dropna(subset=[measure])
+    if not group_by:
+        return df[[measure]].sum().to_frame().T
+    df = df.groupby(list(group_by), as_index=False)[measure].sum()
+    return df.sort_values(list(group_by)).reset_index(drop=True)
+
+
+def aggregate_tables(conn, layout, tables, group_by, where=None, measure=None):
+    """
+    SUM(measure) grouped by dimension columns over the given fact tables,
+    aggregated per table and then added up.
+
+    Args:
+        layout (dict): One of LAYOUTS.
+        tables (list): Fact tables (partitions or the unpartitioned table).
+        group_by (list): Dimension columns, e.g. ['Region', 'Product_Name'].
+        where (dict): Dimension column -> value or list of values.
+    """
+    where, measure = where or {}, measure or layout['measure']
+    owners = _column_owners(conn, layout)
+    return _combine([_partial(conn, layout, table, owners, group_by, where, measure) for table in tables],
+                    group_by, measure)
+
+
+class PartitionedFacts:
+    """
+    The partitions of one fact table and the catalog that tracks them.
+
+    Args:
+        conn (sqlite3.Connection): Warehouse connection.
+        layout (str): 'olap' (olap_operations.py schema) or 'etl' (etl.py schema).
+        granularity (str): 'quarter' or 'month'.
+    """
+
+    def __init__(self, conn, layout='olap', granularity='quarter'):
+        self.conn = conn
+        self.layout = LAYOUTS[layout]
+        self.period_sql = self.layout['period'][granularity]
+        self.fact = self.layout['fact']
+        self.template = f"{self.fact}_template"
+        self.periods = {}
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (name TEXT PRIMARY KEY, fact TEXT, period TEXT, "
+                     f"rows INTEGER, sealed INTEGER DEFAULT 0, compacted_at TEXT, granularity TEXT)")
+
+    @classmethod
+    def open(cls, conn, layout='olap'):
+        """The partitions of an already converted fact table, at the granularity it was converted with."""
+        row = conn.execute(f"SELECT granularity FROM {CATALOG_TABLE} WHERE fact = ? AND period IS NULL",
+                           (LAYOUTS[layout]['fact'],)).fetchone()
+        if row is None:
+            raise ValueError(f"'{LAYOUTS[layout]['fact']}' is not partitioned.")
+        return cls(conn, layout, row[0])
+
+    @staticmethod
+    def is_partitioned(conn, layout='olap'):
+        """True if the layout's fact table has been replaced by the partitions' view."""
+        return etl.is_partitioned(conn, LAYOUTS[layout]['fact'])
+
+    @classmethod
+    def convert(cls, conn, layout='olap', granularity='quarter', chunk_rows=CONVERT_CHUNK_ROWS):
+        """
+        Moves an unpartitioned fact table into partitions behind a view of the
+        same name. Its indexes are kept on the template and so are created on
+        every partition.
+        """
+        self = cls(conn, layout, granularity)
+        fact, template = self.fact, self.template
+        kind = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (fact,)).fetchone()
+        if kind is None or kind[0] != 'table':
+            raise ValueError(f"'{fact}' is not an unpartitioned table.")
+        indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                               "AND sql IS NOT NULL", (fact,)).fetchall()
+        table_sql = self._table_sql(fact)
+        with conn:
+            conn.execute(table_sql.replace(fact, template, 1))
+            for name, sql in indexes:
+                sql = sql.replace(name, f"{template}__{name}", 1)
+                conn.execute(re.sub(rf"\bON\s+{fact}\b", f"ON {template}", sql, count=1, flags=re.I))
+            conn.execute(f"ALTER TABLE {fact} RENAME TO {fact}_unpartitioned")
+            conn.execute(f"INSERT INTO {CATALOG_TABLE} (name, fact, rows, granularity) VALUES (?, ?, 0, ?)",
+                         (template, fact, granularity))   # The template row (period NULL) records the granularity
+
+        with etl.loading_mode(conn):
+            for chunk in pd.read_sql_query(f"SELECT * FROM {fact}_unpartitioned ORDER BY rowid", conn,
+                                           chunksize=chunk_rows):
+                self.append(chunk, refresh_view=False)
+            with conn:
+                conn.execute(f"DROP TABLE {fact}_unpartitioned")
+                self._refresh_view()
+        return self
+
+    # --- Catalog, DDL and the view ---
+
+    def _table_sql(self, table):
+        return self.conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                 (table,)).fetchone()[0]
+
+    def partitions(self, sealed=None):
+        """Partition names in period order (optionally only sealed or only open ones)."""
+        condition = '' if sealed is None else f" AND sealed = {int(sealed)}"
+        return [row[0] for row in self.conn.execute(
+            f"SELECT name FROM {CATALOG_TABLE} WHERE fact = ? AND period IS NOT NULL{condition} ORDER BY period",
+            (self.fact,))]
+
+    def _create_partition(self, period):
+        name = f"{self.fact}_{period}"
+        self.conn.execute(self._table_sql(self.template).replace(self.template, name, 1))
+        for sql in self._template_index_sql():
+            self.conn.execute(sql.replace(self.template, name))
+        self.conn.execute(f"INSERT INTO {CATALOG_TABLE} (name, fact, period, rows) VALUES (?, ?, ?, 0)",
+                          (name, self.fact, period))
+        return name
+
+    def _template_index_sql(self):
+        return [row[0] for row in self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (self.template,))]
+
+    def _refresh_view(self):
+        tables = self.partitions() or [self.template]
+        self.conn.execute(f"DROP VIEW IF EXISTS {self.fact}")
+        self.conn.execute(f"CREATE VIEW {self.fact} AS " + ' UNION ALL '.join(f"SELECT * FROM {t}" for t in tables))
+
+    def _period_of(self, time_keys):
+        """Period label of every time key (the map is reloaded once for keys it does not know)."""
+        keys = pd.Series(time_keys)
+        if not keys.isin(self.periods.keys()).all():
+            self.periods = dict(self.conn.execute(
+                f"SELECT {self.layout['time_key']}, {self.period_sql} FROM {self.layout['time_dim']}"))
+        periods = keys.map(self.periods)
+        if periods.isna().any():
+            missing = keys[periods.isna()].unique()[:5].tolist()
+            raise ValueError(f"Time keys not in {self.layout['time_dim']}: {missing}")
+        return periods
+
+    # --- Loading ---
+
+    def append(self, facts, refresh_view=True):
+        """
+        Appends fact rows to their partitions in one transaction, creating
+        partitions for new periods.
+
+        Raises:
+            ValueError: If a row belongs to a sealed partition or has an unknown time key.
+
+        Returns:
+            dict: Partition -> rows appended.
+        """
+        with self.conn:
+            return self.write(facts, refresh_view)
+
+    def write(self, facts, refresh_view=True):
+        """append() inside the caller's transaction (see etl.insert_facts)."""
+        periods = self._period_of(facts[self.layout['time_key']].to_numpy())
+        sealed = set(self.partitions(sealed=True))
+        late = sorted({f"{self.fact}_{p}" for p in periods.unique()} & sealed)
+        if late:
+            raise ValueError(f"Facts for sealed partition(s) {late}; unseal or correct them in a new period.")
+        existing = set(self.partitions())
+        written = {}
+        for period, part in facts.groupby(periods.to_numpy(), sort=True):
+            name = f"{self.fact}_{period}"
+            if name not in existing:
+                self._create_partition(period)
+            etl.bulk_insert(self.conn, name, part)
+            self.conn.execute(f"UPDATE {CATALOG_TABLE} SET rows = rows + ? WHERE name = ?", (len(part), name))
+            written[name] = len(part)
+        if refresh_view and set(written) - existing:
+            self._refresh_view()
+        return written
+
+    def truncate(self):
+        """Drops every partition (sealed ones included); the view and the template stay, so loads keep partitioning."""
+        with self.conn:
+            for name in self.partitions():
+                self.conn.execute(f"DROP TABLE {name}")   # Its triggers and indexes go with it
+                self.conn.execute(f"DELETE FROM {CATALOG_TABLE} WHERE name = ?", (name,))
+            self._refresh_view()
+
+    # --- Sealing and compaction ---
+
+    def compact(self, name):
+        """Rewrites a partition into freshly allocated, contiguous pages and refreshes its statistics."""
+        sealed = name in self.partitions(sealed=True)
+        tmp = f"{name}__compact"
+        with self.conn:
+            self.conn.execute(f"DROP VIEW IF EXISTS {self.fact}")   # RENAME re-checks views that name the table
+            self.conn.execute(self._table_sql(self.template).replace(self.template, tmp, 1))
+            self.conn.execute(f"INSERT INTO {tmp} SELECT * FROM {name} ORDER BY rowid")
+            self.conn.execute(f"DROP TABLE {name}")
+            self.conn.execute(f"ALTER TABLE {tmp} RENAME TO {name}")
+            for sql in self._template_index_sql():
+                self.conn.execute(sql.replace(self.template, name))
+            if sealed:
+                self._protect(name)
+            self.conn.execute(f"ANALYZE {name}")
+            self.conn.execute(f"UPDATE {CATALOG_TABLE} SET compacted_at = datetime('now') WHERE name = ?", (name,))
+            self._refresh_view()
+
+    def _protect(self, name):
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            self.conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name}_sealed_{action.lower()} BEFORE {action} ON {name} "
+                              f"BEGIN SELECT RAISE(ABORT, 'partition {name} is sealed'); END")
+
+    def seal(self, name):
+        """Compacts a partition and makes it read-only."""
+        with self.conn:
+            self.conn.execute(f"UPDATE {CATALOG_TABLE} SET sealed = 1 WHERE name = ?", (name,))
+        self.compact(name)
+
+    def unseal(self, name):
+        with self.conn:
+            for action in ('insert', 'update', 'delete'):
+                self.conn.execute(f"DROP TRIGGER IF EXISTS {name}_sealed_{action}")
+            self.conn.execute(f"UPDATE {CATALOG_TABLE} SET sealed = 0 WHERE name = ?", (name,))
+
+    def seal_older(self, keep_open=OPEN_PARTITIONS):
+        """Seals every open partition except the `keep_open` most recent ones; returns their names."""
+        to_seal = [name for name in self.partitions()[:-keep_open or None] if name in self.partitions(sealed=False)]
+        for name in to_seal:
+            self.seal(name)
+        return to_seal
+
+    # --- Pruning query layer ---
+
+    def prune(self, where):
+        """
+        The partitions whose period has at least one time-dimension row
+        matching the time predicates of `where`.
+
+        Returns:
+            dict: Partition -> True if every row of its period matches (the
+                  time predicates are then redundant inside it).
+        """
+        time_columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.layout['time_dim']})")}
+        condition, params = _condition(where or {}, time_columns)
+        if not condition:
+            return {name: True for name in self.partitions()}
+        periods = {period: bool(all_match) for period, any_match, all_match in self.conn.execute(
+            f"SELECT {self.period_sql} AS period, MAX({condition}), MIN({condition}) "
+            f"FROM {self.layout['time_dim']} GROUP BY period", params * 2) if any_match}
+        return {name: periods[name[len(self.fact) + 1:]] for name in self.partitions()
+                if name[len(self.fact) + 1:] in periods}
+
+    def query(self, group_by, where=None, measure=None):
+        """
+        Grouped sums over the pruned partitions; partitions whose whole period
+        matches are aggregated without the time predicates (and the time
+        dimension join when nothing else needs it).
+
+        Returns:
+            tuple: (pd.DataFrame, partitions scanned)
+        """
+        where, measure = where or {}, measure or self.layout['measure']
+        owners = _column_owners(self.conn, self.layout)
+        time_dim = self.layout['time_dim']
+        non_time = {col: value for col, value in where.items() if owners[col] != time_dim}
+        scanned = self.prune(where)
+        if not scanned:
+            return pd.DataFrame(columns=list(group_by) + [measure]), []
+        parts = [_partial(self.conn, self.layout, name, owners, group_by, non_time if covered else where, measure)
+                 for name, covered in scanned.items()]
+        return _combine(parts, group_by, measure), list(scanned)
+
+
+def changed_pages(conn, path, action):
+    """
+    Runs action() and counts the database pages it rewrote, by owner
+    (table or index), comparing the checkpointed file page by page.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def snapshot():
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with open(path, 'rb') as f:
+            data = f.read()
+        return [hash(data[i:i + page_size]) for i in range(0, len(data), page_size)]
+
+    before = snapshot()
+    action()
+    after = snapshot()
+    owners = dict(conn.execute("SELECT pageno, name FROM dbstat"))
+    counts = {}
+    for page, digest in enumerate(after):
+        if page >= len(before) or before[page] != digest:
+            owner = owners.get(page + 1, '(header / free list)')
+            counts[owner] = counts.get(owner, 0) + 1
+    return counts
+
+
+def _new_day(conn, n_rows, time_id):
+    """n_rows copies of existing facts with new Sale_IDs, all on `time_id` (a day of new sales)."""
+    facts = pd.read_sql_query("SELECT * FROM Sales_Fact LIMIT ?", conn, params=(n_rows,))
+    facts['Sale_ID'] += conn.execute("SELECT MAX(Sale_ID) FROM Sales_Fact").fetchone()[0]
+    facts['Time_ID'] = time_id
+    return facts
+
+
+def main():
+    import olap_columnar    # Benchmark only; keeps the OLAP stack out of etl.py's imports
+    import synthetic_star
+
+    parser = argparse.ArgumentParser(description="Time-partitioned fact storage with partition pruning.")
+    parser.add_argument('--db', default='star_schema.db', help="Star-schema database; generated if missing.")
+    parser.add_argument('--facts', type=float, default=2e6, help="Facts of the generated warehouse.")
+    parser.add_argument('--granularity', choices=('quarter', 'month'), default='quarter')
+    parser.add_argument('--day-rows', type=int, default=20_000, help="Facts in the appended day.")
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Generating {int(args.facts):,} synthetic facts into '{args.db}'...")
+        synthetic_star.generate_warehouse(args.db, int(args.facts))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {'single table': os.path.join(tmp, 'single.db'), 'partitioned': os.path.join(tmp, 'partitioned.db')}
+        conns = {}
+        for name, path in paths.items():
+            shutil.copy(args.db, path)
+            conns[name] = sqlite3.connect(path)
+            conns[name].execute("CREATE INDEX IF NOT EXISTS idx_sales_fact_product_id ON Sales_Fact (Product_ID)")
+        single, conn = conns['single table'], conns['partitioned']
+
+        start = time.perf_counter()
+        parts = PartitionedFacts.convert(conn, 'olap', args.granularity)
+        print(f"Partitioned into {len(parts.partitions())} {args.granularity} tables in "
+              f"{time.perf_counter() - start:.1f} s")
+
+        layout = LAYOUTS['olap']
+        print(f"\n{'Request':<28}{'Partitions':>12}{'Single (ms)':>13}{'Pruned (ms)':>13}  Same result")
+        for request, (by, where) in BENCHMARK_REQUESTS.items():
+            single_time, expected = olap_columnar._best_time(
+                lambda: aggregate_tables(single, layout, ['Sales_Fact'], by, where), args.repeats)
+            pruned_time, (result, scanned) = olap_columnar._best_time(lambda: parts.query(by, where), args.repeats)
+            same = expected.shape == result.shape and np.array_equal(expected[layout['measure']].to_numpy(),
+                                                                     result[layout['measure']].to_numpy())
+            print(f"{request:<28}{f'{len(scanned)}/{len(parts.partitions())}':>12}{single_time * 1000:>13.1f}"
+                  f"{pruned_time * 1000:>13.1f}  {same}")
+
+        start = time.perf_counter()
+        sealed = parts.seal_older()
+        print(f"\nSealed and compacted {len(sealed)} partitions in {time.perf_counter() - start:.1f} s; "
+              f"open: {parts.partitions(sealed=False)}")
+
+        last_day = conn.execute("SELECT MAX(Time_ID) FROM Time_Dim").fetchone()[0]
+        day = _new_day(single, args.day_rows, last_day)
+        print(f"\nAppending {len(day):,} facts for Time_ID {last_day}; pages rewritten:")
+        def load_single():
+            with single:
+                etl.bulk_insert(single, 'Sales_Fact', day)
+
+        for name, load in (('single table', load_single), ('partitioned', lambda: parts.append(day))):
+            pages = changed_pages(conns[name], paths[name], load)
+            print(f"  {name:<14}{sum(pages.values()):>7} pages: "
+                  + ', '.join(f"{owner} {n}" for owner, n in sorted(pages.items(), key=lambda kv: -kv[1])))
+
+        late = day.head(1).assign(Sale_ID=day['Sale_ID'].max() + 1,
+                                  Time_ID=conn.execute("SELECT MIN(Time_ID) FROM Time_Dim").fetchone()[0])
+        try:
+            parts.append(late)
+        except ValueError as e:
+            print(f"\nLate fact rejected: {e}")
+        try:
+            conn.execute(f"DELETE FROM {sealed[0]} WHERE rowid = (SELECT MIN(rowid) FROM {sealed[0]})")
+        except sqlite3.IntegrityError as e:
+            print(f"Direct write to a sealed partition rejected: {e}")
+        for c in conns.values():
+            c.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import time
+from multiprocessing import Pool
+from sklearn.feature_selection import mutual_info_classif
+from correlation_engine import pairs_above
+
+
+# --------------------------------------------------------------------------------
+# --- CONFIGURATION: Dataset used when this file is run directly ---
+# --------------------------------------------------------------------------------
+
+# Breast cancer dataset: 30 highly correlated *_mean / *_se / *_worst columns
+DATASET_FILE = 'data.csv'
+TARGET_COLUMN = 'diagnosis'
+ID_COLUMN_TO_DROP = 'id'
+
+# SCREENING PARAMETERS
+CORRELATION_THRESHOLD = 0.9   # |Pearson r| above which two features count as redundant
+MIN_MUTUAL_INFO = 0.0         # Features with mutual information <= this are dropped as uninformative
+BLOCK_SIZE = 256              # Columns per block for the parallel MI / correlation computations
+N_WORKERS = os.cpu_count() or 1
+CACHE_FILE = 'feature_screening_cache.json'
+
+# --------------------------------------------------------------------------------
+# --- END CONFIGURATION ---
+# --------------------------------------------------------------------------------
+
+
+def _column_blocks(n_cols, block_size):
+    return [(start, min(start + block_size, n_cols)) for start in range(0, n_cols, block_size)]
+
+
+def _mi_block(args):
+    X_block, y, random_state = args
+    return mutual_info_classif(X_block, y, random_state=random_state)
+
+
+def _run(func, tasks, n_workers):
+    if n_workers > 1 and len(tasks) > 1:
+        with Pool(min(n_workers, len(tasks))) as pool:
+            return pool.map(func, tasks)
+    return [func(task) for task in tasks]
+
+
+def mutual_information(X, y, block_size=BLOCK_SIZE, n_workers=N_WORKERS, random_state=42):
+    """
+    Per-feature mutual information with the class label, computed over
+    column blocks in parallel processes.
+
+    Args:
+        X (np.ndarray): Numeric feature matrix (n_samples, n_features).
+        y (array-like): Class labels.
+
+    Returns:
+        np.ndarray: Mutual information of every column of X.
+    """
+    tasks = [(X[:, a:b], y, random_state) for a, b in _column_blocks(X.shape[1], block_size)]
+    return np.concatenate(_run(_mi_block, tasks, n_workers))
+
+
+def correlated_pairs(X, threshold=CORRELATION_THRESHOLD, block_size=BLOCK_SIZE, n_workers=N_WORKERS):
+    """
+    Finds all feature pairs with |Pearson r| above `threshold` without
+    materializing the full correlation matrix, using the blocked float32
+    engine in correlation_engine.py (constant columns correlate with nothing).
+
+    Returns:
+        list: (i, j, r) tuples with i < j.
+    """
+    return pairs_above(X, threshold, block_size=block_size, n_workers=n_workers)
+
+
+def select_features(mi, pairs, min_mutual_info=MIN_MUTUAL_INFO):
+    """
+    Greedy redundancy pruning: visits features from the most to the least
+    informative and keeps one only if it is not strongly correlated with a
+    feature already kept. The single most informative feature is always kept.
+
+    Returns:
+        list: Indices of the kept features, in original column order.
+    """
+    neighbours = {}
+    for i, j, _ in pairs:
+        neighbours.setdefault(i, set()).add(j)
+        neighbours.setdefault(j, set()).add(i)
+
+    kept = set()
+    for idx in np.argsort(-mi, kind='stable'):
+        if kept and mi[idx] <= min_mutual_info:
+            break
+        if not neighbours.get(idx, set()) & kept:
+            kept.add(int(idx))
+    return sorted(kept)
+
+
+def _cache_key(dataset_file, X, y, params):
+    h = hashlib.sha1()
+    if dataset_file and os.path.exists(dataset_file):
+        stat = os.stat(dataset_file)
+        h.update(f"{os.path.abspath(dataset_file)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    h.update(json.dumps([list(map(str, X.columns)), params]).encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    h.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def screen_features(X, y, dataset_file=None, threshold=CORRELATION_THRESHOLD,
+                    min_mutual_info=MIN_MUTUAL_INFO, block_size=BLOCK_SIZE, n_workers=N_WORKERS,
+                    cache_file=CACHE_FILE, verbose=True):
+    """
+    Screens the numeric columns of X by mutual information and pairwise
+    correlation. Non-numeric columns are always kept. The selection is cached
+    in `cache_file`, keyed by the dataset file, the contents of X, the labels
+    and the screening parameters, so reruns on the same data skip the work.
+
+    Call it on the training split only, so the test rows do not influence
+    which features are kept.
+
+    Args:
+        X (pd.DataFrame): Candidate features.
+        y (array-like): Class labels aligned with X.
+        dataset_file (str): Source file, used in the cache key (optional).
+
+    Returns:
+        list: Names of the selected columns, in the original order.
+    """
+    numeric_cols = X.select_dtypes(include=np.number).columns.tolist()
+    params = {'threshold': threshold, 'min_mutual_info': min_mutual_info}
+    key = _cache_key(dataset_file, X, y, params)
+
+    cache = {}
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cache = json.load(f)
+    if key in cache:
+        if verbose:
+            print(f"Feature screening: using cached selection of {len(cache[key]['selected'])} "
+                  f"of {len(X.columns)} columns from '{cache_file}'.")
+        return cache[key]['selected']
+
+    start = time.perf_counter()
+    values = X[numeric_cols].to_numpy(dtype=np.float64)
+    mi = mutual_information(values, y, block_size, n_workers)
+    pairs = correlated_pairs(values, threshold, block_size, n_workers)
+    kept = {numeric_cols[i] for i in select_features(mi, pairs, min_mutual_info)}
+    selected = [col for col in X.columns if col in kept or col not in numeric_cols]
+
+    if verbose:
+        print(f"Feature screening: kept {len(selected)} of {len(X.columns)} columns "
+              f"({len(pairs)} pairs with |r| > {threshold}) in {time.perf_counter() - start:.2f}s.")
+        dropped = [col for col in X.columns if col not in selected]
+        if dropped:
+            print(f" - Dropped: {dropped}")
+
+    if cache_file:
+        cache[key] = {
+            'dataset': dataset_file,
+            'selected': selected,
+            'mutual_info': dict(zip(numeric_cols, mi.round(6).tolist())),
+        }
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+    return selected
+
+
+def _fit_and_score(model, X_train, X_test, y_train, y_test):
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    return fit_time, (model.predict(X_test) == np.asarray(y_test)).mean()
+
+
+def main():
+    """
+    Reports the training-time and accuracy trade-off of screening for the
+    Decision Tree and Gaussian Naive Bayes models used in decisiontree.py
+    and naivebayes.py.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.naive_bayes import GaussianNB
+
+    print("Loading data...")
+    try:
+        df = pd.read_csv(DATASET_FILE)
+    except FileNotFoundError:
+        print(f"Error: '{DATASET_FILE}' not found. Make sure the file is in the same directory.")
+        return
+    df = df.drop(columns=[c for c in df.columns if c == ID_COLUMN_TO_DROP or 'Unnamed:' in c])
+    X = df.drop(TARGET_COLUMN, axis=1)
+    y = df[TARGET_COLUMN]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    selected = screen_features(X_train, y_train, dataset_file=DATASET_FILE)
+    print("-" * 70)
+
+    print(f"{'Model':<15}{'Features':>10}{'Fit time (ms)':>16}{'Accuracy':>11}")
+    for name, make_model in (('Decision Tree', lambda: DecisionTreeClassifier(random_state=42)),
+                             ('Naive Bayes', GaussianNB)):
+        for columns in (X.columns.tolist(), selected):
+            fit_time, accuracy = _fit_and_score(make_model(), X_train[columns], X_test[columns], y_train, y_test)
+            print(f"{name:<15}{len(columns):>10}{fit_time * 1000:>16.2f}{accuracy:>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+import etl
+import olap_operations
+import synthetic_star
+
+
+# --------------------------------------------------------------------------------
+# Index advisor for the star schemas (olap_operations.py and etl.py).
+#
+# 1. The schema is read from the database itself: a fact table is one with
+#    two or more foreign keys, taken from its FOREIGN KEY clauses or, when it
+#    declares none (etl.py's fact_sales), from columns named like another
+#    table's INTEGER PRIMARY KEY.
+# 2. For each query, SQLite's authorizer reports every (table, column) it
+#    reads while the statement is prepared, and the WHERE clause is split
+#    into conjuncts that each filter a single dimension.
+# 3. Candidates:
+#      - one index per foreign key;
+#      - per query, a covering fact index: the foreign keys of the filtered
+#        dimensions first (most selective dimension first, so the join can
+#        seek into it), then the other foreign keys, then the measures, so
+#        the fact rows are never visited;
+#      - per filtered dimension, an index on the filter columns plus its key
+#        and the other attributes the query reads.
+#    A candidate is dropped when a wider one on the same table has the same
+#    leading (seek) columns and contains all of its columns.
+# 4. The indexes are created, ANALYZE runs, and EXPLAIN QUERY PLAN and the
+#    latency of every query are compared before and after. An index that no
+#    plan uses is dropped again unless it serves a foreign key, and so is one
+#    proposed only for queries that got slower (a foreign key it stood in for
+#    gets its plain index back). Queries still slower after that are flagged.
+# --------------------------------------------------------------------------------
+
+REPEATS = 3                   # Timed runs per query; the fastest counts
+REGRESSION_TOLERANCE = 1.05   # A query is slower with the indexes when after > before * this
+DEMO_FACTS = 2_000_000        # Facts in the synthetic warehouse generated by main()
+DEMO_DB = 'star_schema.db'
+
+# The same five operations against etl.py's warehouse (quarters are month ranges there)
+ETL_QUERIES = {
+    'rollup': ("ROLL-UP (Total Amount by Region)", """
+SELECT region, SUM(total_amount) AS total
+FROM fact_sales JOIN dim_branch USING (branch_id)
+GROUP BY region;"""),
+    'drilldown': ("DRILL-DOWN (Amount by City within Region)", """
+SELECT region, city, SUM(total_amount) AS total
+FROM fact_sales JOIN dim_branch USING (branch_id)
+GROUP BY region, city;"""),
+    'slice': ("SLICE (Sales in Q4)", """
+SELECT product_name, SUM(total_amount) AS q4_total
+FROM fact_sales JOIN dim_product USING (product_id) JOIN dim_date USING (date_id)
+WHERE month BETWEEN 10 AND 12
+GROUP BY product_name;"""),
+    'dice': ("DICE (Electronics in Q1 and Q2)", """
+SELECT region, product_name, SUM(total_amount) AS total
+FROM fact_sales JOIN dim_product USING (product_id) JOIN dim_branch USING (branch_id)
+JOIN dim_date USING (date_id)
+WHERE category = 'Electronics' AND month BETWEEN 1 AND 6
+GROUP BY region, product_name;"""),
+    'pivot': ("PIVOT (Product vs Quarter)", """
+SELECT product_name,
+  SUM(CASE WHEN month <= 3 THEN total_amount ELSE 0 END) AS q1,
+  SUM(CASE WHEN month BETWEEN 4 AND 6 THEN total_amount ELSE 0 END) AS q2,
+  SUM(CASE WHEN month BETWEEN 7 AND 9 THEN total_amount ELSE 0 END) AS q3,
+  SUM(CASE WHEN month >= 10 THEN total_amount ELSE 0 END) AS q4
+FROM fact_sales JOIN dim_product USING (product_id) JOIN dim_date USING (date_id)
+GROUP BY product_name;"""),
+}
+
+
+
+
+# --- Schema and query analysis ---
+
+
+def read_star_schema(conn):
+    """
+    Columns, primary keys and the fact tables' foreign keys.
+
+    Returns:
+        dict: columns (table -> column list), keys (table -> single-column
+              primary key) and facts (fact table -> {fk column: dimension table}).
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    columns, keys = {}, {}
+    for table in tables:
+        info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        columns[table] = [row[1] for row in info]
+        pk = [row[1] for row in info if row[5]]
+        if len(pk) == 1:
+            keys[table] = pk[0]
+    facts = {}
+    for table in tables:
+        fks = {row[3]: row[2] for row in conn.execute(f"PRAGMA foreign_key_list({table})")}
+        if not fks:
+            fks = {col: dim for col in columns[table] for dim, key in keys.items()
+                   if dim != table and col.lower() == key.lower() and col != keys.get(table)}
+        if len(fks) >= 2:
+            facts[table] = fks
+    return {'columns': columns, 'keys': keys, 'facts': facts}
+
+
+def query_columns(conn, query):
+    """{table: set of columns} the query reads, as reported by SQLite's authorizer."""
+    reads = {}
+
+    def authorizer(action, table, column, db, trigger):
+        if action == sqlite3.SQLITE_READ and table and column:
+            reads.setdefault(table, set()).add(column)
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        conn.execute(f"EXPLAIN {query}").fetchall()
+    finally:
+        conn.set_authorizer(None)
+    return reads
+
+
+def where_conjuncts(query):
+    """The top-level AND terms of the query's WHERE clause (BETWEEN x AND y kept whole)."""
+    match = re.search(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|;|$)', query, re.I | re.S)
+    if not match:
+        return []
+    terms, current, depth, between = [], '', 0, False
+    for token in re.split(r"('(?:[^']|'')*'|\(|\)|\bAND\b)", match.group(1), flags=re.I):
+        if not token.startswith("'"):
+            depth += (token == '(') - (token == ')')
+            between = between or re.search(r'\bBETWEEN\b', token, re.I) is not None
+        if token.upper() == 'AND' and depth == 0:
+            if not between:
+                terms.append(current.strip())
+                current = ''
+                continue
+            between = False
+        current += token
+    terms.append(current.strip())
+    return [term for term in terms if term]
+
+
+def dimension_filters(query, reads):
+    """
+    {table: [(conjunct, columns)]} for the WHERE terms that reference columns
+    of exactly one table.
+    """
+    owners = {}
+    for table, cols in reads.items():
+        for col in cols:
+            owners.setdefault(col.lower(), set()).add(table)
+    filters = {}
+    for term in where_conjuncts(query):
+        names = {name.lower() for name in re.findall(r"[A-Za-z_]\w*", re.sub(r"'(?:[^']|'')*'", '', term))}
+        tables = set().union(*(owners[name] for name in names if name in owners))
+        if len(tables) == 1:
+            table = tables.pop()
+            cols = [col for col in sorted(reads[table]) if col.lower() in names]
+            filters.setdefault(table, []).append((term, cols))
+    return filters
+
+
+def selectivity(conn, table, terms):
+    """Fraction of the dimension's rows passing its filter terms."""
+    where = ' AND '.join(f"({term})" for term, _ in terms)
+    fraction = conn.execute(f"SELECT AVG(CASE WHEN {where} THEN 1.0 ELSE 0 END) FROM {table}").fetchone()[0]
+    return 1.0 if fraction is None else fraction
+
+
+
+
+# --- Candidate indexes ---
+
+
+class IndexCandidate:
+    """An index proposal; the first `seek` columns are the ones a lookup needs in that order."""
+
+    def __init__(self, table, columns, seek, reason, op=None):
+        self.table = table
+        self.columns = list(dict.fromkeys(columns))
+        self.seek = seek
+        self.reasons = [reason]
+        self.ops = {op} if op else set()                  # Queries it was proposed for
+        self.foreign_keys = [] if op else [self.columns[0]]  # Foreign keys it indexes for joins in general
+
+    def absorb(self, other):
+        """Takes over the proposals of a narrower candidate this one covers."""
+        self.reasons.extend(other.reasons)
+        self.ops |= other.ops
+        self.foreign_keys.extend(other.foreign_keys)
+
+    @property
+    def name(self):
+        return f"idx_{self.table}_{'_'.join(self.columns)}".lower()
+
+    @property
+    def ddl(self):
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    def covers(self, other):
+        return (self.table == other.table and self.columns[:other.seek] == other.columns[:other.seek]
+                and set(other.columns) <= set(self.columns))
+
+
+def candidate_indexes(conn, schema, queries):
+    """
+    Proposed indexes for the query set, with redundant ones merged away.
+
+    Returns:
+        list: IndexCandidate objects; `reasons` lists every proposal each one serves.
+    """
+    candidates = [IndexCandidate(fact, [fk], 1, f"foreign key {fact}.{fk}")
+                  for fact, fks in schema['facts'].items() for fk in fks]
+    for op, (_, query) in queries.items():
+        reads = query_columns(conn, query)
+        filters = dimension_filters(query, reads)
+        for fact, fks in schema['facts'].items():
+            if fact not in reads:
+                continue
+            # Columns joined with USING are not reported as reads: a joined dimension means its key is used
+            used = [fk for fk in fks if fk in reads[fact] or fks[fk] in reads]
+            filtered = sorted((fk for fk in used if fks[fk] in filters),
+                              key=lambda fk: selectivity(conn, fks[fk], filters[fks[fk]]))
+            measures = [col for col in schema['columns'][fact]
+                        if col in reads[fact] and col not in fks and col != schema['keys'].get(fact)]
+            ordered = filtered + [fk for fk in used if fk not in filtered] + measures
+            candidates.append(IndexCandidate(fact, ordered, max(1, len(filtered)), f"covering fact index for {op}", op))
+        for dim, terms in filters.items():
+            if dim in schema['facts']:
+                continue
+            filter_cols = list(dict.fromkeys(col for _, cols in terms for col in cols))
+            others = [col for col in schema['columns'][dim] if col in reads[dim] and col not in filter_cols]
+            key = [schema['keys'][dim]] if dim in schema['keys'] else []
+            candidates.append(IndexCandidate(dim, filter_cols + key + others, len(filter_cols),
+                                             f"{dim} filter for {op}", op))
+
+    kept = []
+    for candidate in sorted(candidates, key=lambda c: -len(c.columns)):
+        wider = next((k for k in kept if k.covers(candidate)), None)
+        if wider:
+            wider.absorb(candidate)
+        else:
+            kept.append(candidate)
+    return kept
+
+
+
+
+# --- Measurement and the advisor ---
+
+
+def query_plan(conn, query):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+def time_query(conn, query, repeats=REPEATS):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(conn, queries, repeats=REPEATS):
+    return {op: (query_plan(conn, query), time_query(conn, query, repeats)) for op, (_, query) in queries.items()}
+
+
+def slower_queries(report, tolerance=REGRESSION_TOLERANCE):
+    """Operations whose latency with the indexes exceeds the latency without them."""
+    return sorted(op for op, (_, after) in report['after'].items() if after > report['before'][op][1] * tolerance)
+
+
+def advise(conn, queries, repeats=REPEATS, apply=True):
+    """
+    Proposes indexes for the queries and, with apply=True, creates them and
+    measures every query before and after.
+
+    Args:
+        conn (sqlite3.Connection): Star-schema database.
+        queries (dict): Operation -> (title, SQL), like olap_operations.QUERIES.
+
+    Returns:
+        dict: indexes (kept IndexCandidate list), dropped ((name, reason) of
+              indexes removed again), before / after (op -> (plan lines,
+              seconds)) and regressions (operations still slower after).
+    """
+    schema = read_star_schema(conn)
+    candidates = candidate_indexes(conn, schema, queries)
+    report = {'indexes': candidates, 'dropped': [], 'before': measure(conn, queries, repeats), 'after': {},
+              'regressions': []}
+    if not apply:
+        return report
+
+    for candidate in candidates:
+        conn.execute(candidate.ddl)
+    conn.execute("ANALYZE")
+    conn.commit()
+    report['after'] = measure(conn, queries, repeats)
+
+    used = {name.lower() for plan, _ in report['after'].values() for line in plan
+            for name in re.findall(r'INDEX (\w+)', line)}
+    for candidate in list(candidates):
+        if candidate.name not in used and not candidate.foreign_keys:
+            conn.execute(f"DROP INDEX {candidate.name}")
+            candidates.remove(candidate)
+            report['dropped'].append((candidate.name, "no query plan used it"))
+
+    # Indexes proposed only for queries they made slower go too
+    slower = set(slower_queries(report))
+    regressed = [candidate for candidate in candidates if candidate.ops and candidate.ops <= slower]
+    for candidate in regressed:
+        conn.execute(f"DROP INDEX {candidate.name}")
+        candidates.remove(candidate)
+        report['dropped'].append((candidate.name, f"it slowed down {', '.join(sorted(candidate.ops))}"))
+        for fk in candidate.foreign_keys:
+            plain = IndexCandidate(candidate.table, [fk], 1, f"foreign key {candidate.table}.{fk}")
+            conn.execute(plain.ddl)
+            candidates.append(plain)
+    if regressed:
+        conn.execute("ANALYZE")
+        report['after'] = measure(conn, queries, repeats)
+    conn.commit()
+    report['regressions'] = slower_queries(report)
+    return report
+
+
+def print_report(report, queries):
+    print("\nRecommended indexes:")
+    for candidate in report['indexes']:
+        print(f"  {candidate.ddl};")
+        print(f"      serves: {', '.join(candidate.reasons)}")
+        slowed = sorted(candidate.ops & set(report['regressions']))
+        if slowed:
+            print(f"      REGRESSION: {', '.join(slowed)} got slower with it (kept for its other queries)")
+    for name, reason in report['dropped']:
+        print(f"  (dropped {name}: {reason})")
+    for op, (title, _) in queries.items():
+        plan, before = report['before'][op]
+        print(f"\n=== {title} ===")
+        print("  before: " + "\n          ".join(plan))
+        if report['after']:
+            plan, after = report['after'][op]
+            print("  after:  " + "\n          ".join(plan))
+            flag = "  REGRESSION" if op in report['regressions'] else ""
+            print(f"  latency {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({before / after:.1f}x){flag}")
+        else:
+            print(f"  latency {before * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index advisor for the OLAP and ETL star schemas.")
+    parser.add_argument('--schema', choices=('olap', 'etl'), default='olap')
+    parser.add_argument('--db', help=f"Database to index; for the olap schema a synthetic one ({DEMO_DB}) "
+                                     f"is generated if missing, for etl the default is {etl.DB_FILE}.")
+    parser.add_argument('--facts', type=float, default=DEMO_FACTS, help="Facts of the generated warehouse.")
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--dry-run', action='store_true', help="Only report the plans and the proposed indexes.")
+    args = parser.parse_args()
+
+    if args.schema == 'etl':
+        path, queries = args.db or etl.DB_FILE, ETL_QUERIES
+        if not os.path.exists(path):
+            print(f"Error: '{path}' not found. Run etl.py first.")
+            return
+    else:
+        path, queries = args.db or DEMO_DB, olap_operations.QUERIES
+        if not os.path.exists(path):
+            print(f"Generating {int(args.facts):,} synthetic facts into '{path}'...")
+            synthetic_star.generate_warehouse(path, int(args.facts))
+
+    conn = sqlite3.connect(path)
+    schema = read_star_schema(conn)
+    print(f"'{path}': fact tables {', '.join(f'{f} -> {sorted(set(d.values()))}' for f, d in schema['facts'].items())}")
+    start = time.perf_counter()
+    report = advise(conn, queries, args.repeats, apply=not args.dry_run)
+    print_report(report, queries)
+    print(f"\nAdvisor finished in {time.perf_counter() - start:.1f} s")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns # Added for better visualization
 from sklearn.impute import SimpleImputer
+from outliers import outlier_mask
+from model_artifacts import save_model_artifact
 
 
 # --------------------------------------------------------------------------------
@@ -36,6 +38,14 @@ VISUALIZATION_FEATURE_1 = 'Annual Income (k$)'
 VISUALIZATION_FEATURE_2 = 'Spending Score (1-100)'
 
 
+# Fitted model + preprocessing state are saved here for batch scoring (model_artifacts.py score ...)
+MODEL_ARTIFACT_FILE = 'kmeans_model.bundle'
+
+
+# Outlier removal before fitting (outliers.py): 'zscore', 'mad', 'iqr', 'isolation_forest', 'knn' or None
+OUTLIER_METHOD = None
+
+
 
 
 # --------------------------------------------------------------------------------
@@ -63,10 +73,12 @@ X = df.drop(columns=[col for col in FEATURES_TO_DROP if col in df.columns], erro
 
 
 # Handle categorical features by encoding them (e.g., 'Gender' in Mall dataset if not dropped)
+X_raw = X # Keep the raw features so the dummy vocabulary can be saved with the model
 X = pd.get_dummies(X, drop_first=True)
 
 
 # Impute missing values (just in case)
+imputer = None  # Its statistics_ are saved with the model as the imputation values
 if X.isnull().sum().any():
     print(f"\nHandling {X.isnull().sum().sum()} missing values using SimpleImputer (mean strategy)...")
     imputer = SimpleImputer(missing_values=np.nan, strategy='mean')
@@ -79,6 +91,15 @@ else:
 
 
 
+# Remove outliers before fitting (the same rows are dropped from df for plotting)
+if OUTLIER_METHOD:
+    is_outlier = outlier_mask(X, OUTLIER_METHOD).to_numpy()
+    print(f"\nRemoving {is_outlier.sum()} outlier row(s) flagged by '{OUTLIER_METHOD}'...")
+    X, df = X[~is_outlier], df[~is_outlier]
+
+
+
+
 # Feature Scaling (mandatory for K-Means)
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
@@ -137,6 +158,13 @@ if N_CLUSTERS > 1:
 
 
 
+# Save the fitted scaler + centroids for batch scoring
+save_model_artifact(MODEL_ARTIFACT_FILE, kmeans, X_raw, X, columns_to_drop=FEATURES_TO_DROP, scaler=scaler,
+                    imputer=imputer)
+
+
+
+
 # --- 4. Visualize the Clusters ---
 try:
     plt.figure(figsize=(10, 7))
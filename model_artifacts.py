@@ -0,0 +1,358 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import struct
+import time
+
+
+# --------------------------------------------------------------------------------
+# Model artifact bundles.
+#
+# One file holds everything a scoring job needs: the preprocessing state
+# (dropped columns, dummy vocabulary, imputation values, scaler parameters)
+# and the fitted model as plain NumPy arrays. Layout:
+#
+#     8 bytes   magic  b'IITMB001'
+#     8 bytes   little-endian uint64 length of the JSON header
+#     N bytes   JSON header (metadata + array table), padded to 64 bytes
+#     ...       raw arrays, each starting on a 64-byte boundary
+#
+# Arrays are opened with np.memmap, so loading costs one small read for the
+# header regardless of model size, and predictions are computed in NumPy
+# without unpickling sklearn objects.
+# --------------------------------------------------------------------------------
+
+MAGIC = b'IITMB001'
+ALIGNMENT = 64
+CHUNK_SIZE = 100_000
+
+
+def _pad(n):
+    return (-n) % ALIGNMENT
+
+
+def save_bundle(path, kind, preprocessing, arrays, params=None):
+    """
+    Writes a model bundle.
+
+    Args:
+        path (str): Output file.
+        kind (str): Model type ('linear_regression', 'kmeans', 'decision_tree', 'gaussian_nb').
+        preprocessing (dict): State from build_preprocessing_state().
+        arrays (dict): Name -> numeric NumPy array.
+        params (dict): Extra JSON-serializable model metadata (e.g. class labels).
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    table, offset = {}, 0
+    for name, a in arrays.items():
+        if a.dtype.kind not in 'biuf':
+            raise TypeError(f"Array '{name}' must be numeric, got dtype {a.dtype}.")
+        table[name] = {'dtype': a.dtype.str, 'shape': list(a.shape), 'offset': offset}
+        offset += a.nbytes + _pad(a.nbytes)
+
+    header = json.dumps({
+        'kind': kind,
+        'preprocessing': preprocessing,
+        'params': params or {},
+        'arrays': table,
+    }).encode('utf-8')
+    data_start = len(MAGIC) + 8 + len(header)
+    header += b' ' * _pad(data_start)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for a in arrays.values():
+            f.write(a.tobytes())
+            f.write(b'\0' * _pad(a.nbytes))
+
+
+def load_bundle(path):
+    """
+    Opens a model bundle. Arrays are read-only memory maps into the file.
+
+    Returns:
+        tuple: (metadata dict, arrays dict)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a model bundle.")
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        meta = json.loads(f.read(header_len))
+
+    data_start = len(MAGIC) + 8 + header_len
+    arrays = {}
+    for name, info in meta['arrays'].items():
+        shape = tuple(info['shape'])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=info['dtype'])
+        else:
+            arrays[name] = np.memmap(path, dtype=info['dtype'], mode='r',
+                                     offset=data_start + info['offset'], shape=shape)
+    return meta, arrays
+
+
+# --------------------------------------------------------------------------------
+# Preprocessing state
+# --------------------------------------------------------------------------------
+
+
+def _impute_values(X, imputer):
+    """Per-feature fill values: the fitted imputer's statistics_, else the training column means."""
+    means = X.astype(np.float64).mean().fillna(0.0)
+    if imputer is None:
+        return means.tolist()
+    names = getattr(imputer, 'feature_names_in_', None)
+    if names is None:   # Fitted on X.values: same columns, same order as X
+        if len(imputer.statistics_) != X.shape[1]:
+            raise ValueError("The imputer was fitted on a different number of columns than X; fit it on a DataFrame.")
+        names = X.columns
+    statistics = pd.Series(np.asarray(imputer.statistics_, dtype=np.float64), index=[str(c) for c in names])
+    return [float(statistics.get(str(col), means[col])) for col in X.columns]
+
+
+def build_preprocessing_state(X_raw, X, target=None, columns_to_drop=(), scaler=None, imputer=None):
+    """
+    Captures what the training scripts did to the raw CSV columns.
+
+    Args:
+        X_raw (pd.DataFrame): Feature columns before pd.get_dummies.
+        X (pd.DataFrame): Final (encoded, imputed) training features.
+        target (str): Target column (ignored when scoring).
+        columns_to_drop (iterable): Columns dropped before building features.
+        scaler (StandardScaler): Fitted scaler applied after imputation, if any.
+        imputer (SimpleImputer): Fitted imputer, if any; its statistics_ are
+                                 the imputation values. Without one, the
+                                 column means of X are used.
+
+    Returns:
+        dict: JSON-serializable preprocessing state.
+    """
+    categorical = [c for c in X_raw.columns if not pd.api.types.is_numeric_dtype(X_raw[c])]
+    vocabulary = {c: sorted(X_raw[c].dropna().astype(str).unique().tolist()) for c in categorical}
+
+    dummies = {}
+    for col, cats in vocabulary.items():
+        for cat in cats:
+            name = f"{col}_{cat}"
+            if name in X.columns:
+                dummies[name] = [col, cat]
+
+    features = [str(c) for c in X.columns]
+    state = {
+        'target': target,
+        'columns_to_drop': list(columns_to_drop),
+        'features': features,
+        'vocabulary': vocabulary,
+        'dummies': dummies,
+        'impute_values': _impute_values(X, imputer),
+        'scaler_mean': None,
+        'scaler_scale': None,
+    }
+    if scaler is not None:
+        state['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64).tolist()
+        state['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64).tolist()
+    return state
+
+
+def transform_chunk(chunk, state):
+    """
+    Applies the stored preprocessing to a raw CSV chunk.
+
+    Returns:
+        np.ndarray: float64 feature matrix in training column order.
+    """
+    X = np.empty((len(chunk), len(state['features'])), dtype=np.float64)
+    codes = {}
+    for j, name in enumerate(state['features']):
+        if name in state['dummies']:
+            col, cat = state['dummies'][name]
+            if col not in codes:
+                values = chunk[col].astype(str).where(chunk[col].notna())
+                codes[col] = pd.Categorical(values, categories=state['vocabulary'][col]).codes
+            X[:, j] = codes[col] == state['vocabulary'][col].index(cat)
+        else:
+            X[:, j] = pd.to_numeric(chunk[name], errors='coerce')
+
+    missing = np.isnan(X)
+    if missing.any():
+        X[missing] = np.take(np.asarray(state['impute_values']), np.nonzero(missing)[1])
+    if state['scaler_mean'] is not None:
+        X = (X - np.asarray(state['scaler_mean'])) / np.asarray(state['scaler_scale'])
+    return X
+
+
+# --------------------------------------------------------------------------------
+# Model export and NumPy predictors
+# --------------------------------------------------------------------------------
+
+
+def _class_labels(classes):
+    return [c.item() if hasattr(c, 'item') else c for c in classes]
+
+
+def export_model(model):
+    """
+    Converts a fitted sklearn model into (kind, arrays, params).
+    Supports LinearRegression, KMeans, DecisionTreeClassifier and GaussianNB.
+    """
+    name = type(model).__name__
+    if name == 'LinearRegression':
+        return 'linear_regression', {
+            'coef': np.asarray(model.coef_, dtype=np.float64),
+            'intercept': np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64)),
+        }, {}
+    if name == 'KMeans':
+        return 'kmeans', {'centers': np.asarray(model.cluster_centers_, dtype=np.float64)}, {}
+    if name == 'DecisionTreeClassifier':
+        tree = model.tree_
+        return 'decision_tree', {
+            'children_left': tree.children_left.astype(np.int64),
+            'children_right': tree.children_right.astype(np.int64),
+            'feature': tree.feature.astype(np.int64),
+            'threshold': tree.threshold.astype(np.float64),
+            'leaf_class': tree.value[:, 0, :].argmax(axis=1).astype(np.int64),
+        }, {'classes': _class_labels(model.classes_), 'max_depth': int(tree.max_depth)}
+    if name == 'GaussianNB':
+        return 'gaussian_nb', {
+            'theta': np.asarray(model.theta_, dtype=np.float64),
+            'var': np.asarray(model.var_, dtype=np.float64),
+            'class_prior': np.asarray(model.class_prior_, dtype=np.float64),
+        }, {'classes': _class_labels(model.classes_)}
+    raise TypeError(f"Unsupported model type: {name}")
+
+
+def predict(meta, arrays, X):
+    """Predicts with a loaded bundle on a preprocessed feature matrix."""
+    kind = meta['kind']
+    if kind == 'linear_regression':
+        return X @ arrays['coef'] + arrays['intercept'][0]
+
+    if kind == 'kmeans':
+        centers = arrays['centers']
+        # ||x - c||² without the ||x||² term, which is constant per row
+        distances = -2.0 * X @ centers.T + (centers ** 2).sum(axis=1)
+        return distances.argmin(axis=1)
+
+    classes = np.asarray(meta['params']['classes'], dtype=object)
+    if kind == 'decision_tree':
+        left, right = arrays['children_left'], arrays['children_right']
+        feature, threshold = arrays['feature'], arrays['threshold']
+        # sklearn compares float32 inputs against the split thresholds
+        Xf = X.astype(np.float32)
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.int64)
+        for _ in range(meta['params']['max_depth']):
+            internal = left[node] != -1
+            if not internal.any():
+                break
+            go_left = Xf[rows, np.maximum(feature[node], 0)] <= threshold[node]
+            node = np.where(internal, np.where(go_left, left[node], right[node]), node)
+        return classes[arrays['leaf_class'][node]]
+
+    if kind == 'gaussian_nb':
+        theta, var = arrays['theta'], arrays['var']
+        jll = (np.log(arrays['class_prior'])
+               - 0.5 * np.log(2.0 * np.pi * var).sum(axis=1)
+               - 0.5 * (((X[:, None, :] - theta[None, :, :]) ** 2) / var[None, :, :]).sum(axis=2))
+        return classes[jll.argmax(axis=1)]
+
+    raise ValueError(f"Unknown model kind '{kind}'.")
+
+
+def save_model_artifact(path, model, X_raw, X, target=None, columns_to_drop=(), scaler=None, imputer=None):
+    """
+    One-call helper for the training scripts: captures preprocessing state,
+    exports the model and writes the bundle.
+    """
+    kind, arrays, params = export_model(model)
+    state = build_preprocessing_state(X_raw, X, target, columns_to_drop, scaler, imputer)
+    save_bundle(path, kind, state, arrays, params)
+    print(f"Model artifact saved as '{path}' ({os.path.getsize(path) / 1024:.1f} KiB).")
+
+
+# --------------------------------------------------------------------------------
+# Batch scoring
+# --------------------------------------------------------------------------------
+
+
+def score(bundle_path, data_path, output_path=None, chunksize=CHUNK_SIZE):
+    """
+    Cold-loads a bundle and streams predictions over a CSV chunk by chunk.
+    If the CSV contains the target column, streaming metrics are reported.
+
+    Returns:
+        dict: Timings, row count and metrics (if the target was present).
+    """
+    from streaming_metrics import ClassificationMetrics, RegressionMetrics
+
+    start = time.perf_counter()
+    meta, arrays = load_bundle(bundle_path)
+    load_ms = (time.perf_counter() - start) * 1000
+    state = meta['preprocessing']
+
+    metrics = None
+    if state['target']:
+        metrics = RegressionMetrics() if meta['kind'] == 'linear_regression' else ClassificationMetrics()
+
+    n_rows, header = 0, True
+    start = time.perf_counter()
+    for chunk in pd.read_csv(data_path, chunksize=chunksize):
+        y_pred = predict(meta, arrays, transform_chunk(chunk, state))
+        n_rows += len(chunk)
+        if metrics is not None and state['target'] in chunk.columns:
+            metrics.update(chunk[state['target']].to_numpy(), y_pred)
+        if output_path:
+            out = chunk.assign(prediction=y_pred)
+            out.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    score_s = time.perf_counter() - start
+
+    return {
+        'kind': meta['kind'],
+        'load_ms': load_ms,
+        'score_s': score_s,
+        'rows': n_rows,
+        'metrics': metrics if metrics is not None and metrics.n else None,
+    }
+
+
+def main():
+    """
+    Command line entry point.
+
+        python model_artifacts.py score decision_tree_model.bundle Iris.csv --out predictions.csv
+    """
+    parser = argparse.ArgumentParser(description="Batch scoring with saved model bundles.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    score_cmd = commands.add_parser('score', help="Stream predictions for a CSV.")
+    score_cmd.add_argument('bundle', help="Model bundle written by one of the training scripts.")
+    score_cmd.add_argument('data', help="CSV to score (same raw columns as the training data).")
+    score_cmd.add_argument('--out', help="Write the input rows plus a 'prediction' column to this CSV.")
+    score_cmd.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help="Rows per chunk.")
+    args = parser.parse_args()
+
+    try:
+        result = score(args.bundle, args.data, args.out, args.chunksize)
+    except FileNotFoundError as e:
+        print(f"Error: '{e.filename}' not found.")
+        return
+
+    print(f"Loaded {result['kind']} bundle in {result['load_ms']:.2f} ms.")
+    print(f"Scored {result['rows']} rows in {result['score_s']:.3f}s.")
+    if args.out:
+        print(f"Predictions written to '{args.out}'.")
+    metrics = result['metrics']
+    if metrics is not None:
+        if result['kind'] == 'linear_regression':
+            print(f"MAE: {metrics.mae():.4f}  RMSE: {metrics.rmse():.4f}  R2: {metrics.r2():.4f}")
+        else:
+            print(f"Accuracy: {metrics.accuracy():.4f}")
+            print(metrics.classification_report())
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ from sklearn.naive_bayes import GaussianNB
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import numpy as np
 from sklearn.impute import SimpleImputer # New import for handling NaNs
+from model_artifacts import save_model_artifact
 
 
 # --- CONFIGURATION: Change these for a new dataset ---
@@ -25,6 +26,12 @@ TARGET_COLUMN = 'Species'
 # ⚠️ 3. Change the name of the unique ID column to drop (or set to None if no ID column exists)
 # Note: Based on your traceback, the ID column is 'id'
 ID_COLUMN_TO_DROP = 'id'
+
+# ⚠️ 4. Set to True to prune uninformative/redundant features before training (see feature_screening.py)
+SCREEN_FEATURES = False
+
+# ⚠️ 5. Fitted model + preprocessing state are saved here for batch scoring (model_artifacts.py score ...)
+MODEL_ARTIFACT_FILE = 'naive_bayes_model.bundle'
 # --- END CONFIGURATION ---
 
 
@@ -73,6 +80,7 @@ except KeyError:
 
 
 # --- NEW STEP: Handle Missing Values (NaN) via Mean Imputation ---
+imputer = None  # Its statistics_ are saved with the model as the imputation values
 if X.isnull().sum().any():
     print(f"\nHandling {X.isnull().sum().sum()} missing values using SimpleImputer (mean strategy)...")
    
@@ -96,6 +104,12 @@ else:
 print("Splitting data into 80% training and 20% testing...")
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
+# (Optional) Feature screening on the training split only, so test rows never influence the selection
+if SCREEN_FEATURES:
+    from feature_screening import screen_features
+    selected_features = screen_features(X_train, y_train, dataset_file=DATASET_FILE)
+    X_train, X_test = X_train[selected_features], X_test[selected_features]
+
 
 # Display shapes of the split data
 print(f"X_train shape: {X_train.shape}")
@@ -114,6 +128,8 @@ nb_model = GaussianNB()
 print("Training Gaussian Naive Bayes model...")
 nb_model.fit(X_train, y_train)
 print("Training complete.")
+save_model_artifact(MODEL_ARTIFACT_FILE, nb_model, X_train, X_train, target=TARGET_COLUMN,
+                    columns_to_drop=[ID_COLUMN_TO_DROP] + unnamed_cols, imputer=imputer)
 print("-" * 50)
 
 
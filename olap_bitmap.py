@@ -0,0 +1,277 @@
+import numpy as np
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import olap_columnar
+import olap_cube
+import synthetic_star
+
+
+# --------------------------------------------------------------------------------
+# Compressed bitmap indexes over the fact rows of the columnar engine
+# (olap_columnar.py), in the layout of Roaring bitmaps:
+#
+#   row id -> high bits (row >> 16) select a container, low 16 bits live in it
+#   array container   sorted uint16 values, for up to ARRAY_LIMIT rows
+#   bitmap container  1024 x uint64 words (8 KB), above ARRAY_LIMIT rows
+#
+# A container therefore never costs more than 8 KB nor more than 2 bytes per
+# row, and AND / OR work container by container (word-wise for two bitmaps,
+# bit probes or sorted merges when an array is involved), only for the keys
+# present on both (AND) or either (OR) side.
+#
+# BitmapIndex keeps one bitmap per value of each low-cardinality attribute
+# (Quarter, Category, Region). A dice filter becomes OR within an attribute
+# and AND across attributes; only the surviving row ids are then used to
+# gather group keys and measures from the fact columns. Facts are appended
+# at increasing row ids, so an update only rebuilds the last, partly filled
+# container of each bitmap and adds new ones.
+# --------------------------------------------------------------------------------
+
+CONTAINER_BITS = 16
+CONTAINER_SIZE = 1 << CONTAINER_BITS
+ARRAY_LIMIT = 4096                    # Above this many rows a container switches to 1024 64-bit words
+BITMAP_ATTRIBUTES = ('Quarter', 'Category', 'Region')
+REPEATS = 3
+
+BENCHMARK_REQUESTS = {   # name -> (group by, where)
+    'slice Q4': (['Product'], {'Quarter': 'Q4'}),
+    'dice Electronics Q1/Q2': (['Region', 'Product'], {'Category': 'Electronics', 'Quarter': ['Q1', 'Q2']}),
+    'dice 3 attributes': (['City', 'Product'], {'Category': ['Electronics', 'Home Appliance'],
+                                                'Quarter': 'Q4', 'Region': ['North-East', 'Central']}),
+}
+
+
+
+
+# --- Containers ---
+
+
+def _is_bitmap(container):
+    return container.dtype == np.uint64
+
+
+def _to_words(low):
+    bits = np.zeros(CONTAINER_SIZE, dtype=bool)
+    bits[low] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def _to_low(words):
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder='little')).astype(np.uint16)
+
+
+def _cardinality(container):
+    return int(np.bitwise_count(container).sum()) if _is_bitmap(container) else len(container)
+
+
+def _normalize(container):
+    """The cheaper representation of the same set."""
+    if _is_bitmap(container):
+        return _to_low(container) if _cardinality(container) <= ARRAY_LIMIT else container
+    return _to_words(container) if len(container) > ARRAY_LIMIT else container
+
+
+def _and(a, b):
+    if _is_bitmap(a) and _is_bitmap(b):
+        return _normalize(a & b)
+    if _is_bitmap(a):
+        a, b = b, a
+    if _is_bitmap(b):   # Probe the array's values in the bitmap's words
+        return a[((b[a >> 6] >> (a & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def _or(a, b):
+    if _is_bitmap(a) and _is_bitmap(b):
+        return a | b
+    if _is_bitmap(a):
+        a, b = b, a
+    if _is_bitmap(b):
+        return b | _to_words(a)
+    return _normalize(np.union1d(a, b))
+
+
+class RoaringBitmap:
+    """A set of row ids as {high bits: array or bitmap container}."""
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """From sorted, distinct int64 row ids."""
+        rows = np.asarray(rows, dtype=np.int64)
+        high = rows >> CONTAINER_BITS
+        keys, starts = np.unique(high, return_index=True)
+        ends = np.append(starts[1:], len(rows))
+        low = (rows & (CONTAINER_SIZE - 1)).astype(np.uint16)
+        return cls({int(k): _normalize(low[s:e]) for k, s, e in zip(keys, starts, ends)})
+
+    def __and__(self, other):
+        result = {}
+        for key in sorted(self.containers.keys() & other.containers.keys()):
+            container = _and(self.containers[key], other.containers[key])
+            if _cardinality(container):
+                result[key] = container
+        return RoaringBitmap(result)
+
+    def __or__(self, other):
+        result = dict(self.containers)
+        for key, container in other.containers.items():
+            result[key] = _or(result[key], container) if key in result else container
+        return RoaringBitmap(result)
+
+    def __len__(self):
+        return sum(_cardinality(c) for c in self.containers.values())
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.containers.values())
+
+    def to_rows(self):
+        """Sorted int64 row ids."""
+        parts = [(np.int64(key) << CONTAINER_BITS) + (_to_low(c) if _is_bitmap(c) else c).astype(np.int64)
+                 for key, c in sorted(self.containers.items())]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+
+
+# --- The index over the fact rows ---
+
+
+class BitmapIndex:
+    """One RoaringBitmap of fact rows per value of each indexed attribute."""
+
+    def __init__(self, attributes=BITMAP_ATTRIBUTES):
+        self.bitmaps = {attr: {} for attr in attributes}
+        self.n_rows = 0
+
+    @classmethod
+    def build(cls, engine, attributes=BITMAP_ATTRIBUTES):
+        index = cls(attributes)
+        index.update(engine)
+        return index
+
+    def update(self, engine):
+        """
+        Indexes the engine's facts from row n_rows on, i.e. the rows appended
+        since the last build or update.
+
+        Returns:
+            int: Rows indexed.
+        """
+        start = self.n_rows
+        for attr, bitmaps in self.bitmaps.items():
+            dimension = engine.dimensions[olap_columnar.ATTRIBUTES[attr][0]]
+            index = engine.rows[olap_columnar.ATTRIBUTES[attr][0]][start:]
+            codes = np.where(index >= 0, dimension.codes[attr][index], -1)   # Orphans are in no bitmap
+            for code, value in enumerate(dimension.values[attr]):
+                rows = np.flatnonzero(codes == code)
+                if not len(rows):
+                    continue
+                new = RoaringBitmap.from_rows(rows + start)
+                bitmaps[value] = bitmaps[value] | new if value in bitmaps else new
+        self.n_rows = engine.n_facts
+        return self.n_rows - start
+
+    def lookup(self, attr, values):
+        """Rows whose attribute is any of `values` (OR of their bitmaps)."""
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        result = RoaringBitmap()
+        for value in values:
+            if value in self.bitmaps[attr]:
+                result = result | self.bitmaps[attr][value]
+        return result
+
+    def select(self, where):
+        """Rows passing every indexed predicate of `where` (AND across attributes), most selective first."""
+        bitmaps = sorted((self.lookup(attr, values) for attr, values in where.items()), key=len)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap
+        return result
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for bitmaps in self.bitmaps.values() for b in bitmaps.values())
+
+
+def bitmap_group_by(engine, index, by, where, measure='Revenue'):
+    """
+    engine.group_by() with the indexed predicates of `where` evaluated on the
+    bitmaps; the remaining predicates are applied to the surviving rows only.
+    """
+    indexed = {attr: values for attr, values in where.items() if attr in index.bitmaps}
+    if not indexed:
+        return engine.group_by(by, where, measure)
+    rows = index.select(indexed).to_rows()
+    for attr, values in where.items():
+        if attr in indexed:
+            continue
+        table = olap_columnar.ATTRIBUTES[attr][0]
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        fact_rows = engine.rows[table][rows]
+        rows = rows[(fact_rows >= 0) & engine.dimensions[table].match(attr, values)[fact_rows]]
+    return engine.group_by(by, measure=measure, selection=rows)
+
+
+def _best_time(run, repeats=REPEATS):
+    return olap_columnar._best_time(run, repeats)
+
+
+def _check(conn, engine, index):
+    """True if every benchmark request gives the SQL result through the bitmaps."""
+    return all(olap_columnar._same(olap_cube.star_query(conn, by, where)[by + ['Revenue']],
+                                   bitmap_group_by(engine, index, by, where))
+               for by, where in BENCHMARK_REQUESTS.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roaring-style bitmap indexes for slice and dice filters.")
+    parser.add_argument('--db', default='star_schema.db', help="Star-schema database; generated if missing.")
+    parser.add_argument('--facts', type=float, default=2e6, help="Facts of the generated warehouse.")
+    parser.add_argument('--append', type=int, default=100_000, help="Facts appended for the update benchmark.")
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Generating {int(args.facts):,} synthetic facts into '{args.db}'...")
+        synthetic_star.generate_warehouse(args.db, int(args.facts))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bitmap.db')
+        shutil.copy(args.db, path)   # The update benchmark appends facts
+        conn = sqlite3.connect(path)
+        engine = olap_columnar.ColumnarOLAP.from_sqlite(conn)
+        build_time, index = _best_time(lambda: BitmapIndex.build(engine), 1)
+        n_bitmaps = sum(len(b) for b in index.bitmaps.values())
+        print(f"Indexed {engine.n_facts:,} facts: {n_bitmaps} bitmaps, {index.nbytes / 1e6:.1f} MB "
+              f"(vs {engine.n_facts * n_bitmaps / 8e6:.1f} MB uncompressed), built in {build_time:.2f} s")
+
+        print(f"\n{'Request':<26}{'Rows':>10}{'SQL (ms)':>10}{'Masks (ms)':>12}{'Bitmaps (ms)':>14}"
+              f"{'Filter only: masks':>20}{' / bitmaps (ms)':>16}")
+        for name, (by, where) in BENCHMARK_REQUESTS.items():
+            sql_time, _ = _best_time(lambda: olap_cube.star_query(conn, by, where), args.repeats)
+            mask_time, _ = _best_time(lambda: engine.group_by(by, where), args.repeats)
+            bitmap_time, _ = _best_time(lambda: bitmap_group_by(engine, index, by, where), args.repeats)
+            mask_filter, selected = _best_time(lambda: engine._selection(where, by), args.repeats)
+            bitmap_filter, _ = _best_time(lambda: index.select(where).to_rows(), args.repeats)
+            print(f"{name:<26}{len(selected):>10,}{sql_time * 1000:>10.1f}{mask_time * 1000:>12.1f}"
+                  f"{bitmap_time * 1000:>14.1f}{mask_filter * 1000:>20.1f}{bitmap_filter * 1000:>16.1f}")
+        print(f"Bitmap results match SQL: {_check(conn, engine, index)}")
+
+        olap_cube._append_facts(conn, args.append)
+        engine.append_from_sqlite(conn)
+        update_time, added = _best_time(lambda: index.update(engine), 1)
+        rebuild_time, _ = _best_time(lambda: BitmapIndex.build(engine), 1)
+        print(f"\nAppended {added:,} facts: index update {update_time * 1000:.0f} ms vs rebuild "
+              f"{rebuild_time * 1000:.0f} ms; results match SQL after the update: {_check(conn, engine, index)}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
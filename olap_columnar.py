@@ -0,0 +1,294 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import sqlite3
+import time
+import olap_cube
+import olap_operations
+import synthetic_star
+
+
+# --------------------------------------------------------------------------------
+# In-memory columnar OLAP engine for the olap_operations.py star schema.
+#
+# The fact table is held as contiguous NumPy columns: one int32 row index per
+# dimension (the position of the fact's key in the dimension, resolved once
+# at load time) and one int64 array per measure. Each dimension attribute is
+# dictionary-encoded: sorted distinct values plus an int32 code per dimension
+# row.
+#
+# A query never joins. Filters are evaluated on the small dimension tables
+# (np.isin on the codes) and gathered to the facts through the row index.
+# Group keys are the mixed-radix combination of the grouped attributes'
+# codes, and a single np.bincount sums the measure per key. Because the keys
+# are dense, a pivot is just the bincount reshaped to (rows, columns).
+# Inner-join semantics are kept: facts whose key is missing from a dimension
+# the query groups or filters on are excluded, as the SQL JOINs exclude them.
+# --------------------------------------------------------------------------------
+
+ATTRIBUTES = olap_cube.ATTRIBUTES   # Attribute -> (dimension table, column)
+DIMENSION_KEYS = {'Product_Dim': 'Product_ID', 'Branch_Dim': 'Branch_ID', 'Time_Dim': 'Time_ID'}
+MEASURES = ('Revenue', 'Quantity')
+LOAD_CHUNK_ROWS = 1_000_000
+MAX_DENSE_GROUPS = 10_000_000   # Above this many key combinations, keys are compacted with np.unique
+REPEATS = 3
+
+
+class Dimension:
+    """A dimension table: its sorted keys and its dictionary-encoded attributes."""
+
+    def __init__(self, keys, attributes):
+        order = np.argsort(keys, kind='stable')
+        self.keys = np.asarray(keys, dtype=np.int64)[order]
+        self.codes, self.values = {}, {}
+        for name, column in attributes.items():
+            # NULL gets its own code (sorted last), so NULLs form one group as in SQL
+            codes, uniques = pd.factorize(pd.Series(column).iloc[order], sort=True, use_na_sentinel=False)
+            self.codes[name] = codes.astype(np.int32)
+            self.values[name] = np.asarray(uniques, dtype=object)
+
+    def rows(self, fact_keys):
+        """Row position of every fact key, -1 where the key is not in the dimension."""
+        pos = np.searchsorted(self.keys, fact_keys)
+        pos = np.minimum(pos, len(self.keys) - 1)
+        return np.where(self.keys[pos] == fact_keys, pos, -1).astype(np.int32)
+
+    def match(self, attribute, wanted):
+        """Boolean per dimension row: the attribute is one of `wanted`."""
+        return np.isin(self.values[attribute], list(wanted))[self.codes[attribute]]
+
+
+class ColumnarOLAP:
+    """
+    The fact table as NumPy columns plus dictionary-encoded dimensions.
+
+    Args:
+        dimensions (dict): Table -> Dimension.
+        rows (dict): Table -> int32 dimension row of every fact.
+        measures (dict): Measure -> int64 array.
+    """
+
+    def __init__(self, dimensions, rows, measures, last_sale_id=0):
+        self.dimensions = dimensions
+        self.rows = rows
+        self.measures = measures
+        self.last_sale_id = last_sale_id
+        self.n_facts = len(next(iter(measures.values())))
+        self.has_orphans = {table: bool((index < 0).any()) for table, index in rows.items()}
+
+    @classmethod
+    def from_sqlite(cls, conn, chunk_rows=LOAD_CHUNK_ROWS):
+        """Loads the star schema, resolving the foreign keys to row positions chunk by chunk."""
+        dimensions = {}
+        for table, key in DIMENSION_KEYS.items():
+            df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+            dimensions[table] = Dimension(df[key].to_numpy(), {attr: df[col] for attr, (t, col) in ATTRIBUTES.items()
+                                                               if t == table})
+        rows, measures, last_sale_id = _read_facts(conn, dimensions, 0, chunk_rows)
+        return cls(dimensions, rows, measures, last_sale_id)
+
+    def append_from_sqlite(self, conn, chunk_rows=LOAD_CHUNK_ROWS):
+        """
+        Appends the facts with Sale_ID above the last one loaded (their
+        dimension rows must already be known). The columns are reallocated,
+        so this suits periodic batches rather than single rows.
+
+        Returns:
+            int: Facts appended.
+        """
+        rows, measures, last_sale_id = _read_facts(conn, self.dimensions, self.last_sale_id, chunk_rows)
+        n_new = len(next(iter(measures.values())))
+        if n_new:
+            self.rows = {table: np.concatenate([self.rows[table], rows[table]]) for table in self.rows}
+            self.measures = {m: np.concatenate([self.measures[m], measures[m]]) for m in self.measures}
+            self.__init__(self.dimensions, self.rows, self.measures, last_sale_id)
+        return n_new
+
+    def _selection(self, where, by=()):
+        """
+        Indices of the facts passing `where` ({attribute: value or values}) that
+        join every dimension the query touches, or None for all facts.
+        """
+        tables = {ATTRIBUTES[attr][0] for attr in list(by) + list(where or {})}
+        dim_ok = {table: None for table in tables if self.has_orphans[table]}
+        for attr, wanted in (where or {}).items():
+            table = ATTRIBUTES[attr][0]
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            ok = self.dimensions[table].match(attr, wanted)
+            dim_ok[table] = ok if dim_ok.get(table) is None else dim_ok[table] & ok
+        if not dim_ok:
+            return None
+        mask = np.ones(self.n_facts, dtype=bool)
+        for table, ok in dim_ok.items():
+            index = self.rows[table]
+            if ok is not None:
+                mask &= ok[index]
+            if self.has_orphans[table]:
+                mask &= index >= 0   # Unknown keys fall out of the join (and read ok[-1] above)
+        return np.flatnonzero(mask)
+
+    def _group_keys(self, by, selection):
+        """Dense mixed-radix group key of every selected fact, and the cardinality of each attribute."""
+        shape = [len(self.dimensions[ATTRIBUTES[attr][0]].values[attr]) for attr in by]
+        n_selected = self.n_facts if selection is None else len(selection)
+        keys = np.zeros(n_selected, dtype=np.int64)
+        # Combine the codes per dimension on the (small) dimension table, then gather once per dimension
+        tables = list(dict.fromkeys(ATTRIBUTES[attr][0] for attr in by))
+        for table in tables:
+            dim_key = np.zeros(len(self.dimensions[table].keys), dtype=np.int64)
+            for i, attr in enumerate(by):
+                if ATTRIBUTES[attr][0] == table:
+                    dim_key += self.dimensions[table].codes[attr] * int(np.prod(shape[i + 1:], dtype=np.int64))
+            index = self.rows[table] if selection is None else self.rows[table][selection]
+            keys += dim_key[index]
+        return keys, shape
+
+    def aggregate(self, by, where=None, measure='Revenue', selection=None):
+        """
+        SUM(measure) (or the fact count for measure='Sales') grouped by `by`.
+
+        Args:
+            by (list): Attributes of ATTRIBUTES to group by.
+            where (dict): Attribute -> value or list of values.
+            measure (str): 'Revenue', 'Quantity' or 'Sales'.
+            selection (np.ndarray): Fact rows already filtered (e.g. by a bitmap
+                index); used instead of evaluating `where`.
+
+        Returns:
+            tuple: (dense sums reshaped to the attribute cardinalities, fact counts likewise)
+        """
+        if selection is None:
+            selection = self._selection(where, by)
+        else:
+            for table in {ATTRIBUTES[attr][0] for attr in by}:
+                if self.has_orphans[table]:
+                    selection = selection[self.rows[table][selection] >= 0]
+        keys, shape = self._group_keys(by, selection)
+        weights = None
+        if measure != 'Sales':
+            weights = self.measures[measure] if selection is None else self.measures[measure][selection]
+        n_groups = int(np.prod(shape, dtype=np.int64))
+        if n_groups <= MAX_DENSE_GROUPS:
+            sums = np.bincount(keys, weights=weights, minlength=n_groups)
+            counts = np.bincount(keys, minlength=n_groups)
+        else:
+            present, inverse = np.unique(keys, return_inverse=True)
+            sums, counts = np.zeros(n_groups), np.zeros(n_groups, dtype=np.int64)
+            sums[present] = np.bincount(inverse, weights=weights, minlength=len(present))
+            counts[present] = np.bincount(inverse, minlength=len(present))
+        return sums.reshape(shape), counts.reshape(shape)
+
+    def _frame(self, by, sums, counts, measure):
+        present = np.flatnonzero(counts.ravel())
+        positions = np.unravel_index(present, counts.shape)
+        df = pd.DataFrame({attr: self.dimensions[ATTRIBUTES[attr][0]].values[attr][pos]
+                           for attr, pos in zip(by, positions)})
+        df[measure] = np.rint(sums.ravel()[present]).astype(np.int64)
+        return df
+
+    def group_by(self, by, where=None, measure='Revenue', selection=None):
+        """Grouped sums as a DataFrame with one row per existing combination, sorted by `by`."""
+        sums, counts = self.aggregate(by, where, measure, selection)
+        return self._frame(by, sums, counts, measure)
+
+    # --- The five OLAP operations ---
+
+    def rollup(self, level='Region', measure='Revenue'):
+        return self.group_by([level], measure=measure)
+
+    def drilldown(self, levels=('Region', 'City'), measure='Revenue'):
+        return self.group_by(list(levels), measure=measure)
+
+    def slice(self, attribute='Quarter', value='Q4', by=('Product',), measure='Revenue'):
+        return self.group_by(list(by), {attribute: value}, measure)
+
+    def dice(self, where=None, by=('Region', 'Product'), measure='Revenue'):
+        where = where or {'Category': 'Electronics', 'Quarter': ['Q1', 'Q2']}
+        return self.group_by(list(by), where, measure)
+
+    def pivot(self, rows='Product', columns='Quarter', measure='Revenue'):
+        """rows x columns table of sums; rows with no facts at all are left out, empty cells are 0."""
+        sums, counts = self.aggregate([rows, columns], measure=measure)
+        keep = counts.sum(axis=1) > 0
+        column_values = self.dimensions[ATTRIBUTES[columns][0]].values[columns]
+        df = pd.DataFrame(np.rint(sums[keep]).astype(np.int64), columns=list(column_values))
+        df.insert(0, rows, self.dimensions[ATTRIBUTES[rows][0]].values[rows][keep])
+        return df
+
+
+def _read_facts(conn, dimensions, after_sale_id, chunk_rows=LOAD_CHUNK_ROWS):
+    """Row indexes and measures of the facts with Sale_ID above `after_sale_id`, in Sale_ID order."""
+    last_sale_id = conn.execute("SELECT COALESCE(MAX(Sale_ID), 0) FROM Sales_Fact").fetchone()[0]
+    bounds = (after_sale_id, last_sale_id)
+    n = conn.execute("SELECT COUNT(*) FROM Sales_Fact WHERE Sale_ID > ? AND Sale_ID <= ?", bounds).fetchone()[0]
+    rows = {table: np.empty(n, dtype=np.int32) for table in DIMENSION_KEYS}
+    measures = {m: np.empty(n, dtype=np.int64) for m in MEASURES}
+    columns = list(DIMENSION_KEYS.values()) + list(MEASURES)
+    start = 0
+    for chunk in pd.read_sql_query(f"SELECT {', '.join(columns)} FROM Sales_Fact WHERE Sale_ID > ? AND Sale_ID <= ? "
+                                   f"ORDER BY Sale_ID", conn, params=bounds, chunksize=chunk_rows):
+        end = start + len(chunk)
+        for table, key in DIMENSION_KEYS.items():
+            rows[table][start:end] = dimensions[table].rows(chunk[key].to_numpy(dtype=np.int64))
+        for m in MEASURES:
+            measures[m][start:end] = chunk[m].fillna(0).to_numpy(dtype=np.int64)
+        start = end
+    return rows, measures, max(last_sale_id, after_sale_id)
+
+
+OPERATIONS = {   # olap_operations.QUERIES key -> the same query on the engine
+    'rollup': lambda engine: engine.rollup(),
+    'drilldown': lambda engine: engine.drilldown(),
+    'slice': lambda engine: engine.slice(),
+    'dice': lambda engine: engine.dice(),
+    'pivot': lambda engine: engine.pivot(),
+}
+
+
+def _best_time(run, repeats=REPEATS):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _same(expected, result):
+    """Same rows of numbers once both are sorted by their text columns (column names may differ)."""
+    def numbers(df):
+        keys = list(df.select_dtypes(exclude='number').columns)
+        return df.sort_values(keys).select_dtypes('number').to_numpy(dtype=np.float64)
+    return expected.shape == result.shape and np.array_equal(numbers(expected), numbers(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy columnar OLAP engine benchmarked against SQLite.")
+    parser.add_argument('--db', default='star_schema.db', help="Star-schema database; generated if missing.")
+    parser.add_argument('--facts', type=float, default=2e6, help="Facts of the generated warehouse.")
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Generating {int(args.facts):,} synthetic facts into '{args.db}'...")
+        synthetic_star.generate_warehouse(args.db, int(args.facts))
+    conn = sqlite3.connect(args.db)
+
+    start = time.perf_counter()
+    engine = ColumnarOLAP.from_sqlite(conn)
+    load_time = time.perf_counter() - start
+    size = sum(a.nbytes for a in list(engine.rows.values()) + list(engine.measures.values()))
+    print(f"Loaded {engine.n_facts:,} facts in {load_time:.2f} s ({size / 1e6:.0f} MB of columns)")
+
+    print(f"\n{'Operation':<12}{'SQL (ms)':>10}{'NumPy (ms)':>12}{'Speed-up':>10}  Same result")
+    for op, run in OPERATIONS.items():
+        sql_time, expected = _best_time(lambda: pd.read_sql_query(olap_operations.QUERIES[op][1], conn), args.repeats)
+        numpy_time, result = _best_time(lambda: run(engine), args.repeats)
+        print(f"{op:<12}{sql_time * 1000:>10.1f}{numpy_time * 1000:>12.1f}{sql_time / numpy_time:>9.0f}x  "
+              f"{_same(expected, result)}")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+import pandas as pd
+import numpy as np
+import argparse
+import itertools
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import etl
+import olap_operations
+import synthetic_star
+
+
+# --------------------------------------------------------------------------------
+# Materialized cube over the olap_operations.py star schema.
+#
+# The group-by lattice is built from the dimension hierarchies: every view
+# picks one level per dimension (branch: -, Region, Region+City; product: -,
+# Category, Category+Product; time: -, Year, Quarter, Year+Quarter), which
+# gives 36 views. A view can answer any request whose attributes (group-by
+# and filter columns) are a subset of its own, because the measures (Revenue,
+# Quantity and the Sales count) are all sums.
+#
+# View selection is the greedy algorithm of Harinarayan, Rajaraman and Ullman:
+# answering from a view costs its row count (the fact table costs its own),
+# and each step materializes the view with the largest benefit per stored row
+# (total cost saved over the views it can answer) that still fits the row
+# budget. View sizes are counted on the finest cuboid, which is computed once
+# from the facts, so selection needs one pass over the fact table.
+#
+# Views are tables cube_<attributes> with a UNIQUE key on their attributes.
+# Appended facts (Sale_ID above the stored mark) are aggregated once and
+# merged into every view with INSERT ... ON CONFLICT DO UPDATE, so a refresh
+# costs the delta instead of a rebuild. Dimension updates (e.g. a branch
+# moving region) are not incremental: rebuild the cube.
+# --------------------------------------------------------------------------------
+
+ATTRIBUTES = {   # Cube attribute -> (dimension table, column)
+    'Region': ('Branch_Dim', 'Region'),
+    'City': ('Branch_Dim', 'City'),
+    'Category': ('Product_Dim', 'Category'),
+    'Product': ('Product_Dim', 'Product_Name'),
+    'Year': ('Time_Dim', 'Year'),
+    'Quarter': ('Time_Dim', 'Quarter'),
+}
+HIERARCHY_LEVELS = [   # One level per dimension makes a view
+    [(), ('Region',), ('Region', 'City')],
+    [(), ('Category',), ('Category', 'Product')],
+    [(), ('Year',), ('Quarter',), ('Year', 'Quarter')],
+]
+MEASURES = ('Revenue', 'Quantity', 'Sales')
+METADATA_TABLE = 'cube_views'
+BUDGET_FRACTION = 0.1   # Default storage budget: rows equal to 10% of the fact table
+
+# The five olap_operations.py queries as cube requests (group_by, where, pivot)
+CUBE_REQUESTS = {
+    'rollup': ("ROLL-UP (Total Revenue by Region)", {'group_by': ['Region']}),
+    'drilldown': ("DRILL-DOWN (Revenue by City within Region)", {'group_by': ['Region', 'City']}),
+    'slice': ("SLICE (Sales in Q4)", {'group_by': ['Product'], 'where': {'Quarter': 'Q4'}}),
+    'dice': ("DICE (Electronics in Q1 and Q2)",
+             {'group_by': ['Region', 'Product'], 'where': {'Category': 'Electronics', 'Quarter': ['Q1', 'Q2']}}),
+    'pivot': ("PIVOT (Product vs Quarter)", {'group_by': ['Product'], 'pivot': 'Quarter'}),
+}
+
+
+def lattice():
+    """Every view of the lattice as a tuple of attributes (finest first)."""
+    views = [sum(levels, ()) for levels in itertools.product(*HIERARCHY_LEVELS)]
+    return sorted(views, key=len, reverse=True)
+
+
+def view_table(attributes):
+    return 'cube_' + ('_'.join(attributes).lower() or 'all')
+
+
+def _condition(where, qualified=False):
+    """SQL condition and parameters for {attribute: value or list of values}."""
+    terms, params = [], []
+    for attr, value in (where or {}).items():
+        column = '.'.join(ATTRIBUTES[attr]) if qualified else attr
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        terms.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return (' WHERE ' + ' AND '.join(terms) if terms else ''), params
+
+
+def star_query(conn, attributes, where=None, since_sale_id=None):
+    """Measures grouped by `attributes`, computed from the fact table and its dimensions."""
+    columns = [f"{table}.{col} AS {attr}" for attr, (table, col) in ATTRIBUTES.items() if attr in attributes]
+    condition, params = _condition(where, qualified=True)
+    if since_sale_id is not None:
+        condition += (' AND' if condition else ' WHERE') + ' Sales_Fact.Sale_ID > ?'
+        params.append(since_sale_id)
+    group = [attr for attr in ATTRIBUTES if attr in attributes]
+    sql = f"""
+        SELECT {''.join(c + ', ' for c in columns)}SUM(Revenue) AS Revenue, SUM(Quantity) AS Quantity, COUNT(*) AS Sales
+        FROM Sales_Fact
+        JOIN Branch_Dim USING (Branch_ID)
+        JOIN Product_Dim USING (Product_ID)
+        JOIN Time_Dim USING (Time_ID){condition}
+        {'GROUP BY ' + ', '.join(group) if group else ''}"""
+    df = pd.read_sql_query(sql, conn, params=params)
+    return df[df['Sales'] > 0] if not group else df   # An empty selection still returns one all-NULL row
+
+
+def _aggregate(base, attributes):
+    if not attributes:
+        return base[list(MEASURES)].sum().to_frame().T
+    return base.groupby(list(attributes), sort=False, as_index=False)[list(MEASURES)].sum()
+
+
+def select_views(sizes, n_facts, budget_rows, weights=None):
+    """
+    Greedy view selection (benefit per stored row) under a row budget.
+
+    Args:
+        sizes (dict): View (attribute tuple) -> row count.
+        n_facts (int): Cost of answering from the fact table.
+        budget_rows (int): Total rows the materialized views may hold.
+        weights (dict): Optional view -> query frequency; uniform by default.
+
+    Returns:
+        list: Selected views in selection order.
+    """
+    weights = weights or {view: 1.0 for view in sizes}
+    cost = {view: float(n_facts) for view in sizes}
+    answers = {w: [v for v in sizes if set(v) <= set(w)] for w in sizes}
+    selected, used = [], 0
+    while True:
+        best, best_ratio = None, 0.0
+        for w, size in sizes.items():
+            if w in selected or used + size > budget_rows:
+                continue
+            benefit = sum(weights.get(v, 0.0) * max(0.0, cost[v] - size) for v in answers[w])
+            if benefit / max(size, 1) > best_ratio:
+                best, best_ratio = w, benefit / max(size, 1)
+        if best is None:
+            return selected
+        selected.append(best)
+        used += sizes[best]
+        for v in answers[best]:
+            cost[v] = min(cost[v], sizes[best])
+
+
+
+
+class MaterializedCube:
+    """The materialized views of one warehouse and the request router over them."""
+
+    def __init__(self, conn, views, last_sale_id):
+        self.conn = conn
+        self.views = views              # Attribute tuple -> row count
+        self.last_sale_id = last_sale_id
+
+    @classmethod
+    def build(cls, conn, budget_rows=None, weights=None, verbose=False):
+        """Selects and materializes views for the warehouse, replacing any previous cube."""
+        cls.drop(conn)
+        last_sale_id = conn.execute("SELECT COALESCE(MAX(Sale_ID), 0) FROM Sales_Fact").fetchone()[0]
+        n_facts = conn.execute("SELECT COUNT(*) FROM Sales_Fact").fetchone()[0]
+        base = star_query(conn, lattice()[0])
+        sizes = {view: (len(base.groupby(list(view), sort=False)) if view else 1) for view in lattice()}
+        budget_rows = int(BUDGET_FRACTION * n_facts) if budget_rows is None else budget_rows
+        selected = select_views(sizes, n_facts, budget_rows, weights)
+        if verbose:
+            print(f"Lattice: {len(sizes)} views; finest {sizes[lattice()[0]]:,} rows; budget {budget_rows:,} rows")
+
+        with conn:
+            conn.execute(f"CREATE TABLE {METADATA_TABLE} (view TEXT PRIMARY KEY, attributes TEXT, "
+                         f"row_count INTEGER, last_sale_id INTEGER)")
+            for view in selected:
+                cls._create_view(conn, view, _aggregate(base, view))
+                conn.execute(f"INSERT INTO {METADATA_TABLE} VALUES (?, ?, ?, ?)",
+                             (view_table(view), ','.join(view), sizes[view], last_sale_id))
+        return cls(conn, {view: sizes[view] for view in selected}, last_sale_id)
+
+    @staticmethod
+    def _create_view(conn, view, df):
+        table = view_table(view)
+        types = {'Year': 'INTEGER'}
+        columns = [f"{attr} {types.get(attr, 'TEXT')}" for attr in view] + [f"{m} INTEGER" for m in MEASURES]
+        conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+        if view:
+            conn.execute(f"CREATE UNIQUE INDEX {table}_key ON {table} ({', '.join(view)})")
+        etl.bulk_insert(conn, table, df[list(view) + list(MEASURES)])
+
+    @classmethod
+    def load(cls, conn):
+        """The cube stored in the warehouse, or None if none was built."""
+        try:
+            rows = conn.execute(f"SELECT attributes, row_count, last_sale_id FROM {METADATA_TABLE}").fetchall()
+        except sqlite3.OperationalError:
+            return None
+        views = {tuple(filter(None, attrs.split(','))): size for attrs, size, _ in rows}
+        return cls(conn, views, min((row[2] for row in rows), default=0))
+
+    @staticmethod
+    def drop(conn):
+        with conn:
+            try:
+                tables = [row[0] for row in conn.execute(f"SELECT view FROM {METADATA_TABLE}")]
+            except sqlite3.OperationalError:
+                return
+            for table in tables:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"DROP TABLE {METADATA_TABLE}")
+
+    def route(self, attributes):
+        """The smallest materialized view containing all `attributes`, or None (fact table)."""
+        fitting = [view for view in self.views if set(attributes) <= set(view)]
+        return min(fitting, key=self.views.get) if fitting else None
+
+    def query(self, group_by, where=None, pivot=None, measure='Revenue'):
+        """
+        Answers a request from the smallest view that can, or from the facts.
+
+        Args:
+            group_by (list): Cube attributes to group by.
+            where (dict): Attribute -> value or list of values.
+            pivot (str): Attribute whose values become columns.
+            measure (str): One of MEASURES.
+
+        Returns:
+            tuple: (pd.DataFrame, view table name or 'Sales_Fact')
+        """
+        attributes = list(group_by) + ([pivot] if pivot else [])
+        needed = set(attributes) | set(where or {})
+        view = self.route(needed)
+        if view is None:
+            df, source = star_query(self.conn, attributes, where), 'Sales_Fact'
+        else:
+            condition, params = _condition(where)
+            group = ', '.join(attributes)
+            sql = (f"SELECT {group + ', ' if group else ''}SUM({measure}) AS {measure} FROM {view_table(view)}"
+                   f"{condition}{' GROUP BY ' + group if group else ''}")
+            df, source = pd.read_sql_query(sql, self.conn, params=params), view_table(view)
+        df = df[attributes + [measure]]
+        if pivot:
+            df = df.pivot_table(index=list(group_by), columns=pivot, values=measure, aggfunc='sum', fill_value=0)
+            df = df.reset_index().rename_axis(columns=None)
+        return df.sort_values(list(group_by)).reset_index(drop=True), source
+
+    def show(self, title, request):
+        print(f"\n=== {title} ===")
+        df, source = self.query(**request)
+        print(f"(from {source})")
+        print(df.to_string(index=False))
+        return df
+
+    def refresh(self):
+        """
+        Merges the facts appended since the last build/refresh into every view.
+
+        Returns:
+            int: Fact rows merged.
+        """
+        delta = star_query(self.conn, lattice()[0], since_sale_id=self.last_sale_id)
+        n_new = int(delta['Sales'].sum()) if len(delta) else 0
+        if not n_new:
+            return 0
+        last_sale_id = self.conn.execute("SELECT MAX(Sale_ID) FROM Sales_Fact").fetchone()[0]
+        updates = ', '.join(f"{m} = {m} + excluded.{m}" for m in MEASURES)
+        with self.conn:
+            for view in self.views:
+                table, agg = view_table(view), _aggregate(delta, view)
+                if not view:
+                    self.conn.execute(f"UPDATE {table} SET " + ', '.join(f"{m} = {m} + ?" for m in MEASURES),
+                                      [int(agg[m].iloc[0]) for m in MEASURES])
+                    continue
+                columns = list(view) + list(MEASURES)
+                self.conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(view)}) DO UPDATE SET {updates}", etl._rows(agg[columns]))
+                self.views[view] = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                self.conn.execute(f"UPDATE {METADATA_TABLE} SET row_count = ? WHERE view = ?",
+                                  (self.views[view], table))
+            self.conn.execute(f"UPDATE {METADATA_TABLE} SET last_sale_id = ?", (last_sale_id,))
+        self.last_sale_id = last_sale_id
+        return n_new
+
+
+def _append_facts(conn, n_rows):
+    """Appends n_rows copies of existing facts with new Sale_IDs (a day of new sales for the demo)."""
+    with conn:
+        conn.execute("""
+            INSERT INTO Sales_Fact
+            SELECT Sale_ID + (SELECT MAX(Sale_ID) FROM Sales_Fact), Product_ID, Branch_ID, Time_ID, Quantity, Revenue
+            FROM Sales_Fact WHERE Sale_ID <= ?""", (n_rows,))
+
+
+def _same(a, b):
+    return a.shape == b.shape and np.allclose(a.select_dtypes('number').to_numpy(dtype=np.float64),
+                                              b.select_dtypes('number').to_numpy(dtype=np.float64))
+
+
+def compare_with_sql(cube):
+    """Times each OLAP operation in SQL and on the cube; yields (op, sql s, cube s, source, same result)."""
+    for op, (_, request) in CUBE_REQUESTS.items():
+        start = time.perf_counter()
+        expected = pd.read_sql_query(olap_operations.QUERIES[op][1], cube.conn)
+        sql_time = time.perf_counter() - start
+        start = time.perf_counter()
+        df, source = cube.query(**request)
+        cube_time = time.perf_counter() - start
+        expected = expected.sort_values(list(expected.columns[:len(request['group_by'])])).reset_index(drop=True)
+        yield op, sql_time, cube_time, source, _same(expected, df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialized OLAP cube with greedy view selection.")
+    parser.add_argument('--db', default='star_schema.db', help="Star-schema database; generated if missing.")
+    parser.add_argument('--facts', type=float, default=2e6, help="Facts of the generated warehouse.")
+    parser.add_argument('--budget', type=int, help=f"Row budget (default {BUDGET_FRACTION:.0%} of the facts).")
+    parser.add_argument('--append', type=int, default=100_000, help="Facts appended for the refresh demo.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Generating {int(args.facts):,} synthetic facts into '{args.db}'...")
+        synthetic_star.generate_warehouse(args.db, int(args.facts))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cube.db')
+        shutil.copy(args.db, path)   # The demo appends facts; keep the source warehouse unchanged
+        conn = sqlite3.connect(path)
+
+        start = time.perf_counter()
+        cube = MaterializedCube.build(conn, args.budget, verbose=True)
+        print(f"Built in {time.perf_counter() - start:.2f} s; materialized views:")
+        for view, size in cube.views.items():
+            print(f"  {view_table(view):<36}{size:>10,} rows")
+
+        print(f"\n{'Operation':<12}{'SQL (ms)':>10}{'Cube (ms)':>11}  {'Source':<44}Same result")
+        for op, sql_time, cube_time, source, same in compare_with_sql(cube):
+            print(f"{op:<12}{sql_time * 1000:>10.1f}{cube_time * 1000:>11.1f}  {source:<44}{same}")
+
+        _append_facts(conn, args.append)
+        start = time.perf_counter()
+        merged = cube.refresh()
+        refresh_time = time.perf_counter() - start
+        same = all(result[-1] for result in compare_with_sql(cube))
+        start = time.perf_counter()
+        MaterializedCube.build(conn, args.budget)
+        rebuild_time = time.perf_counter() - start
+        print(f"\nAppended {merged:,} facts: incremental refresh {refresh_time:.2f} s vs rebuild {rebuild_time:.2f} s"
+              f" (refreshed cube matches SQL: {same})")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
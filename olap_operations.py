@@ -1,44 +1,32 @@
 import pandas as pd
+import argparse
 import sqlite3
 
-# Create an in-memory SQLite database
-conn = sqlite3.connect(':memory:')
-cursor = conn.cursor()
-
 # ============================================
-# 1. Create Tables (Star Schema)
+# 1. Star Schema
 # ============================================
 
-cursor.execute("""
-CREATE TABLE Product_Dim (
+STAR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Product_Dim (
     Product_ID INTEGER PRIMARY KEY,
     Product_Name TEXT,
     Category TEXT,
     Brand TEXT
 );
-""")
-
-cursor.execute("""
-CREATE TABLE Branch_Dim (
+CREATE TABLE IF NOT EXISTS Branch_Dim (
     Branch_ID INTEGER PRIMARY KEY,
     Branch_Name TEXT,
     City TEXT,
     Region TEXT
 );
-""")
-
-cursor.execute("""
-CREATE TABLE Time_Dim (
+CREATE TABLE IF NOT EXISTS Time_Dim (
     Time_ID INTEGER PRIMARY KEY,
     Day INTEGER,
     Month TEXT,
     Quarter TEXT,
     Year INTEGER
 );
-""")
-
-cursor.execute("""
-CREATE TABLE Sales_Fact (
+CREATE TABLE IF NOT EXISTS Sales_Fact (
     Sale_ID INTEGER PRIMARY KEY,
     Product_ID INTEGER,
     Branch_ID INTEGER,
@@ -49,14 +37,14 @@ CREATE TABLE Sales_Fact (
     FOREIGN KEY (Branch_ID) REFERENCES Branch_Dim(Branch_ID),
     FOREIGN KEY (Time_ID) REFERENCES Time_Dim(Time_ID)
 );
-""")
+"""
 
 # ============================================
-# 2. Insert Sample Data
+# 2. Sample Data
 # ============================================
 
 # Product Dimension
-products = [
+PRODUCTS = [
     (1, 'Laptop', 'Electronics', 'HP'),
     (2, 'Smartphone', 'Electronics', 'Samsung'),
     (3, 'Refrigerator', 'Home Appliance', 'LG'),
@@ -64,10 +52,8 @@ products = [
     (5, 'Air Conditioner', 'Home Appliance', 'Voltas')
 ]
 
-cursor.executemany("INSERT INTO Product_Dim VALUES (?, ?, ?, ?);", products)
-
 # Branch Dimension
-branches = [
+BRANCHES = [
     (101, 'Pune Store', 'Pune', 'West'),
     (102, 'Mumbai Store', 'Mumbai', 'West'),
     (103, 'Delhi Store', 'Delhi', 'North'),
@@ -75,10 +61,8 @@ branches = [
     (105, 'Kolkata Store', 'Kolkata', 'East')
 ]
 
-cursor.executemany("INSERT INTO Branch_Dim VALUES (?, ?, ?, ?);", branches)
-
 # Time Dimension
-times = [
+TIMES = [
     (1001, 12, 'Jan', 'Q1', 2025),
     (1002, 5, 'Feb', 'Q1', 2025),
     (1003, 18, 'Apr', 'Q2', 2025),
@@ -86,10 +70,8 @@ times = [
     (1005, 11, 'Oct', 'Q4', 2025)
 ]
 
-cursor.executemany("INSERT INTO Time_Dim VALUES (?, ?, ?, ?, ?);", times)
-
 # Sales Fact
-sales = [
+SALES = [
     (1, 1, 101, 1001, 10, 750000),
     (2, 2, 101, 1002, 20, 600000),
     (3, 3, 102, 1003, 5, 250000),
@@ -104,14 +86,26 @@ sales = [
     (12, 2, 104, 1004, 14, 420000)
 ]
 
-cursor.executemany("INSERT INTO Sales_Fact VALUES (?, ?, ?, ?, ?, ?);", sales)
-conn.commit()
+
+def create_sample_warehouse(conn=None):
+    """Creates the star schema with the sample rows (in memory by default) and returns the connection."""
+    conn = conn or sqlite3.connect(':memory:')
+    cursor = conn.cursor()
+    cursor.executescript(STAR_SCHEMA)
+    cursor.executemany("INSERT INTO Product_Dim VALUES (?, ?, ?, ?);", PRODUCTS)
+    cursor.executemany("INSERT INTO Branch_Dim VALUES (?, ?, ?, ?);", BRANCHES)
+    cursor.executemany("INSERT INTO Time_Dim VALUES (?, ?, ?, ?, ?);", TIMES)
+    cursor.executemany("INSERT INTO Sales_Fact VALUES (?, ?, ?, ?, ?, ?);", SALES)
+    conn.commit()
+    return conn
+
 
 # Helper function to display results neatly
-def show_query(title, query):
+def show_query(conn, title, query):
     print(f"\n=== {title} ===")
     df = pd.read_sql_query(query, conn)
     print(df.to_string(index=False))
+    return df
 
 # ============================================
 # 3. OLAP Operations
@@ -124,7 +118,6 @@ FROM Sales_Fact
 JOIN Branch_Dim USING (Branch_ID)
 GROUP BY Region;
 """
-show_query("ROLL-UP (Total Revenue by Region)", query_rollup)
 
 # (b) Drill-Down: Detailed view by City within Region
 query_drilldown = """
@@ -133,7 +126,6 @@ FROM Sales_Fact
 JOIN Branch_Dim USING (Branch_ID)
 GROUP BY Region, City;
 """
-show_query("DRILL-DOWN (Revenue by City within Region)", query_drilldown)
 
 # (c) Slice: Data for Quarter Q4
 query_slice = """
@@ -144,7 +136,6 @@ JOIN Time_Dim USING (Time_ID)
 WHERE Quarter = 'Q4'
 GROUP BY Product_Name;
 """
-show_query("SLICE (Sales in Q4)", query_slice)
 
 # (d) Dice: Electronics category in Q1 and Q2
 query_dice = """
@@ -156,11 +147,10 @@ JOIN Time_Dim USING (Time_ID)
 WHERE Category = 'Electronics' AND Quarter IN ('Q1', 'Q2')
 GROUP BY Region, Product_Name;
 """
-show_query("DICE (Electronics in Q1 and Q2)", query_dice)
 
 # (e) Pivot: Product vs Quarter (rotated view)
 query_pivot = """
-SELECT 
+SELECT
   Product_Name,
   SUM(CASE WHEN Quarter = 'Q1' THEN Revenue ELSE 0 END) AS Q1,
   SUM(CASE WHEN Quarter = 'Q2' THEN Revenue ELSE 0 END) AS Q2,
@@ -171,7 +161,29 @@ JOIN Product_Dim USING (Product_ID)
 JOIN Time_Dim USING (Time_ID)
 GROUP BY Product_Name;
 """
-show_query("PIVOT (Product vs Quarter)", query_pivot)
 
-# Close the connection
-conn.close()
+QUERIES = {   # Operation -> (title, SQL)
+    'rollup': ("ROLL-UP (Total Revenue by Region)", query_rollup),
+    'drilldown': ("DRILL-DOWN (Revenue by City within Region)", query_drilldown),
+    'slice': ("SLICE (Sales in Q4)", query_slice),
+    'dice': ("DICE (Electronics in Q1 and Q2)", query_dice),
+    'pivot': ("PIVOT (Product vs Quarter)", query_pivot),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OLAP operations on the retail star schema.")
+    parser.add_argument('--db', help="Existing star-schema database (e.g. from synthetic_star.py); "
+                                     "by default the sample rows are loaded in memory.")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db) if args.db else create_sample_warehouse()
+    for title, query in QUERIES.values():
+        show_query(conn, title, query)
+
+    # Close the connection
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,705 @@
 import pandas as pd
 import numpy as np
+import copy
+import glob
+import json
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from scipy.stats import zscore
+from eda_sketches import HeavyHitters, MomentSketch, TDigest
+from schema_inference import infer_date_format, parse_dates, parses_with
 
-# Load your dataset
-# df = pd.read_csv('path_to_your_dataset.csv')
 
-# Display data info
-print("Original data shape:", df.shape)
-print(df.info())
-print(df.head())
+# --------------------------------------------------------------------------------
+# --- CONFIGURATION: Set your file and cleaning parameters ---
+# --------------------------------------------------------------------------------
 
-# 1. Drop duplicate rows
-df = df.drop_duplicates()
+DATASET_FILE = 'data.csv'
+OUTPUT_FILE = 'data_cleaned.csv'
 
-# 2. Handle missing values
-# Drop rows with all fields missing
-df = df.dropna(how='all')
+CHUNK_SIZE = 100_000
+MISSING_COLUMN_THRESHOLD = 0.7   # Columns with a larger fraction of missing values are dropped
+ZSCORE_THRESHOLD = 3             # Rows with |z| >= this in any numeric column are removed as outliers
+EXACT_DISTINCT_LIMIT = 100_000   # Medians/modes are exact while a column has at most this many distinct values
+ROW_HASH_KEYS = ('0123456789123456', 'row-dedup-key-02')  # Two 64-bit hashes form a row's 128-bit key
 
-# For columns with too many missing values, drop column (example threshold 70% missing)
-missing_pct = df.isnull().mean()
-cols_to_drop = missing_pct[missing_pct > 0.7].index
-df = df.drop(columns=cols_to_drop)
+# Partitioned mode (clean_csv_partitioned): rows are hash-partitioned to disk and cleaned in a process pool
+PARTITION_BYTES = 64_000_000     # Target CSV bytes per partition; bounds each worker's memory
+N_WORKERS = os.cpu_count() or 1
 
-# For columns with moderate missing, fill with median (numeric) or mode (categorical)
-for col in df.columns:
-    if df[col].dtype in ['float64', 'int64']:
-        df[col] = df[col].fillna(df[col].median())
-    else:
-        df[col] = df[col].fillna(df[col].mode()[0])
+BENCHMARK_COPIES = 100           # Jittered copies of the dataset used for the benchmark in main()
 
-# 3. General type conversion (example: convert 'date' columns to datetime)
-for col in df.columns:
-    if 'date' in col.lower():
-        df[col] = pd.to_datetime(df[col], errors='ignore')
+# --------------------------------------------------------------------------------
+# --- END CONFIGURATION ---
+# --------------------------------------------------------------------------------
 
-# 4. Lowercase string columns and strip whitespace
-for col in df.select_dtypes(include='object').columns:
-    df[col] = df[col].str.lower().str.strip()
 
-# 5. (Optional) Remove outliers from numerical columns (using Z-score)
-from scipy.stats import zscore
-for col in df.select_dtypes(include=[np.number]).columns:
-    df = df[(np.abs(zscore(df[col])) < 3) | (df[col].isnull())]
+def legacy_clean(df):
+    """
+    The original column-by-column, in-memory cleaning steps, kept as the
+    benchmark baseline for the two-pass engine below.
+    """
+    # 1. Drop duplicate rows
+    df = df.drop_duplicates()
+
+    # 2. Handle missing values
+    # Drop rows with all fields missing
+    df = df.dropna(how='all')
+
+    # For columns with too many missing values, drop column (example threshold 70% missing)
+    missing_pct = df.isnull().mean()
+    cols_to_drop = missing_pct[missing_pct > 0.7].index
+    df = df.drop(columns=cols_to_drop)
+
+    # For columns with moderate missing, fill with median (numeric) or mode (categorical)
+    for col in df.columns:
+        if df[col].dtype in ['float64', 'int64']:
+            df[col] = df[col].fillna(df[col].median())
+        else:
+            df[col] = df[col].fillna(df[col].mode()[0])
+
+    # 3. General type conversion (example: convert 'date' columns to datetime)
+    for col in df.columns:
+        if 'date' in col.lower():
+            # Same as the former errors='ignore' (removed in pandas 3): keep the column if any value fails
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except (ValueError, TypeError):
+                pass
+
+    # 4. Lowercase string columns and strip whitespace
+    for col in df.select_dtypes(include='object').columns:
+        df[col] = df[col].str.lower().str.strip()
+
+    # 5. (Optional) Remove outliers from numerical columns (using Z-score)
+    for col in df.select_dtypes(include=[np.number]).columns:
+        df = df[(np.abs(zscore(df[col])) < 3) | (df[col].isnull())]
+    return df
+
+
+
+
+# --- Two-pass cleaning engine ---
+# Pass 1 (scan_cleaning_stats) reads the data once, possibly in chunks, and
+# collects every global statistic: duplicate/empty rows, missing fractions,
+# medians, modes, date formats and the mean/std used for the z-scores.
+# Pass 2 (clean_chunk) applies all fills, conversions and the combined outlier
+# mask to each chunk with a handful of vectorized operations and no
+# per-column re-filtering; z-scores all come from the same global statistics.
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class ValueCounter:
+    """
+    Exact value counts of a column while it has at most `limit` distinct
+    values. Past that, numeric columns switch to a t-digest (approximate
+    median) and the others to a Space-Saving summary (the mode is still
+    exact whenever it is frequent enough to be guaranteed in the summary).
+    """
+
+    def __init__(self, numeric, limit=EXACT_DISTINCT_LIMIT):
+        self.numeric = numeric
+        self.limit = limit
+        self.counts = pd.Series(dtype=np.float64)
+        self.sketch = None
+
+    def update(self, values):
+        return self.update_counts(values.value_counts())
+
+    def update_counts(self, counts):
+        """Adds exact per-value counts (a value_counts() Series)."""
+        if self.sketch is None:
+            self.counts = self.counts.add(counts, fill_value=0)
+            if len(self.counts) <= self.limit:
+                return self
+            counts, self.counts = self.counts, None
+            self.sketch = TDigest() if self.numeric else HeavyHitters(self.limit)
+        if self.numeric:
+            self.sketch.update(counts.index.to_numpy(dtype=np.float64), weights=counts.to_numpy())
+        else:
+            self.sketch.update_counts(counts.astype(np.int64))
+        return self
+
+    def merge(self, other):
+        if other.sketch is None:
+            return self.update_counts(other.counts)
+        if self.sketch is None:
+            counts, self.counts = self.counts, None
+            self.sketch = TDigest() if self.numeric else HeavyHitters(self.limit)
+            if len(counts):
+                self.update_counts(counts)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def exact(self):
+        return self.sketch is None
+
+    def median(self):
+        if self.sketch is not None:
+            return self.sketch.quantile(0.5)
+        if self.counts.empty:
+            return np.nan
+        counts = self.counts.sort_index()
+        cumulative = counts.cumsum().to_numpy()
+        n = cumulative[-1]
+        lower = counts.index[np.searchsorted(cumulative, (n - 1) // 2, side='right')]
+        upper = counts.index[np.searchsorted(cumulative, n // 2, side='right')]
+        return (lower + upper) / 2
+
+    def mode(self):
+        """Most frequent value; ties go to the smallest value, like Series.mode()[0]."""
+        counts = self.counts if self.sketch is None else self.sketch.top(self.limit)
+        if counts.empty:
+            return np.nan
+        tied = counts.index[counts == counts.max()]
+        try:
+            return sorted(tied)[0]
+        except TypeError:
+            return tied[0]
+
+
+def _row_hashes(chunk, numeric_cols, hash_key=ROW_HASH_KEYS[0]):
+    # Hash numeric columns as float64 so 1 and 1.0 in differently-typed chunks are the same row
+    return pd.util.hash_pandas_object(chunk.astype({col: np.float64 for col in numeric_cols}),
+                                      index=False, hash_key=hash_key).to_numpy()
+
+
+def _row_keys(chunk, numeric_cols):
+    """128-bit row keys as (high, low) uint64 arrays: two independently keyed 64-bit hashes."""
+    return tuple(_row_hashes(chunk, numeric_cols, key) for key in ROW_HASH_KEYS)
+
+
+def _sorted_keys(high, low):
+    order = np.lexsort((low, high))
+    return high[order], low[order]
+
+
+def _frame_keep(df, numeric_cols):
+    """Rows of an in-memory frame that are first occurrences and not entirely missing."""
+    normalized = df.astype({col: np.float64 for col in numeric_cols})
+    return (~normalized.duplicated()).to_numpy() & df.notnull().any(axis=1).to_numpy()
+
+
+class RowDeduplicator:
+    """
+    Tracks 128-bit keys of the rows seen so far (16 bytes per distinct row)
+    to flag first occurrences across chunks; with 128 bits, two distinct
+    rows of even a 10^12-row file share a key with probability below
+    10^-14, so no distinct row is dropped in practice. The keys are kept in
+    sorted runs: each chunk's new keys form a run, merged with the previous
+    runs while they are no larger, so run sizes grow geometrically, a lookup
+    probes O(log n) runs and each key is merged O(log n) times (instead of
+    re-sorting everything seen on every chunk).
+    """
+
+    def __init__(self):
+        self.runs = []   # (high, low) arrays sorted by high, then low
+
+    def _seen(self, high, low):
+        order = np.argsort(high)   # Sorted probes walk each run in order (far fewer cache misses)
+        high, low = high[order], low[order]
+        seen = np.zeros(len(high), dtype=bool)
+        for run_high, run_low in self.runs:
+            pos = np.minimum(np.searchsorted(run_high, high), len(run_high) - 1)
+            seen |= (run_high[pos] == high) & (run_low[pos] == low)
+            # Keys sharing their high 64 bits with the next one in the run (rare): check the whole group
+            tied = np.flatnonzero((run_high[pos] == high) & ~seen & (pos + 1 < len(run_high)))
+            tied = tied[run_high[np.minimum(pos[tied] + 1, len(run_high) - 1)] == high[tied]]
+            for i in tied:
+                end = np.searchsorted(run_high, high[i], side='right')
+                seen[i] = (run_low[pos[i]:end] == low[i]).any()
+        result = np.empty_like(seen)
+        result[order] = seen
+        return result
+
+    def first_occurrences(self, chunk, numeric_cols):
+        high, low = _row_keys(chunk, numeric_cols)
+        first = ~pd.DataFrame({'high': high, 'low': low}).duplicated().to_numpy() & ~self._seen(high, low)
+        run = _sorted_keys(high[first], low[first])
+        while self.runs and len(self.runs[-1][0]) <= len(run[0]):
+            previous = self.runs.pop()   # Disjoint sets of keys
+            run = _sorted_keys(np.concatenate([previous[0], run[0]]), np.concatenate([previous[1], run[1]]))
+        if len(run[0]):
+            self.runs.append(run)
+        return first
+
+    def keep(self, chunk, numeric_cols):
+        """Rows of the next chunk that are first occurrences and not entirely missing."""
+        return self.first_occurrences(chunk, numeric_cols) & chunk.notnull().any(axis=1).to_numpy()
+
+
+class CleaningStats:
+    """
+    Everything pass 2 needs. Built chunk by chunk with update() (bounded
+    memory: exact or sketched value counters per column), or in one go
+    from an in-memory frame with from_frame() (whole-frame reductions).
+    Row keep masks are not stored: pass 2 recomputes them chunk by chunk.
+    """
+
+    def __init__(self, columns, numeric_cols):
+        self.columns = list(columns)
+        self.numeric_cols = [col for col in columns if col in numeric_cols]
+        self.n_rows = 0
+        self.n_kept = 0
+        self.missing = pd.Series(0, index=self.columns, dtype=np.int64)
+        self.counters = {col: ValueCounter(col in numeric_cols) for col in self.columns}
+        self.moments = MomentSketch(len(self.numeric_cols))
+        self.date_formats = {col: None for col in self.columns
+                             if 'date' in col.lower() and col not in numeric_cols}
+        # Filled in by finalize()
+        self.drop_cols = []
+        self.fill_values = {}
+        self.zscore_mean = None
+        self.zscore_std = None
+
+    def _add_rows(self, chunk, keep):
+        """Row bookkeeping, missing counts, moments and date formats shared by both builders."""
+        self.n_rows += len(chunk)
+        chunk = chunk[keep]
+        self.n_kept += len(chunk)
+        self.missing += chunk.isnull().sum()
+        if self.numeric_cols:
+            self.moments.update(chunk[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan))
+        self._check_dates(chunk)
+        return chunk
+
+    def update(self, chunk, keep):
+        chunk = self._add_rows(chunk, keep)
+        for col, counter in self.counters.items():
+            counter.update(chunk[col])
+
+    @classmethod
+    def from_frame(cls, df, missing_threshold=MISSING_COLUMN_THRESHOLD, keep=None):
+        """
+        Pass 1 for an in-memory DataFrame, with medians and modes computed
+        only where a fill is needed. `keep` is the row mask from _frame_keep()
+        if the caller already has it.
+        """
+        numeric_cols = [col for col in df.columns if _is_numeric(df[col])]
+        stats = cls(df.columns, numeric_cols)
+        stats.counters = None
+        if keep is None:
+            keep = _frame_keep(df, numeric_cols)
+        kept = stats._add_rows(df, keep)
+        needs_fill = [col for col in stats.columns if 0 < stats.missing[col] <= missing_threshold * stats.n_kept]
+        numeric_fill = [col for col in needs_fill if col in numeric_cols]
+        stats.fill_values = kept[numeric_fill].median().to_dict()
+        stats.fill_values.update({col: kept[col].mode()[0] for col in needs_fill if col not in numeric_cols})
+        return stats.finalize(missing_threshold)
+
+    def merge(self, other):
+        """Combines the statistics of disjoint row sets (e.g. hash partitions)."""
+        self.n_rows += other.n_rows
+        self.n_kept += other.n_kept
+        self.missing += other.missing
+        for col, counter in self.counters.items():
+            counter.merge(other.counters[col])
+        self.moments.merge(other.moments)
+        for col, fmt in other.date_formats.items():
+            if self.date_formats[col] is None or fmt is False:
+                self.date_formats[col] = fmt
+            elif fmt is not None and fmt != self.date_formats[col]:
+                self.date_formats[col] = False
+        return self
+
+    def _check_dates(self, chunk):
+        for col, fmt in list(self.date_formats.items()):
+            if fmt is False:
+                continue
+            values = chunk[col].dropna()
+            if fmt is None and len(values):
+                fmt = self.date_formats[col] = infer_date_format(values) or False
+            # A column is converted only if every value parses with one format (like errors='ignore')
+            elif fmt and not parses_with(values, fmt):
+                self.date_formats[col] = False
+
+    def finalize(self, missing_threshold=MISSING_COLUMN_THRESHOLD):
+        missing_pct = self.missing / max(self.n_kept, 1)
+        self.drop_cols = missing_pct[missing_pct > missing_threshold].index.tolist()
+        kept = [col for col in self.columns if col not in self.drop_cols]
+        if self.counters is not None:
+            self.fill_values = {col: (self.counters[col].median() if col in self.numeric_cols
+                                      else self.counters[col].mode())
+                                for col in kept if self.missing[col]}
+        self.date_formats = {col: fmt for col, fmt in self.date_formats.items() if fmt and col in kept}
+
+        # z-score statistics of the *filled* columns: the observed moments combined with
+        # n_missing copies of the fill value (population std, like scipy.stats.zscore)
+        m = self.moments
+        n_missing = m.missing.astype(np.float64)
+        fill = np.array([self.fill_values.get(col, 0.0) for col in self.numeric_cols], dtype=np.float64)
+        n = m.n + n_missing
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (m.n * m.mean + n_missing * fill) / n
+            m2 = m.m2 + (fill - m.mean) ** 2 * m.n * n_missing / n
+            std = np.sqrt(m2 / n)
+        use = np.array([col not in self.drop_cols for col in self.numeric_cols])
+        self.zscore_mean = pd.Series(mean, index=self.numeric_cols)[use]
+        self.zscore_std = pd.Series(std, index=self.numeric_cols)[use]
+        return self
+
+    def report(self):
+        print(f"Rows scanned: {self.n_rows}; kept after de-duplication and empty-row removal: {self.n_kept}")
+        if self.drop_cols:
+            print(f" - Dropping {len(self.drop_cols)} column(s) with > {MISSING_COLUMN_THRESHOLD:.0%} missing: {self.drop_cols}")
+        if self.fill_values:
+            print(f" - Filling missing values in {len(self.fill_values)} column(s) (median for numeric, mode otherwise)")
+        approximate = [col for col, counter in (self.counters or {}).items()
+                       if not counter.exact and col in self.fill_values]
+        if approximate:
+            print(f" - Approximate median/mode (more than {EXACT_DISTINCT_LIMIT} distinct values): {approximate}")
+        if self.date_formats:
+            print(f" - Converting date columns: {self.date_formats}")
+
+
+def scan_cleaning_stats(chunks, missing_threshold=MISSING_COLUMN_THRESHOLD):
+    """
+    Pass 1: collects the global cleaning statistics from an iterable of
+    DataFrame chunks (a single DataFrame is one chunk).
+
+    Returns:
+        CleaningStats: Finalized statistics.
+    """
+    stats, dedup = None, RowDeduplicator()
+    for chunk in chunks:
+        if stats is None:
+            stats = CleaningStats(chunk.columns, [col for col in chunk.columns if _is_numeric(chunk[col])])
+        stats.update(chunk, dedup.keep(chunk, stats.numeric_cols))
+    if stats is None:
+        raise ValueError("No data to clean.")
+    return stats.finalize(missing_threshold)
+
+
+def clean_chunk(chunk, stats, keep, zscore_threshold=ZSCORE_THRESHOLD):
+    """
+    Pass 2: applies the row filter, column drops, fills, date conversion,
+    string normalization and the combined z-score outlier mask to one chunk.
+    """
+    chunk = chunk[keep].drop(columns=stats.drop_cols)
+    chunk = chunk.fillna(stats.fill_values)
+    for col, fmt in stats.date_formats.items():
+        chunk[col] = parse_dates(chunk[col], fmt)
+
+    string_cols = [col for col in chunk.select_dtypes(include='object').columns if col not in stats.date_formats]
+    if string_cols:
+        chunk[string_cols] = chunk[string_cols].apply(lambda s: s.str.lower().str.strip())
+
+    # One mask for all numeric columns; constant columns (std 0) are not used for outliers
+    std = stats.zscore_std.replace(0, np.nan)
+    z = (chunk[stats.zscore_mean.index].to_numpy(dtype=np.float64, na_value=np.nan)
+         - stats.zscore_mean.to_numpy()) / std.to_numpy()
+    inlier = ~(np.abs(z) >= zscore_threshold).any(axis=1)
+    return chunk[inlier]
+
+
+def clean_dataframe(df, missing_threshold=MISSING_COLUMN_THRESHOLD, zscore_threshold=ZSCORE_THRESHOLD):
+    """In-memory cleaning with the two-pass engine (the DataFrame is a single chunk)."""
+    keep = _frame_keep(df, [col for col in df.columns if _is_numeric(df[col])])
+    stats = CleaningStats.from_frame(df, missing_threshold, keep)
+    return clean_chunk(df, stats, keep, zscore_threshold)
+
+
+def clean_csv(input_path, output_path, chunksize=CHUNK_SIZE, missing_threshold=MISSING_COLUMN_THRESHOLD,
+              zscore_threshold=ZSCORE_THRESHOLD, verbose=True):
+    """
+    Cleans a CSV that may not fit in memory: pass 1 reads it in chunks to
+    collect the statistics, pass 2 re-reads it, cleans each chunk and
+    appends it to `output_path`. Memory is bounded by the chunk size plus
+    the per-column counters and 8 bytes per distinct row for de-duplication.
+
+    Returns:
+        CleaningStats: The statistics that were applied.
+    """
+    stats = scan_cleaning_stats(pd.read_csv(input_path, chunksize=chunksize), missing_threshold)
+    if verbose:
+        stats.report()
+
+    rows_written, dedup = 0, RowDeduplicator()   # Replays pass 1's de-duplication to rebuild the keep masks
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        cleaned = clean_chunk(chunk, stats, dedup.keep(chunk, stats.numeric_cols), zscore_threshold)
+        cleaned.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows_written += len(cleaned)
+    if verbose:
+        print(f" - Removed {stats.n_kept - rows_written} outlier row(s) (|z| >= {zscore_threshold}); "
+              f"wrote {rows_written} rows to '{output_path}'")
+    return stats
+
+
+
+
+
+# --- Partitioned mode ---
+# For files larger than memory on a multi-core machine. A single sequential
+# read splits the rows into N partitions on disk by a hash of the whole row,
+# so all copies of a duplicated row land in the same partition and
+# drop_duplicates() inside a partition is exact. Workers then scan the
+# partitions for statistics (merged into one global CleaningStats, so fills
+# and z-scores match the other modes) and clean them in parallel, each
+# writing its part of a columnar dataset. Peak memory per worker is one
+# partition. Row order is file order within a partition, partition by partition.
+#
+# Columnar layout (read back with read_columnar):
+#     <output>/_manifest.json        columns, kinds and per-partition row counts
+#     <output>/part-00000/c000.npy   numeric, boolean and datetime columns
+#     <output>/part-00000/c001.codes.npy + c001.values.npy
+#                                    text columns: int32 codes (-1 = missing) into unique strings
+
+
+def partition_csv(input_path, parts_dir, n_partitions, chunksize=CHUNK_SIZE):
+    """
+    Splits a CSV into `n_partitions` row-hash partitions: one spill file per
+    partition, kept open for the whole read, to which each chunk appends its
+    rows as one pickled frame.
+
+    Returns:
+        tuple: (columns, numeric columns) as seen in the first chunk.
+    """
+    columns = numeric_cols = None
+    spills = {}
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            if columns is None:
+                columns = chunk.columns.tolist()
+                numeric_cols = [col for col in columns if _is_numeric(chunk[col])]
+            partition = _row_hashes(chunk, numeric_cols) % np.uint64(n_partitions)
+            for p, rows in chunk.groupby(partition, sort=True):
+                if p not in spills:
+                    spills[p] = open(os.path.join(parts_dir, f"part-{int(p):05d}.pkl"), 'wb')
+                pickle.dump(rows, spills[p], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for spill in spills.values():
+            spill.close()
+    if columns is None:
+        raise ValueError("No data to clean.")
+    return columns, numeric_cols
+
+
+def _read_spill(path):
+    """The frames appended to a spill file, in file order."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _load_partition(part_path, numeric_cols):
+    """A partition's rows in file order and the keep mask (first occurrences that are not entirely missing)."""
+    df = pd.concat(list(_read_spill(part_path)))
+    return df, _frame_keep(df, numeric_cols)
+
+
+def _scan_partition(args):
+    part_path, columns, numeric_cols = args
+    df, keep = _load_partition(part_path, numeric_cols)
+    stats = CleaningStats(columns, numeric_cols)
+    stats.update(df, keep)
+    return stats
+
+
+def write_columnar(df, directory):
+    """
+    Writes one partition of the columnar dataset.
+
+    Returns:
+        dict: column -> kind ('array' or 'text').
+    """
+    os.makedirs(directory, exist_ok=True)
+    kinds = {}
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            np.save(os.path.join(directory, f"c{i:03d}.npy"), values.to_numpy())
+            kinds[col] = 'array'
+        else:
+            codes, uniques = pd.factorize(values)
+            np.save(os.path.join(directory, f"c{i:03d}.codes.npy"), codes.astype(np.int32))
+            np.save(os.path.join(directory, f"c{i:03d}.values.npy"), np.asarray(uniques, dtype=str))
+            kinds[col] = 'text'
+    return kinds
+
+
+def read_columnar(path, columns=None):
+    """
+    Reads a columnar dataset written by clean_csv_partitioned(). Only the
+    requested columns are read, and numeric columns are memory-mapped.
+
+    Returns:
+        pd.DataFrame
+    """
+    with open(os.path.join(path, '_manifest.json')) as f:
+        manifest = json.load(f)
+    names = manifest['columns']
+    wanted = names if columns is None else list(columns)
+    frames = []
+    for part in manifest['partitions']:
+        data = {}
+        for col in wanted:
+            stem = os.path.join(path, part['dir'], f"c{names.index(col):03d}")
+            if part['kinds'][col] == 'array':
+                data[col] = np.load(stem + '.npy', mmap_mode='r')
+            else:
+                codes, uniques = np.load(stem + '.codes.npy'), np.load(stem + '.values.npy')
+                data[col] = pd.Categorical.from_codes(codes, uniques).astype(object)
+        frames.append(pd.DataFrame(data, columns=wanted))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=wanted)
+
+
+def _clean_partition(args):
+    part_path, out_dir, numeric_cols, stats, zscore_threshold = args
+    df, keep = _load_partition(part_path, numeric_cols)
+    cleaned = clean_chunk(df, stats, keep, zscore_threshold)
+    return {'dir': os.path.basename(out_dir), 'rows': len(cleaned), 'kinds': write_columnar(cleaned, out_dir)}
+
+
+def _run(func, tasks, n_workers):
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+            return list(pool.map(func, tasks))
+    return [func(task) for task in tasks]
+
+
+def clean_csv_partitioned(input_path, output_dir, n_partitions=None, n_workers=N_WORKERS, chunksize=CHUNK_SIZE,
+                          missing_threshold=MISSING_COLUMN_THRESHOLD, zscore_threshold=ZSCORE_THRESHOLD,
+                          scratch_dir=None, verbose=True):
+    """
+    Cleans a CSV into a columnar dataset with hash partitions processed in
+    parallel (see the section comment above).
+
+    Args:
+        input_path (str): CSV file.
+        output_dir (str): Output dataset directory (replaced if it exists).
+        n_partitions (int): Defaults to one per PARTITION_BYTES of input, at least n_workers.
+        n_workers (int): Worker processes.
+        scratch_dir (str): Where the partitions are spilled (a temporary directory by default).
+
+    Returns:
+        CleaningStats: The statistics that were applied.
+    """
+    if n_partitions is None:
+        n_partitions = max(n_workers, math.ceil(os.path.getsize(input_path) / PARTITION_BYTES))
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as parts_dir:
+        columns, numeric_cols = partition_csv(input_path, parts_dir, n_partitions, chunksize)
+        part_paths = sorted(glob.glob(os.path.join(parts_dir, 'part-*.pkl')))
+
+        stats = None
+        for part_stats in _run(_scan_partition, [(p, columns, numeric_cols) for p in part_paths], n_workers):
+            stats = part_stats if stats is None else stats.merge(part_stats)
+        stats.finalize(missing_threshold)
+        if verbose:
+            stats.report()
+
+        if os.path.exists(output_dir):
+            shutil.rmtree(output_dir)
+        worker_stats = copy.copy(stats)
+        worker_stats.counters = None  # Only the finalized values are needed to clean
+        tasks = [(p, os.path.join(output_dir, os.path.basename(p)[:-len('.pkl')]), numeric_cols, worker_stats,
+                  zscore_threshold) for p in part_paths]
+        partitions = _run(_clean_partition, tasks, n_workers)
+
+    kept = [col for col in columns if col not in stats.drop_cols]
+    with open(os.path.join(output_dir, '_manifest.json'), 'w') as f:
+        json.dump({'source': os.path.abspath(input_path), 'columns': kept, 'partitions': partitions}, f, indent=2)
+    if verbose:
+        rows_written = sum(part['rows'] for part in partitions)
+        print(f" - Removed {stats.n_kept - rows_written} outlier row(s) (|z| >= {zscore_threshold}); "
+              f"wrote {rows_written} rows in {len(partitions)} partitions to '{output_dir}'")
+    return stats
+
+
+def _benchmark_data(df, copies, seed=42):
+    """`copies` jittered copies of df with 2% of cells blanked and 5% duplicated rows."""
+    rng = np.random.default_rng(seed)
+    numeric_cols = [col for col in df.columns if _is_numeric(df[col])]
+    big = pd.concat([df] * copies, ignore_index=True)
+    jitter = rng.normal(1.0, 0.01, size=(len(big), len(numeric_cols)))
+    big[numeric_cols] = big[numeric_cols].to_numpy(dtype=np.float64) * jitter
+    big = big.mask(rng.random(big.shape) < 0.02)
+    return pd.concat([big, big.sample(frac=0.05, random_state=seed)], ignore_index=True)
+
+
+def main():
+    """
+    Cleans DATASET_FILE into OUTPUT_FILE with the streaming engine, then
+    benchmarks the engine against the original column-by-column steps on a
+    larger jittered copy of the data.
+    """
+    print("Loading data...")
+    try:
+        df = pd.read_csv(DATASET_FILE)
+    except FileNotFoundError:
+        print(f"Error: '{DATASET_FILE}' not found. Make sure the file is in the same directory.")
+        return
+
+    # Display data info
+    print("Original data shape:", df.shape)
+    print(df.head())
+
+    print(f"\nCleaning '{DATASET_FILE}' in chunks of {CHUNK_SIZE} rows...")
+    clean_csv(DATASET_FILE, OUTPUT_FILE)
+    cleaned = pd.read_csv(OUTPUT_FILE)
+    print("Data after cleaning:", cleaned.shape)
+    print(cleaned.head())
+
+    print("\n" + "=" * 70)
+    print(f"Benchmark: {BENCHMARK_COPIES} jittered copies of '{DATASET_FILE}'")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'benchmark.csv')
+        _benchmark_data(df, BENCHMARK_COPIES).to_csv(source, index=False)
+        print(f"Input: {os.path.getsize(source) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        legacy = legacy_clean(pd.read_csv(source))
+        legacy.to_csv(os.path.join(tmp, 'legacy.csv'), index=False)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        in_memory = clean_dataframe(pd.read_csv(source))
+        in_memory.to_csv(os.path.join(tmp, 'in_memory.csv'), index=False)
+        in_memory_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clean_csv(source, os.path.join(tmp, 'streamed.csv'), chunksize=CHUNK_SIZE // 10, verbose=False)
+        streamed_time = time.perf_counter() - start
+        streamed = pd.read_csv(os.path.join(tmp, 'streamed.csv'))
+
+        partitioned_times = {}
+        for n_workers in sorted({1, N_WORKERS}):
+            start = time.perf_counter()
+            clean_csv_partitioned(source, os.path.join(tmp, 'columnar'), n_partitions=max(4, N_WORKERS),
+                                  n_workers=n_workers, chunksize=CHUNK_SIZE // 10, verbose=False)
+            partitioned_times[n_workers] = time.perf_counter() - start
+        partitioned = read_columnar(os.path.join(tmp, 'columnar'))
+
+    print(f"{'Method':<42}{'Time (s)':>10}{'Rows out':>10}")
+    print(f"{'Original column-by-column script':<42}{legacy_time:>10.2f}{len(legacy):>10}")
+    print(f"{'Two-pass engine, in memory':<42}{in_memory_time:>10.2f}{len(in_memory):>10}")
+    print(f"{'Two-pass engine, streamed (chunks of ' + str(CHUNK_SIZE // 10) + ')':<42}"
+          f"{streamed_time:>10.2f}{len(streamed):>10}")
+    for n_workers, elapsed in partitioned_times.items():
+        label = f"Hash-partitioned, columnar, {n_workers} worker{'s' if n_workers > 1 else ''}"
+        print(f"{label:<42}{elapsed:>10.2f}{len(partitioned):>10}")
+    print("\nThe original script computes each column's z-scores on the frame already filtered by the "
+          "previous columns, so it removes more rows; the engine uses one global mask.")
+    print(f"Streamed and in-memory engine outputs identical: "
+          f"{np.allclose(streamed.select_dtypes(np.number), in_memory.select_dtypes(np.number))}")
+    # Partitions change the row order, so compare sorted rows
+    numeric = streamed.select_dtypes(np.number).columns.tolist()
+    same_rows = np.allclose(streamed[numeric].sort_values(numeric).to_numpy(),
+                            partitioned[numeric].sort_values(numeric).to_numpy())
+    print(f"Partitioned output has the same rows as the streamed output: {same_rows}")
+
 
-print("Data after cleaning:", df.shape)
-print(df.head())
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import numpy as np
 from sklearn.impute import SimpleImputer
+from outliers import outlier_mask
+from model_artifacts import save_model_artifact
 
 
 # --------------------------------------------------------------------------------
@@ -31,6 +33,14 @@ TARGET_COLUMN = 'charges'
 COLUMNS_TO_DROP = []
 
 
+# Fitted model + preprocessing state are saved here for batch scoring (model_artifacts.py score ...)
+MODEL_ARTIFACT_FILE = 'regression_model.bundle'
+
+
+# Outlier removal before fitting (outliers.py): 'zscore', 'mad', 'iqr', 'isolation_forest', 'knn' or None
+OUTLIER_METHOD = None
+
+
 
 
 # --------------------------------------------------------------------------------
@@ -80,6 +90,7 @@ except KeyError:
 # --- NEW STEP A: Handle Categorical Features (One-Hot Encoding) ---
 # This step is critical for datasets like Insurance
 print("\nPerforming One-Hot Encoding on categorical features...")
+X_raw = X # Keep the raw features so the dummy vocabulary can be saved with the model
 X = pd.get_dummies(X, drop_first=True)
 print(f"Feature columns after encoding: {len(X.columns)}")
 # ------------------------------------------------------------------
@@ -89,6 +100,7 @@ print(f"Feature columns after encoding: {len(X.columns)}")
 
 # --- NEW STEP B: Handle Missing Values (NaN) via Mean Imputation ---
 # This ensures all input features are numerical and non-missing
+imputer = None  # Its statistics_ are saved with the model as the imputation values
 if X.isnull().sum().any():
     print(f"Handling {X.isnull().sum().sum()} missing values using SimpleImputer (mean strategy)...")
    
@@ -114,6 +126,13 @@ print("Splitting data into 80% training and 20% testing...")
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 
+# Remove outliers from the training rows only, so the test metrics are on untouched data
+if OUTLIER_METHOD:
+    is_outlier = outlier_mask(X_train, OUTLIER_METHOD).to_numpy()
+    print(f"Removing {is_outlier.sum()} outlier row(s) flagged by '{OUTLIER_METHOD}' from the training set...")
+    X_train, y_train = X_train[~is_outlier], y_train[~is_outlier]
+
+
 # Display shapes of the split data
 print(f"X_train shape: {X_train.shape}")
 print(f"X_test shape: {X_test.shape}")
@@ -158,3 +177,10 @@ print(f"R-squared (R2) Score: {r2:.4f}")
 print("\n--- Model Evaluation Summary ---")
 print(f"The model explains approximately {r2*100:.2f}% of the variance in {TARGET_COLUMN} (R-squared).")
 print(f"The average magnitude of error in prediction (MAE) is {mae:.4f}.")
+
+
+
+
+# --- 4. Save the model artifact for batch scoring ---
+save_model_artifact(MODEL_ARTIFACT_FILE, reg_model, X_raw, X, target=TARGET_COLUMN, columns_to_drop=COLUMNS_TO_DROP,
+                    imputer=imputer)
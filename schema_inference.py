@@ -0,0 +1,263 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import time
+from pandas.tseries.api import guess_datetime_format
+
+
+# --------------------------------------------------------------------------------
+# --- CONFIGURATION: Set your file and inference parameters ---
+# --------------------------------------------------------------------------------
+
+DATASET_FILE = 'Groceries_dataset.csv'
+SCHEMA_CACHE_DIR = 'schema_cache'
+
+SAMPLE_ROWS = 10_000     # Rows read to infer the schema
+GUESS_VALUES = 20        # Distinct values per column used to propose candidate date formats
+BENCHMARK_COPIES = 20    # Copies of the dataset used for the parsing benchmark in main()
+
+# --------------------------------------------------------------------------------
+# --- END CONFIGURATION ---
+# --------------------------------------------------------------------------------
+
+
+# --- Date format inference ---
+# A format guessed from a single value is ambiguous for dd-mm-yyyy data
+# ("05-01-2015" reads as May 1st), so candidates are guessed both month-first
+# and day-first from several distinct values, and the first format that
+# parses *every* distinct sample value wins. Columns are then parsed with
+# that fixed format, once per distinct value: pd.to_datetime(cache=True)
+# factorizes the column and maps the parsed uniques back, which is what
+# makes date columns cheap (the Groceries data has 38k rows but only 728
+# distinct dates).
+
+
+def infer_date_format(values, guess_values=GUESS_VALUES):
+    """
+    Detects the strftime format of a column of date strings.
+
+    Args:
+        values (pd.Series): Sample of the column.
+        guess_values (int): Distinct values used to propose candidate formats.
+
+    Returns:
+        str or None: A format every distinct non-missing value parses with, or None.
+    """
+    uniques = pd.Series(pd.unique(values.dropna().astype(str)))
+    if uniques.empty:
+        return None
+    candidates = []
+    for value in uniques.iloc[:guess_values]:
+        for dayfirst in (False, True):
+            fmt = guess_datetime_format(value, dayfirst=dayfirst)
+            if fmt and fmt not in candidates:
+                candidates.append(fmt)
+    for fmt in candidates:
+        if pd.to_datetime(uniques, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
+
+
+def parse_dates(values, fmt, errors='raise'):
+    """
+    Parses a column with a fixed format, converting each distinct value once.
+
+    Returns:
+        pd.Series: datetime64 values with the same index as `values`.
+    """
+    return pd.to_datetime(values, format=fmt, errors=errors, cache=True)
+
+
+def parses_with(values, fmt):
+    """True if every distinct non-missing value parses with `fmt`."""
+    uniques = pd.Series(pd.unique(values.dropna().astype(str)))
+    return bool(pd.to_datetime(uniques, format=fmt, errors='coerce').notna().all())
+
+
+
+
+# --- Schema inference and the per-file cache ---
+
+
+def infer_schema(path, sample_rows=SAMPLE_ROWS, rename=None):
+    """
+    Infers the column schema of a CSV from its first `sample_rows` rows.
+
+    Returns:
+        dict: columns (in file order) and dates (column -> strftime format)
+              for the text columns that are dates.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows)
+    if rename:
+        sample = sample.rename(columns=rename)
+    dates = {}
+    for col in sample.columns:
+        if pd.api.types.is_numeric_dtype(sample[col]) or pd.api.types.is_bool_dtype(sample[col]):
+            continue
+        fmt = infer_date_format(sample[col])
+        if fmt:
+            dates[col] = fmt
+    return {'columns': sample.columns.tolist(), 'dates': dates}
+
+
+class SchemaCache:
+    """
+    Inferred schemas stored as one JSON file per CSV. An entry is valid while
+    the file's size and modification time are unchanged, so a cached load
+    costs one os.stat() instead of a sample read and inference.
+    """
+
+    def __init__(self, cache_dir=SCHEMA_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def load(self, path, rename=None):
+        """The cached schema of `path`, or None if missing or stale."""
+        try:
+            with open(self._path(path)) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if entry['stamp'] != self._stamp(path) or entry['rename'] != (rename or {}):
+            return None
+        return entry['schema']
+
+    def drop(self, path):
+        if os.path.exists(self._path(path)):
+            os.remove(self._path(path))
+
+    def save(self, path, schema, rename=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {'path': os.path.abspath(path), 'stamp': self._stamp(path), 'rename': rename or {}, 'schema': schema}
+        with open(self._path(path), 'w') as f:
+            json.dump(entry, f, indent=2)
+
+
+def load_schema(path, rename=None, cache_dir=SCHEMA_CACHE_DIR, sample_rows=SAMPLE_ROWS):
+    """
+    The schema of a CSV: from the cache when the file is unchanged, otherwise
+    inferred from a sample and cached.
+
+    Returns:
+        tuple: (schema dict, True if it came from the cache)
+    """
+    cache = SchemaCache(cache_dir)
+    schema = cache.load(path, rename)
+    if schema is not None:
+        return schema, True
+    schema = infer_schema(path, sample_rows, rename)
+    cache.save(path, schema, rename)
+    return schema, False
+
+
+def apply_schema(df, schema, coerce=()):
+    """
+    Parses the schema's date columns in place. A column with a value the
+    sampled format does not parse is left as text (like errors='ignore'),
+    unless it is in `coerce`: its unparseable values then become NaT.
+
+    Returns:
+        list: The date columns that failed to parse (and were left as text).
+    """
+    failed = []
+    for col, fmt in schema['dates'].items():
+        if col not in df.columns:
+            continue
+        try:
+            df[col] = parse_dates(df[col], fmt, errors='coerce' if col in coerce else 'raise')
+        except ValueError:
+            failed.append(col)
+    return failed
+
+
+def read_csv_typed(path, rename=None, cache_dir=SCHEMA_CACHE_DIR, **read_csv_kwargs):
+    """
+    pd.read_csv() followed by the cached schema's date parsing. With
+    `chunksize` it returns a generator of parsed chunks; a date column keeps
+    its datetime64 dtype in every chunk, so if a later chunk holds values
+    the format does not parse, they become NaT (with a warning).
+
+    Args:
+        path (str): CSV file.
+        rename (dict): Optional column renames applied before the schema.
+        cache_dir (str): Directory of the schema cache.
+        **read_csv_kwargs: Passed to pd.read_csv().
+    """
+    schema, _ = load_schema(path, rename, cache_dir)
+    streaming = bool(read_csv_kwargs.get('chunksize'))
+    parsing = dict(schema, dates=dict(schema['dates']))   # Formats used for the rest of this read
+    coerce = set()
+
+    def typed(df):
+        if rename:
+            df = df.rename(columns=rename)
+        failed = apply_schema(df, parsing, coerce)
+        if failed:
+            # The sample missed a value the format does not parse: drop the format so the next load re-checks
+            schema['dates'] = {col: fmt for col, fmt in schema['dates'].items() if col not in failed}
+            SchemaCache(cache_dir).save(path, schema, rename)
+            if streaming:
+                # Earlier chunks were already returned as datetime64: keep the dtype for the whole read
+                coerce.update(failed)
+                apply_schema(df, dict(parsing, dates={col: parsing['dates'][col] for col in failed}), coerce)
+                print(f"Warning: column(s) {failed} of '{path}' are not all dates in the inferred format; "
+                      f"values that do not parse are NaT for the rest of this read.")
+            else:
+                print(f"Note: column(s) {failed} of '{path}' are not all dates in the inferred format; kept as text.")
+        return df
+
+    if streaming:
+        return (typed(chunk) for chunk in pd.read_csv(path, **read_csv_kwargs))
+    return typed(pd.read_csv(path, **read_csv_kwargs))
+
+
+def main():
+    """Infers and caches the schema of DATASET_FILE, then benchmarks date parsing strategies."""
+    print(f"Inferring the schema of '{DATASET_FILE}'...")
+    if not os.path.exists(DATASET_FILE):
+        print(f"Error: '{DATASET_FILE}' not found. Make sure the file is in the same directory.")
+        return
+
+    SchemaCache().drop(DATASET_FILE)  # So the first load below infers
+    for attempt in ('first load', 'second load'):
+        start = time.perf_counter()
+        schema, cached = load_schema(DATASET_FILE)
+        elapsed = time.perf_counter() - start
+        print(f" - {attempt}: {'cached' if cached else 'inferred'} in {elapsed * 1000:.1f} ms -> dates {schema['dates']}")
+
+    if not schema['dates']:
+        print("No date columns detected; nothing to benchmark.")
+        return
+    col, fmt = next(iter(schema['dates'].items()))
+    raw = pd.read_csv(DATASET_FILE)[col]
+    values = pd.concat([raw] * BENCHMARK_COPIES, ignore_index=True)
+
+    print("\n" + "=" * 70)
+    print(f"Parsing '{col}': {len(values)} values, {values.nunique()} distinct")
+    print("=" * 70)
+
+    strategies = [
+        ('Per value, dayfirst=True, no format', lambda: pd.to_datetime(values, dayfirst=True, cache=False)),
+        (f"Per value, fixed format '{fmt}'", lambda: pd.to_datetime(values, format=fmt, cache=False)),
+        ('Fixed format, unique-value lookup', lambda: parse_dates(values, fmt)),
+    ]
+    reference = parse_dates(values, fmt)
+    print(f"{'Strategy':<42}{'Time (ms)':>10}  Matches lookup")
+    for name, parse in strategies:
+        start = time.perf_counter()
+        result = parse()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<42}{elapsed * 1000:>10.1f}  {bool((result == reference).all())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+
+
+# --------------------------------------------------------------------------------
+# Streaming evaluation metrics.
+#
+# Drop-in replacements for accuracy_score / classification_report /
+# confusion_matrix and mean_absolute_error / mean_squared_error / r2_score
+# that are updated batch by batch and merged across worker processes, so
+# y_test / y_pred never have to be materialized in full.
+# --------------------------------------------------------------------------------
+
+
+class ClassificationMetrics:
+    """
+    Mergeable confusion matrix. Labels are discovered as batches arrive and
+    kept sorted, matching the label order used by sklearn's metrics.
+    """
+
+    def __init__(self):
+        self.labels = np.array([], dtype=object)
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+
+    def _add_labels(self, new_labels):
+        labels = np.array(sorted(set(self.labels.tolist()) | set(new_labels.tolist())), dtype=object)
+        if len(labels) == len(self.labels):
+            return
+        idx = np.searchsorted(labels, self.labels) if len(self.labels) else np.array([], dtype=int)
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        matrix[np.ix_(idx, idx)] = self.matrix
+        self.labels, self.matrix = labels, matrix
+
+    def update(self, y_true, y_pred):
+        """Adds one batch of true and predicted labels."""
+        y_true = np.asarray(y_true, dtype=object)
+        y_pred = np.asarray(y_pred, dtype=object)
+        if len(y_true) != len(y_pred):
+            raise ValueError("y_true and y_pred must have the same length.")
+        if len(y_true) == 0:
+            return self
+        self._add_labels(pd.unique(np.concatenate([y_true, y_pred])))
+
+        k = len(self.labels)
+        t = np.searchsorted(self.labels, y_true)
+        p = np.searchsorted(self.labels, y_pred)
+        self.matrix += np.bincount(t * k + p, minlength=k * k).reshape(k, k)
+        return self
+
+    def merge(self, other):
+        """Adds the counts of another accumulator (e.g. from a worker process)."""
+        self._add_labels(other.labels)
+        idx = np.searchsorted(self.labels, other.labels)
+        self.matrix[np.ix_(idx, idx)] += other.matrix
+        return self
+
+    @property
+    def n(self):
+        return int(self.matrix.sum())
+
+    def accuracy(self):
+        return np.trace(self.matrix) / self.n if self.n else float('nan')
+
+    def confusion_matrix(self):
+        return self.matrix.copy()
+
+    def per_class(self):
+        """
+        Returns:
+            pd.DataFrame: precision, recall, f1-score and support per label.
+        """
+        tp = np.diag(self.matrix).astype(np.float64)
+        predicted = self.matrix.sum(axis=0)
+        support = self.matrix.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        return pd.DataFrame({'precision': precision, 'recall': recall, 'f1-score': f1, 'support': support},
+                            index=[str(label) for label in self.labels])
+
+    def classification_report(self, digits=2):
+        """Text report in the same layout as sklearn's classification_report."""
+        table = self.per_class()
+        support = table['support'].to_numpy()
+        width = max([len(name) for name in table.index] + [len('weighted avg'), digits])
+        header = f"{'':>{width}}  {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"
+        lines = [header, '']
+        for name, row in table.iterrows():
+            lines.append(f"{name:>{width}}  {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} "
+                         f"{row['f1-score']:>9.{digits}f} {int(row['support']):>9}")
+        lines.append('')
+        lines.append(f"{'accuracy':>{width}}  {'':>9} {'':>9} {self.accuracy():>9.{digits}f} {self.n:>9}")
+        macro = table[['precision', 'recall', 'f1-score']].mean()
+        weighted = table[['precision', 'recall', 'f1-score']].mul(support, axis=0).sum() / max(support.sum(), 1)
+        for name, avg in (('macro avg', macro), ('weighted avg', weighted)):
+            lines.append(f"{name:>{width}}  {avg['precision']:>9.{digits}f} {avg['recall']:>9.{digits}f} "
+                         f"{avg['f1-score']:>9.{digits}f} {self.n:>9}")
+        return '\n'.join(lines) + '\n'
+
+
+class RegressionMetrics:
+    """
+    Running MAE, MSE/RMSE and R² over batches.
+
+    The target variance needed for R² is tracked with Welford/Chan updates
+    (count, mean, sum of squared deviations) rather than raw Σy², which
+    loses precision on large or offset targets.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_y = 0.0
+        self.m2_y = 0.0
+        self.abs_err = 0.0
+        self.sq_err = 0.0
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n = self.n + n_b
+        delta = mean_b - self.mean_y
+        self.mean_y += delta * n_b / n
+        self.m2_y += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    def update(self, y_true, y_pred):
+        """Adds one batch of true values and predictions."""
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        if len(y_true) != len(y_pred):
+            raise ValueError("y_true and y_pred must have the same length.")
+        if len(y_true) == 0:
+            return self
+        err = y_true - y_pred
+        self.abs_err += np.abs(err).sum()
+        self.sq_err += err @ err
+        mean_b = y_true.mean()
+        self._combine(len(y_true), mean_b, ((y_true - mean_b) ** 2).sum())
+        return self
+
+    def merge(self, other):
+        """Adds the statistics of another accumulator (e.g. from a worker process)."""
+        if other.n:
+            self.abs_err += other.abs_err
+            self.sq_err += other.sq_err
+            self._combine(other.n, other.mean_y, other.m2_y)
+        return self
+
+    def mae(self):
+        return self.abs_err / self.n if self.n else float('nan')
+
+    def mse(self):
+        return self.sq_err / self.n if self.n else float('nan')
+
+    def rmse(self):
+        return np.sqrt(self.mse())
+
+    def r2(self):
+        return 1.0 - self.sq_err / self.m2_y if self.m2_y > 0 else float('nan')
+
+    def as_dict(self):
+        return {'n': self.n, 'mae': self.mae(), 'mse': self.mse(), 'rmse': self.rmse(), 'r2': self.r2()}
+
+
+def merge_all(accumulators):
+    """Merges a list of accumulators of the same type into the first one."""
+    accumulators = list(accumulators)
+    if not accumulators:
+        raise ValueError("Nothing to merge.")
+    total = accumulators[0]
+    for acc in accumulators[1:]:
+        total.merge(acc)
+    return total
+
+
+def _batches(y_true, y_pred, batch_size):
+    for start in range(0, len(y_true), batch_size):
+        yield y_true[start:start + batch_size], y_pred[start:start + batch_size]
+
+
+def _score_part(args):
+    kind, y_true, y_pred, batch_size = args
+    acc = ClassificationMetrics() if kind == 'classification' else RegressionMetrics()
+    for t, p in _batches(y_true, y_pred, batch_size):
+        acc.update(t, p)
+    return acc
+
+
+def main():
+    """
+    Demonstrates batch-wise, multi-process evaluation and checks it against
+    sklearn's in-memory metrics on the project's datasets.
+    """
+    from sklearn.metrics import accuracy_score, classification_report, mean_absolute_error, r2_score
+
+    rng = np.random.default_rng(42)
+    n_workers, batch_size = 4, 64
+
+    # Classification: Iris species with 20% of labels shuffled as "predictions"
+    y_true = pd.read_csv('Iris.csv')['Species'].to_numpy()
+    y_pred = y_true.copy()
+    noisy = rng.random(len(y_pred)) < 0.2
+    y_pred[noisy] = rng.permutation(y_pred[noisy])
+
+    parts = [('classification', t, p, batch_size)
+             for t, p in zip(np.array_split(y_true, n_workers), np.array_split(y_pred, n_workers))]
+    with Pool(n_workers) as pool:
+        cls = merge_all(pool.map(_score_part, parts))
+
+    print("=== Streaming classification metrics (Iris, noisy predictions) ===")
+    print(f"Accuracy: {cls.accuracy():.4f} (sklearn: {accuracy_score(y_true, y_pred):.4f})")
+    print("\nClassification Report:")
+    print(cls.classification_report())
+    print("Confusion Matrix:")
+    print(cls.confusion_matrix())
+    print(f"Report identical to sklearn's: {cls.classification_report() == classification_report(y_true, y_pred)}")
+
+    # Regression: insurance charges against a noisy copy
+    y_true = pd.read_csv('insurance.csv')['charges'].to_numpy()
+    y_pred = y_true + rng.normal(0, 5000, len(y_true))
+
+    parts = [('regression', t, p, batch_size)
+             for t, p in zip(np.array_split(y_true, n_workers), np.array_split(y_pred, n_workers))]
+    with Pool(n_workers) as pool:
+        reg = merge_all(pool.map(_score_part, parts))
+
+    print("\n=== Streaming regression metrics (insurance charges, noisy predictions) ===")
+    print(f"MAE:  {reg.mae():.4f} (sklearn: {mean_absolute_error(y_true, y_pred):.4f})")
+    print(f"RMSE: {reg.rmse():.4f}")
+    print(f"R2:   {reg.r2():.6f} (sklearn: {r2_score(y_true, y_pred):.6f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,627 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import time
+from multiprocessing import Pool
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from streaming_metrics import RegressionMetrics
+
+
+# --------------------------------------------------------------------------------
+# --- CONFIGURATION: Same dataset settings as regression.py ---
+# --------------------------------------------------------------------------------
+
+DATASET_FILE = 'insurance.csv'
+TARGET_COLUMN = 'charges'
+COLUMNS_TO_DROP = []
+
+# STREAMING PARAMETERS
+CHUNK_SIZE = 100_000     # Rows parsed per chunk (memory is bounded by this, not by the file size)
+N_WORKERS = 1            # > 1 splits the file into row ranges fitted in parallel processes
+SOLVER = 'cholesky'      # 'cholesky' (normal equations) or 'qr' (streamed TSQR, better conditioned)
+RIDGE_ALPHA = 0.0        # L2 penalty on the coefficients (the intercept is never penalized)
+TEST_FRACTION = 0.2      # Share of rows held out for evaluation (chosen by a deterministic row hash)
+
+# MODEL PERSISTENCE
+MODEL_FILE = 'regression_model.npz'   # Coefficients + sufficient statistics + vocabulary
+FORGETTING_FACTOR = 1.0               # < 1 down-weights existing statistics on each update (1.0 = no forgetting)
+
+# --------------------------------------------------------------------------------
+# --- END CONFIGURATION ---
+# --------------------------------------------------------------------------------
+
+
+def scan_schema(path, target, columns_to_drop=(), chunksize=CHUNK_SIZE):
+    """
+    First pass over the CSV: collects the fixed category vocabulary and the
+    column means used for imputation, without holding the file in memory.
+
+    The resulting feature layout matches pd.get_dummies(X, drop_first=True):
+    numeric columns first (in file order), then one dummy per category except
+    the alphabetically first one, for every categorical column in file order.
+
+    Args:
+        path (str): CSV file to scan.
+        target (str): Name of the target column.
+        columns_to_drop (iterable): Columns ignored entirely.
+        chunksize (int): Rows parsed per chunk.
+
+    Returns:
+        dict: Schema with 'numeric', 'categorical' (column -> categories; the
+              first one is the dropped reference level),
+              'means' (numeric imputation values), 'feature_names' and 'n_rows'.
+    """
+    numeric_cols, categorical_cols = None, None
+    sums, counts, categories = {}, {}, {}
+    n_rows = 0
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.drop(columns=[c for c in columns_to_drop if c in chunk.columns])
+        if target not in chunk.columns:
+            raise KeyError(f"Target column '{target}' not found in '{path}'.")
+        X = chunk.drop(columns=[target])
+
+        if numeric_cols is None:
+            numeric_cols = X.select_dtypes(include=np.number).columns.tolist()
+            categorical_cols = [c for c in X.columns if c not in numeric_cols]
+            sums = {c: 0.0 for c in numeric_cols}
+            counts = {c: 0 for c in numeric_cols}
+            categories = {c: set() for c in categorical_cols}
+
+        for col in numeric_cols:
+            values = pd.to_numeric(X[col], errors='coerce')
+            sums[col] += values.sum()
+            counts[col] += values.count()
+        for col in categorical_cols:
+            categories[col].update(X[col].dropna().astype(str).unique())
+        n_rows += len(chunk)
+
+    if n_rows == 0:
+        raise ValueError(f"'{path}' contains no data rows.")
+
+    vocabulary = {col: sorted(categories[col]) for col in categorical_cols}
+    feature_names = list(numeric_cols)
+    for col in categorical_cols:
+        feature_names += [f"{col}_{cat}" for cat in vocabulary[col][1:]]
+
+    return {
+        'target': target,
+        'columns_to_drop': list(columns_to_drop),
+        'numeric': numeric_cols,
+        'categorical': vocabulary,
+        'means': {col: (sums[col] / counts[col]) if counts[col] else 0.0 for col in numeric_cols},
+        'feature_names': feature_names,
+        'n_rows': n_rows,
+    }
+
+
+def encode_chunk(chunk, schema):
+    """
+    Encodes one raw CSV chunk into a dense float64 design matrix using the
+    fixed vocabulary in `schema`. Unseen categories encode as all-zero dummies,
+    exactly like the reference category.
+
+    Returns:
+        tuple: (X, y) as NumPy arrays. `y` is None if the target is absent.
+    """
+    n = len(chunk)
+    X = np.empty((n, len(schema['feature_names'])), dtype=np.float64)
+
+    j = 0
+    for col in schema['numeric']:
+        values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64)
+        X[:, j] = np.where(np.isnan(values), schema['means'][col], values)
+        j += 1
+    for col, cats in schema['categorical'].items():
+        if len(cats) < 2:
+            continue
+        # Category codes against the stored vocabulary (-1 for missing/unseen)
+        codes = pd.Categorical(chunk[col].astype(str).where(chunk[col].notna()), categories=cats).codes
+        width = len(cats) - 1
+        X[:, j:j + width] = codes[:, None] == np.arange(1, len(cats))[None, :]
+        j += width
+
+    y = None
+    if schema['target'] in chunk.columns:
+        y = chunk[schema['target']].to_numpy(dtype=np.float64)
+    return X, y
+
+
+def is_test_row(row_index, test_fraction=TEST_FRACTION):
+    """
+    Deterministic train/test assignment from the global row index (Knuth
+    multiplicative hash), so every pass and every worker agrees on the split
+    without storing it.
+    """
+    h = (np.asarray(row_index, dtype=np.uint64) * np.uint64(2654435761)) % np.uint64(2 ** 32)
+    return h.astype(np.float64) / 2 ** 32 < test_fraction
+
+
+class NormalEquationAccumulator:
+    """
+    Running sufficient statistics for least squares with an intercept.
+
+    Keeps XᵀX, Xᵀy, yᵀy and the row count over the augmented design [1, X].
+    With track_qr=True it also keeps the triangular factor R and Qᵀy of a
+    streamed (TSQR) QR decomposition. Memory is O(p²) regardless of row count,
+    and two accumulators over disjoint rows merge into one.
+    """
+
+    def __init__(self, n_features, track_qr=False):
+        p = n_features + 1
+        self.n_features = n_features
+        self.n = 0
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros(p)
+        self.yty = 0.0
+        self.track_qr = track_qr
+        self.r = np.zeros((0, p)) if track_qr else None
+        self.qty = np.zeros(0) if track_qr else None
+
+    def update(self, X, y):
+        """Folds a batch of rows into the statistics."""
+        if len(X) == 0:
+            return self
+        Xa = np.hstack([np.ones((len(X), 1)), X])
+        self.xtx += Xa.T @ Xa
+        self.xty += Xa.T @ y
+        self.yty += float(y @ y)
+        self.n += len(X)
+        if self.track_qr:
+            self._qr_fold(Xa, y)
+        return self
+
+    def _qr_fold(self, A, b):
+        q, self.r = np.linalg.qr(np.vstack([self.r, A]))
+        self.qty = q.T @ np.concatenate([self.qty, b])
+
+    def merge(self, other):
+        """Adds the statistics of an accumulator built over other rows."""
+        self.n += other.n
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        if self.track_qr and other.track_qr and other.n:
+            self._qr_fold(other.r, other.qty)
+        return self
+
+    def decay(self, factor):
+        """
+        Exponential forgetting: scales all existing statistics by `factor`
+        (0 < factor <= 1) so older rows weigh less than rows folded in later.
+        """
+        if not 0 < factor <= 1:
+            raise ValueError("The forgetting factor must be in (0, 1].")
+        self.n *= factor
+        self.xtx *= factor
+        self.xty *= factor
+        self.yty *= factor
+        if self.track_qr:
+            self.r *= np.sqrt(factor)
+            self.qty *= np.sqrt(factor)
+        return self
+
+    def expand(self, positions, n_features):
+        """
+        Grows the feature space to `n_features`, placing the existing features
+        at `positions`. New features get zero statistics, which is exact for
+        dummies of categories that no earlier row could have had.
+        """
+        idx = np.concatenate([[0], np.asarray(positions, dtype=int) + 1])
+        p = n_features + 1
+        xtx, xty = np.zeros((p, p)), np.zeros(p)
+        xtx[np.ix_(idx, idx)] = self.xtx
+        xty[idx] = self.xty
+        self.xtx, self.xty, self.n_features = xtx, xty, n_features
+        if self.track_qr:
+            r = np.zeros((self.r.shape[0], p))
+            r[:, idx] = self.r
+            # Re-triangularize after the column permutation
+            q, self.r = np.linalg.qr(r)
+            self.qty = q.T @ self.qty
+        return self
+
+    def solve(self, solver='cholesky', ridge_alpha=0.0):
+        """
+        Solves for the intercept and coefficients.
+
+        Args:
+            solver (str): 'cholesky' on the normal equations or 'qr' on the
+                          streamed triangular factor (requires track_qr=True).
+            ridge_alpha (float): L2 penalty; the intercept is not penalized.
+
+        Returns:
+            tuple: (intercept, coef) with coef as a NumPy array.
+        """
+        p = self.n_features + 1
+        penalty = np.full(p, float(ridge_alpha))
+        penalty[0] = 0.0
+
+        if solver == 'qr':
+            if not self.track_qr:
+                raise ValueError("solver='qr' requires an accumulator built with track_qr=True.")
+            r, qty = self.r, self.qty
+            if ridge_alpha > 0:
+                # Ridge as extra rows sqrt(alpha)*I with zero targets
+                q, r = np.linalg.qr(np.vstack([r, np.diag(np.sqrt(penalty))]))
+                qty = q.T @ np.concatenate([qty, np.zeros(p)])
+            if r.shape[0] < p or np.min(np.abs(np.diag(r))) < 1e-10 * np.max(np.abs(np.diag(r))):
+                print("Warning: design matrix is rank deficient, falling back to least squares.")
+                beta = np.linalg.lstsq(r, qty, rcond=None)[0]
+            else:
+                beta = solve_triangular(r, qty)
+        elif solver == 'cholesky':
+            try:
+                beta = cho_solve(cho_factor(self.xtx + np.diag(penalty)), self.xty)
+            except np.linalg.LinAlgError:
+                print("Warning: XᵀX is not positive definite, falling back to least squares.")
+                beta = np.linalg.lstsq(self.xtx + np.diag(penalty), self.xty, rcond=None)[0]
+        else:
+            raise ValueError(f"Unknown solver '{solver}'. Use 'cholesky' or 'qr'.")
+
+        return beta[0], beta[1:]
+
+
+def count_rows(path):
+    """Counts data rows (excluding the header) by scanning raw bytes."""
+    n = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            n += block.count(b'\n')
+            last = block
+    if n and not last.endswith(b'\n'):
+        n += 1
+    return max(n - 1, 0)
+
+
+def row_offsets(path, rows):
+    """
+    Byte offsets at which the given data rows start, found in one scan of the
+    raw bytes (data row r starts right after the (r + 1)-th newline).
+
+    Returns:
+        dict: {row: byte offset} for every row in `rows` that exists in the file.
+    """
+    wanted = sorted(set(rows))
+    offsets = {}
+    seen = 0
+    position = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            while wanted and wanted[0] + 1 <= seen + len(newlines):
+                row = wanted.pop(0)
+                offsets[row] = position + int(newlines[row - seen]) + 1
+            if not wanted:
+                break
+            seen += len(newlines)
+            position += len(block)
+    return offsets
+
+
+def iter_row_range(path, start, stop, chunksize=CHUNK_SIZE, offset=None):
+    """
+    Yields (first_row_index, chunk) for data rows [start, stop) of the CSV.
+    The file is opened at the byte `offset` where row `start` begins, so the
+    rows before it are never tokenized; without an offset it is located with
+    a raw byte scan (see row_offsets).
+    """
+    nrows = None if stop is None else stop - start
+    row = start
+    if not start:
+        for chunk in pd.read_csv(path, nrows=nrows, chunksize=chunksize):
+            yield row, chunk
+            row += len(chunk)
+        return
+
+    if offset is None:
+        offset = row_offsets(path, [start]).get(start)
+        if offset is None:
+            return
+    columns = pd.read_csv(path, nrows=0).columns
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for chunk in pd.read_csv(f, header=None, names=columns, nrows=nrows, chunksize=chunksize):
+            yield row, chunk
+            row += len(chunk)
+
+
+def _fit_range(args):
+    path, schema, start, stop, offset, chunksize, test_fraction, track_qr, row_offset = args
+    acc = NormalEquationAccumulator(len(schema['feature_names']), track_qr=track_qr)
+    for first_row, chunk in iter_row_range(path, start, stop, chunksize, offset):
+        X, y = encode_chunk(chunk, schema)
+        first_row += row_offset
+        train = ~is_test_row(np.arange(first_row, first_row + len(chunk)), test_fraction)
+        acc.update(X[train], y[train])
+    return acc
+
+
+def _split_ranges(n_rows, n_parts):
+    bounds = np.linspace(0, n_rows, n_parts + 1).astype(int)
+    return [(bounds[i], bounds[i + 1]) for i in range(n_parts) if bounds[i + 1] > bounds[i]]
+
+
+def fit_streaming(path, schema, chunksize=CHUNK_SIZE, n_workers=N_WORKERS,
+                  test_fraction=TEST_FRACTION, track_qr=False, row_offset=0):
+    """
+    Second pass: accumulates the normal equations over the training rows.
+    With n_workers > 1 the file is split into contiguous row ranges, each
+    fitted in its own process from the byte offset where it starts (located
+    once, up front), and the partial accumulators are merged.
+    `row_offset` shifts the row indices used for the train/test hash, so a
+    file of new rows continues the split of the rows seen before it.
+
+    Returns:
+        NormalEquationAccumulator: Merged statistics over all training rows.
+    """
+    n_workers = max(1, min(n_workers, schema['n_rows']))
+    ranges = _split_ranges(schema['n_rows'], n_workers)
+    offsets = row_offsets(path, [start for start, _ in ranges if start]) if len(ranges) > 1 else {}
+    tasks = [(path, schema, start, stop, offsets.get(start), chunksize, test_fraction, track_qr, row_offset)
+             for start, stop in ranges]
+
+    if n_workers == 1:
+        partials = [_fit_range(task) for task in tasks]
+    else:
+        with Pool(n_workers) as pool:
+            partials = pool.map(_fit_range, tasks)
+
+    acc = partials[0]
+    for partial in partials[1:]:
+        acc.merge(partial)
+    return acc
+
+
+def evaluate_streaming(path, schema, intercept, coef, chunksize=CHUNK_SIZE, test_fraction=TEST_FRACTION,
+                       row_offset=0):
+    """
+    Third pass: scores the held-out rows chunk by chunk and returns
+    MAE, MSE, RMSE and R² from a streaming RegressionMetrics accumulator.
+    """
+    metrics = RegressionMetrics()
+    for first_row, chunk in iter_row_range(path, 0, None, chunksize):
+        X, y = encode_chunk(chunk, schema)
+        first_row += row_offset
+        test = is_test_row(np.arange(first_row, first_row + len(chunk)), test_fraction)
+        metrics.update(y[test], X[test] @ coef + intercept)
+
+    if metrics.n == 0:
+        raise ValueError("No test rows were selected. Increase TEST_FRACTION.")
+    return metrics.as_dict()
+
+
+def save_model(path, schema, acc, intercept, coef, rows_seen):
+    """
+    Writes coefficients, sufficient statistics and the schema (vocabulary,
+    imputation means) to a single .npz file so the model can later be
+    refreshed without re-reading its history.
+    """
+    arrays = {
+        'intercept': np.float64(intercept),
+        'coef': np.asarray(coef, dtype=np.float64),
+        'n': np.float64(acc.n),
+        'xtx': acc.xtx,
+        'xty': acc.xty,
+        'yty': np.float64(acc.yty),
+        'rows_seen': np.int64(rows_seen),
+        'schema': np.array(json.dumps(schema)),
+    }
+    if acc.track_qr:
+        arrays['r'] = acc.r
+        arrays['qty'] = acc.qty
+    np.savez(path, **arrays)
+
+
+def load_model(path):
+    """
+    Reads a model written by save_model.
+
+    Returns:
+        tuple: (schema, acc, intercept, coef, rows_seen)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        schema = json.loads(str(data['schema']))
+        acc = NormalEquationAccumulator(len(schema['feature_names']), track_qr='r' in data)
+        acc.n = float(data['n'])
+        acc.xtx = data['xtx']
+        acc.xty = data['xty']
+        acc.yty = float(data['yty'])
+        if acc.track_qr:
+            acc.r = data['r']
+            acc.qty = data['qty']
+        return schema, acc, float(data['intercept']), data['coef'], int(data['rows_seen'])
+
+
+def extend_schema(schema, path, chunksize=CHUNK_SIZE):
+    """
+    Scans a file of new rows for categories missing from the vocabulary and
+    appends them, keeping every existing level (and the dropped reference
+    level) in place. Imputation means stay frozen so old statistics remain valid.
+
+    Returns:
+        tuple: (new_schema, positions of the old features in the new layout,
+                number of rows in the file)
+    """
+    vocabulary = {col: list(cats) for col, cats in schema['categorical'].items()}
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col, cats in vocabulary.items():
+            known = set(cats)
+            cats += sorted(set(chunk[col].dropna().astype(str).unique()) - known)
+        n_rows += len(chunk)
+
+    feature_names = list(schema['numeric'])
+    for col, cats in vocabulary.items():
+        feature_names += [f"{col}_{cat}" for cat in cats[1:]]
+
+    new_schema = dict(schema, categorical=vocabulary, feature_names=feature_names)
+    position = {name: i for i, name in enumerate(feature_names)}
+    positions = [position[name] for name in schema['feature_names']]
+    return new_schema, positions, n_rows
+
+
+def update_model(model_path, new_data_path, forgetting_factor=FORGETTING_FACTOR, solver=SOLVER,
+                 ridge_alpha=RIDGE_ALPHA, chunksize=CHUNK_SIZE, n_workers=N_WORKERS,
+                 test_fraction=TEST_FRACTION):
+    """
+    Refreshes a saved model with a file containing only the new rows: decays
+    the stored statistics, folds in the new training rows and re-solves.
+    The cost depends on the size of the delta, not of the history.
+
+    Returns:
+        tuple: (schema, intercept, coef, rows_seen_before)
+    """
+    schema, acc, _, _, rows_seen = load_model(model_path)
+    schema, positions, n_new = extend_schema(schema, new_data_path, chunksize)
+    if len(schema['feature_names']) != acc.n_features:
+        print(f"New categories found: {len(schema['feature_names']) - acc.n_features} feature(s) added.")
+        acc.expand(positions, len(schema['feature_names']))
+    schema['n_rows'] = n_new
+
+    if forgetting_factor < 1:
+        acc.decay(forgetting_factor)
+    delta = fit_streaming(new_data_path, schema, chunksize, n_workers, test_fraction,
+                          track_qr=acc.track_qr, row_offset=rows_seen)
+    acc.merge(delta)
+
+    if solver == 'qr' and not acc.track_qr:
+        print("Note: the saved model has no QR factor, solving with 'cholesky' instead.")
+        solver = 'cholesky'
+    start = time.perf_counter()
+    intercept, coef = acc.solve(solver, ridge_alpha)
+    print(f"Coefficients refreshed in {(time.perf_counter() - start) * 1000:.2f} ms "
+          f"({delta.n} new training rows, forgetting factor = {forgetting_factor}).")
+
+    save_model(model_path, schema, acc, intercept, coef, rows_seen + n_new)
+    return schema, intercept, coef, rows_seen
+
+
+def compare_with_in_memory(path, schema, intercept, coef, test_fraction=TEST_FRACTION):
+    """
+    Sanity check for files that fit in memory: fits sklearn's LinearRegression
+    on the same get_dummies/imputation/split and reports the largest
+    coefficient difference.
+    """
+    from sklearn.linear_model import LinearRegression
+
+    df = pd.read_csv(path).drop(columns=schema['columns_to_drop'], errors='ignore')
+    y = df[schema['target']]
+    X = pd.get_dummies(df.drop(columns=[schema['target']]), drop_first=True)
+    X = X.reindex(columns=schema['feature_names'], fill_value=0).astype(np.float64)
+    X = X.fillna(pd.Series(schema['means']))
+
+    train = ~is_test_row(np.arange(len(df)), test_fraction)
+    reference = LinearRegression().fit(X[train], y[train])
+    diff = max(abs(reference.intercept_ - intercept), np.max(np.abs(reference.coef_ - coef)))
+    return diff
+
+
+def print_coefficients(schema, intercept, coef):
+    print(f"Intercept: {intercept:.4f}")
+    for name, value in zip(schema['feature_names'], coef):
+        print(f"  {name}: {value:.4f}")
+
+
+def print_metrics(metrics):
+    print(f"Mean Absolute Error (MAE): {metrics['mae']:.4f}")
+    print(f"Mean Squared Error (MSE): {metrics['mse']:.4f}")
+    print(f"Root Mean Squared Error (RMSE): {metrics['rmse']:.4f}")
+    print(f"R-squared (R2) Score: {metrics['r2']:.4f}")
+
+
+def run_fit():
+    """
+    Fits the regression.py model out of core (schema pass, streamed fit,
+    streamed evaluation) and saves it to MODEL_FILE.
+    """
+    print(f"Scanning schema of '{DATASET_FILE}' (pass 1)...")
+    try:
+        schema = scan_schema(DATASET_FILE, TARGET_COLUMN, COLUMNS_TO_DROP, CHUNK_SIZE)
+    except FileNotFoundError:
+        print(f"Error: '{DATASET_FILE}' not found. Make sure the file is in the same directory.")
+        return
+    except KeyError as e:
+        print(f"Error: {e}")
+        return
+    print(f"Rows: {schema['n_rows']}, feature columns after encoding: {len(schema['feature_names'])}")
+    print("-" * 50)
+
+    print(f"Accumulating normal equations with {N_WORKERS} worker(s) (pass 2)...")
+    acc = fit_streaming(DATASET_FILE, schema, CHUNK_SIZE, N_WORKERS, TEST_FRACTION, track_qr=(SOLVER == 'qr'))
+    intercept, coef = acc.solve(SOLVER, RIDGE_ALPHA)
+    print(f"Solved with {SOLVER} on {acc.n} training rows (ridge alpha = {RIDGE_ALPHA}).")
+    print_coefficients(schema, intercept, coef)
+    print("-" * 50)
+
+    print("Evaluating on held-out rows (pass 3)...")
+    print_metrics(evaluate_streaming(DATASET_FILE, schema, intercept, coef, CHUNK_SIZE, TEST_FRACTION))
+
+    # Only worth doing while the file still fits in memory
+    if RIDGE_ALPHA == 0 and schema['n_rows'] <= 1_000_000:
+        diff = compare_with_in_memory(DATASET_FILE, schema, intercept, coef, TEST_FRACTION)
+        print(f"\nMax coefficient difference vs in-memory LinearRegression: {diff:.2e}")
+
+    save_model(MODEL_FILE, schema, acc, intercept, coef, schema['n_rows'])
+    print(f"\nModel and sufficient statistics saved to '{MODEL_FILE}'.")
+
+
+def run_update(new_data_path, forgetting_factor):
+    """
+    Folds a file of new rows into the model saved in MODEL_FILE and reports
+    the refreshed model's metrics on the held-out part of the new rows.
+    """
+    try:
+        schema, intercept, coef, rows_before = update_model(MODEL_FILE, new_data_path, forgetting_factor)
+    except FileNotFoundError as e:
+        print(f"Error: '{e.filename}' not found. Run the 'fit' command first or check the file name.")
+        return
+    print_coefficients(schema, intercept, coef)
+    print("-" * 50)
+
+    try:
+        metrics = evaluate_streaming(new_data_path, schema, intercept, coef, CHUNK_SIZE, TEST_FRACTION,
+                                     row_offset=rows_before)
+    except ValueError:
+        print("No held-out rows in the new data; skipping evaluation.")
+        return
+    print(f"Evaluation on {metrics['n']} held-out new rows:")
+    print_metrics(metrics)
+
+
+def _forgetting_factor(value):
+    """argparse type for --forgetting: a float in (0, 1]."""
+    try:
+        factor = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a number.")
+    if not 0 < factor <= 1:
+        raise argparse.ArgumentTypeError(f"the forgetting factor must be in (0, 1], got {factor}.")
+    return factor
+
+
+def main():
+    """
+    Command line entry point.
+
+        python streaming_regression.py fit
+        python streaming_regression.py update new_claims.csv [--forgetting 0.9]
+    """
+    parser = argparse.ArgumentParser(description="Out-of-core linear regression with incremental refresh.")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('fit', help=f"Fit on DATASET_FILE and save the model to {MODEL_FILE}.")
+    update = commands.add_parser('update', help="Fold a CSV of new rows into the saved model.")
+    update.add_argument('new_data', help="CSV with only the new rows (same columns as the original data).")
+    update.add_argument('--forgetting', type=_forgetting_factor, default=FORGETTING_FACTOR,
+                        help="Factor in (0, 1] applied to the old statistics before folding in the new rows.")
+    args = parser.parse_args()
+
+    if args.command == 'update':
+        run_update(args.new_data, args.forgetting)
+    else:
+        run_fit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import sqlite3
+import time
+import etl
+from olap_operations import STAR_SCHEMA
+
+
+# --------------------------------------------------------------------------------
+# Deterministic synthetic data for the olap_operations.py star schema
+# (Product_Dim, Branch_Dim, Time_Dim, Sales_Fact) at any scale.
+#
+# The dimensions are small and built up front from the seed. Facts are
+# generated in fixed blocks of BLOCK_ROWS rows; block b draws from its own
+# generator seeded with (seed, b), so the data depend only on the seed and
+# the scale parameters (not on how the output is batched: block_rows only
+# cuts the generated rows into output blocks), any block can be regenerated
+# on its own, and memory stays at one block however many billions of rows
+# are written.
+#
+# Skew: products are drawn from a Zipf distribution (a few best sellers,
+# a long tail), branches from a milder Zipf, and dates from a seasonal
+# calendar (weekend lift, festive Q4 peak, summer AC season, yearly growth).
+# --------------------------------------------------------------------------------
+
+BLOCK_ROWS = 1_000_000   # Rows per generation block; part of the seed, so changing it changes the data
+SEED = 42
+
+CATEGORIES = {   # Category -> (brands, median unit price)
+    'Electronics': (['HP', 'Samsung', 'Apple', 'Lenovo', 'Sony'], 40_000),
+    'Home Appliance': (['LG', 'Whirlpool', 'Voltas', 'Bosch', 'Godrej'], 30_000),
+    'Accessories': (['Boat', 'Logitech', 'JBL', 'Anker'], 2_000),
+    'Furniture': (['IKEA', 'Nilkamal', 'Durian'], 15_000),
+    'Clothing': (['Raymond', 'Levis', 'Biba', 'FabIndia'], 1_500),
+    'Grocery': (['Tata', 'Amul', 'Nestle', 'ITC', 'Britannia'], 200),
+    'Sports': (['Nike', 'Adidas', 'Decathlon'], 3_000),
+    'Toys': (['Lego', 'Hasbro', 'Funskool'], 1_200),
+}
+REGIONS = {
+    'North': ['Delhi', 'Jaipur', 'Lucknow', 'Chandigarh', 'Amritsar', 'Dehradun'],
+    'South': ['Chennai', 'Bengaluru', 'Hyderabad', 'Kochi', 'Coimbatore', 'Mysuru'],
+    'East': ['Kolkata', 'Bhubaneswar', 'Patna', 'Ranchi'],
+    'West': ['Mumbai', 'Pune', 'Ahmedabad', 'Surat', 'Nagpur', 'Goa'],
+    'Central': ['Bhopal', 'Indore', 'Raipur'],
+    'North-East': ['Guwahati', 'Shillong', 'Imphal'],
+}
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_SEASONALITY = np.array([0.9, 0.85, 0.95, 1.05, 1.15, 1.0, 0.9, 0.95, 1.0, 1.35, 1.5, 1.3])  # Festive Q4
+
+
+def _zipf_cdf(n, s):
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    cdf = np.cumsum(weights) / weights.sum()
+    cdf[-1] = 1.0   # Rounding can leave it just below 1, and searchsorted would then return n
+    return cdf
+
+
+class StarSchemaGenerator:
+    """
+    Seeded generator of the star schema at a configurable scale.
+
+    Args:
+        n_facts (int): Sales_Fact rows.
+        n_products (int): Product_Dim rows.
+        n_branches (int): Branch_Dim rows, spread over the cities of REGIONS.
+        start_year (int), n_years (int): Calendar covered by Time_Dim.
+        product_skew (float): Zipf exponent of product popularity.
+        branch_skew (float): Zipf exponent of branch traffic.
+        seed (int): Everything generated is a function of the seed and the arguments.
+        block_rows (int): Fact rows per output block handed to a sink (does not change the data).
+    """
+
+    def __init__(self, n_facts, n_products=1_000, n_branches=200, start_year=2023, n_years=3,
+                 product_skew=1.1, branch_skew=0.6, seed=SEED, block_rows=BLOCK_ROWS):
+        self.n_facts = int(n_facts)
+        self.seed = seed
+        self.block_rows = block_rows
+        self._generated = None   # (index, frame) of the last generation block, reused by the next output block
+        rng = np.random.default_rng([seed, 0xD1])
+
+        # Products: random category/brand, log-normal price around the category median
+        categories = list(CATEGORIES)
+        category = rng.integers(len(categories), size=n_products)
+        brand = [CATEGORIES[categories[c]][0][rng.integers(len(CATEGORIES[categories[c]][0]))] for c in category]
+        product_ids = np.arange(1, n_products + 1)
+        self.products = pd.DataFrame({
+            'Product_ID': product_ids,
+            'Product_Name': [f"{b} {categories[c]} {i}" for i, b, c in zip(product_ids, brand, category)],
+            'Category': [categories[c] for c in category],
+            'Brand': brand,
+        })
+        median_price = np.array([CATEGORIES[categories[c]][1] for c in category], dtype=np.float64)
+        self.unit_price = np.round(median_price * rng.lognormal(0.0, 0.4, n_products)).astype(np.int64)
+        # Popularity rank -> product: a fixed shuffle, so best sellers are spread across categories
+        self.product_by_rank = rng.permutation(product_ids)
+        self.product_cdf = _zipf_cdf(n_products, product_skew)
+
+        # Branches: cities cycled within regions, several branches per big city
+        cities = [(city, region) for region, names in REGIONS.items() for city in names]
+        branch_city = [cities[i % len(cities)] for i in range(n_branches)]
+        self.branches = pd.DataFrame({
+            'Branch_ID': np.arange(101, 101 + n_branches),
+            'Branch_Name': [f"{city} Store {i // len(cities) + 1}" for i, (city, _) in enumerate(branch_city)],
+            'City': [city for city, _ in branch_city],
+            'Region': [region for _, region in branch_city],
+        })
+        self.branch_by_rank = rng.permutation(self.branches['Branch_ID'].to_numpy())
+        self.branch_cdf = _zipf_cdf(n_branches, branch_skew)
+
+        # Calendar: one Time_Dim row per day, Time_ID = yyyymmdd
+        days = pd.date_range(f"{start_year}-01-01", f"{start_year + n_years - 1}-12-31", freq='D')
+        self.times = pd.DataFrame({
+            'Time_ID': (days.year * 10_000 + days.month * 100 + days.day).to_numpy(dtype=np.int64),
+            'Day': days.day,
+            'Month': [MONTHS[m - 1] for m in days.month],
+            'Quarter': [f"Q{q}" for q in days.quarter],
+            'Year': days.year,
+        })
+        weight = (MONTH_SEASONALITY[days.month.to_numpy() - 1]
+                  * np.where(days.dayofweek.to_numpy() >= 5, 1.3, 1.0)                # Weekends
+                  * (1.0 + 0.12 * (days.year.to_numpy() - start_year))                 # Yearly growth
+                  * (1.0 + 0.5 * np.exp(-((days.dayofyear.to_numpy() - 300) / 12.0) ** 2)))  # Festive peak (late Oct)
+        self.day_cdf = np.cumsum(weight) / weight.sum()
+        self.day_cdf[-1] = 1.0
+
+    def dimensions(self):
+        return {'Product_Dim': self.products, 'Branch_Dim': self.branches, 'Time_Dim': self.times}
+
+    @property
+    def n_blocks(self):
+        return -(-self.n_facts // self.block_rows)
+
+    def _generation_block(self, g):
+        """Generation block g (rows g * BLOCK_ROWS .. up to n_facts), drawn from its own seeded generator."""
+        if self._generated is not None and self._generated[0] == g:
+            return self._generated[1]
+        start = g * BLOCK_ROWS
+        n = min(BLOCK_ROWS, self.n_facts - start)
+        rng = np.random.default_rng([self.seed, g])
+        products = self.product_by_rank[np.searchsorted(self.product_cdf, rng.random(n))]
+        branches = self.branch_by_rank[np.searchsorted(self.branch_cdf, rng.random(n))]
+        days = np.searchsorted(self.day_cdf, rng.random(n))
+        quantity = rng.geometric(0.55, n) + (rng.random(n) < 0.05) * rng.integers(5, 20, n)
+        discount = 1.0 - 0.1 * (rng.random(n) < 0.2)
+        revenue = np.round(quantity * self.unit_price[products - 1] * discount).astype(np.int64)
+        facts = pd.DataFrame({
+            'Sale_ID': np.arange(start + 1, start + n + 1, dtype=np.int64),
+            'Product_ID': products,
+            'Branch_ID': branches,
+            'Time_ID': self.times['Time_ID'].to_numpy()[days],
+            'Quantity': quantity,
+            'Revenue': revenue,
+        })
+        self._generated = (g, facts)
+        return facts
+
+    def fact_block(self, b):
+        """Output block b (rows b * block_rows .. up to n_facts), identical on every call and for any block_rows."""
+        start = b * self.block_rows
+        stop = min(start + self.block_rows, self.n_facts)
+        first = start // BLOCK_ROWS
+        parts = [self._generation_block(g) for g in range(first, (stop - 1) // BLOCK_ROWS + 1)]
+        facts = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        offset = start - first * BLOCK_ROWS
+        if offset == 0 and len(facts) == stop - start:
+            return facts
+        return facts.iloc[offset:offset + stop - start].reset_index(drop=True)
+
+    def fact_blocks(self, first_block=0):
+        for b in range(first_block, self.n_blocks):
+            yield self.fact_block(b)
+
+    def write(self, sink, verbose=True):
+        """Writes the dimensions and then every fact block to `sink`; returns the elapsed seconds."""
+        start = time.perf_counter()
+        sink.write_dimensions(self.dimensions())
+        written = 0
+        for block in self.fact_blocks():
+            sink.write_facts(block)
+            written += len(block)
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"\r{written:>14,} / {self.n_facts:,} facts  ({written / elapsed:,.0f} rows/s)", end='')
+        sink.close()
+        if verbose:
+            print()
+        return time.perf_counter() - start
+
+
+
+
+# --- Sinks: each receives the dimensions once and then fact blocks in order ---
+
+
+class SQLiteSink:
+    """Streams into a SQLite warehouse with the bulk loader (one transaction per block)."""
+
+    def __init__(self, path_or_conn):
+        self.conn = sqlite3.connect(path_or_conn) if isinstance(path_or_conn, str) else path_or_conn
+        self.conn.executescript(STAR_SCHEMA)
+        self._loading = etl.loading_mode(self.conn)
+        self._loading.__enter__()
+
+    def write_dimensions(self, dimensions):
+        with self.conn:
+            for table, df in dimensions.items():
+                etl.bulk_insert(self.conn, table, df)
+
+    def write_facts(self, block):
+        with self.conn:
+            etl.bulk_insert(self.conn, 'Sales_Fact', block)
+
+    def close(self):
+        self._loading.__exit__(None, None, None)
+        self.conn.execute("ANALYZE")
+
+
+class CSVSink:
+    """One CSV per table in `directory`; fact blocks are appended to Sales_Fact.csv."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.first = True
+
+    def write_dimensions(self, dimensions):
+        for table, df in dimensions.items():
+            df.to_csv(os.path.join(self.directory, f"{table}.csv"), index=False)
+
+    def write_facts(self, block):
+        block.to_csv(os.path.join(self.directory, 'Sales_Fact.csv'), mode='w' if self.first else 'a',
+                     header=self.first, index=False)
+        self.first = False
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """One Parquet file per dimension and one per fact block (needs pyarrow or fastparquet)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.part = 0
+        os.makedirs(os.path.join(directory, 'Sales_Fact'), exist_ok=True)
+
+    def write_dimensions(self, dimensions):
+        for table, df in dimensions.items():
+            df.to_parquet(os.path.join(self.directory, f"{table}.parquet"), index=False)
+
+    def write_facts(self, block):
+        block.to_parquet(os.path.join(self.directory, 'Sales_Fact', f"part-{self.part:05d}.parquet"), index=False)
+        self.part += 1
+
+    def close(self):
+        pass
+
+
+SINKS = {'sqlite': SQLiteSink, 'csv': CSVSink, 'parquet': ParquetSink}
+
+
+def generate_warehouse(path, n_facts, **kwargs):
+    """Convenience: a fresh SQLite star schema with n_facts generated facts at `path`."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    generator = StarSchemaGenerator(n_facts, **kwargs)
+    generator.write(SQLiteSink(path), verbose=False)
+    return generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the OLAP star schema at scale.")
+    parser.add_argument('--facts', type=float, default=1e6, help="Fact rows (e.g. 1e7).")
+    parser.add_argument('--products', type=int, default=1_000)
+    parser.add_argument('--branches', type=int, default=200)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--sink', choices=list(SINKS), default='sqlite')
+    parser.add_argument('--output', default='star_schema.db', help="Database file (sqlite) or directory.")
+    args = parser.parse_args()
+
+    generator = StarSchemaGenerator(int(args.facts), n_products=args.products, n_branches=args.branches,
+                                    n_years=args.years, seed=args.seed)
+    print(f"Generating {generator.n_facts:,} facts ({generator.n_blocks} blocks), {args.products} products, "
+          f"{args.branches} branches, {len(generator.times)} days -> {args.sink}: {args.output}")
+    elapsed = generator.write(SINKS[args.sink](args.output))
+    print(f"Done in {elapsed:.1f} s")
+
+
+if __name__ == '__main__':
+    main()